@@ -0,0 +1,198 @@
+"""
+fop_benchmark.py
+
+Throughput benchmark of the FOP maintenance scripts on a synthetic tree.
+
+A tree is generated with fop_synthetic.py (many expiries, thousands of
+strikes per zip, configurable csv size), then every case is timed on it:
+
+- walk/*: listing the tree with fop.walk.walk_symbol, sequential and threaded
+- fix/*: the strike precision fix (fix_missed_strike_price_precision.run_tasks),
+  sequential, with a process pool and with a level-1 recompression
+- merge/*: merge_future_option_expiry.merge_expiries
+- pipeline/*: the single-pass fix and merge (fix_and_merge_future_option.run_groups)
+
+Every case writes into a fresh output directory and is repeated; the best
+time is kept. Results are saved as JSON, and --compare flags every case that
+got slower than a baseline file by more than --tolerance:
+
+    python experiments/fop_benchmark.py --output baseline.json
+    # ... change the code ...
+    python experiments/fop_benchmark.py --output current.json --compare baseline.json
+
+Usage:
+  python experiments/fop_benchmark.py [--expiries N] [--zips N] [--strikes N] [--rows N]
+      [--workers N] [--repeat N] [--cases PREFIX ...] [--output FILE] [--compare FILE [--tolerance F]]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict
+from zipfile import ZipFile
+
+EXPERIMENTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(EXPERIMENTS_DIR, "..", "scripts"))
+sys.path.insert(0, EXPERIMENTS_DIR)
+
+import fix_and_merge_future_option as fix_and_merge  # noqa: E402
+import fix_missed_strike_price_precision as fix_missed  # noqa: E402
+import merge_future_option_expiry as merge  # noqa: E402
+from fop.walk import walk_symbol  # noqa: E402
+from fop.zip_rewrite import DEFAULT_COMPRESSION, Compression  # noqa: E402
+from fop_synthetic import generate_tree  # noqa: E402
+
+
+def _fix_tasks(symbol_path: str, out_root: str, compression: Compression = DEFAULT_COMPRESSION):
+    rule = fix_missed.StrikeScalingFactors.get("euu")
+    for item in walk_symbol(symbol_path):
+        dst_zip = os.path.join(out_root, item.expiry, os.path.basename(item.zip_path))
+        yield item.zip_path, dst_zip, rule, False, compression
+
+
+def build_cases(symbol_path: str, data_root: str, workers: int) -> Dict[str, Callable[[str], None]]:
+    """
+    Return case name -> callable(out_root) running the case once.
+    """
+    transform = fix_and_merge.build_transform("euu")
+
+    def pipeline(out_root, case_workers):
+        groups = fix_and_merge.plan_groups(symbol_path, out_root, data_root)
+        fix_and_merge.run_groups(groups, transform, DEFAULT_COMPRESSION, case_workers)
+
+    return {
+        "walk/sequential": lambda out_root: sum(1 for _ in walk_symbol(symbol_path)),
+        "walk/threads": lambda out_root: sum(1 for _ in walk_symbol(symbol_path, workers)),
+        "fix/sequential": lambda out_root: fix_missed.run_tasks(_fix_tasks(symbol_path, out_root)),
+        "fix/processes": lambda out_root: fix_missed.run_tasks(_fix_tasks(symbol_path, out_root), workers),
+        "fix/deflate-1": lambda out_root: fix_missed.run_tasks(
+            _fix_tasks(symbol_path, out_root, Compression(compresslevel=1)), workers),
+        "merge/sequential": lambda out_root: merge.merge_expiries(symbol_path, out_root, data_root),
+        "pipeline/sequential": lambda out_root: pipeline(out_root, 1),
+        "pipeline/processes": lambda out_root: pipeline(out_root, workers),
+    }
+
+
+def time_case(case: Callable[[str], None], work_dir: str, repeat: int) -> float:
+    """
+    Best wall time of repeat runs, each one into an empty output directory.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        out_root = tempfile.mkdtemp(dir=work_dir)
+        # the scripts report every zip; keep that out of the measurement
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            case(out_root)
+            best = min(best, time.perf_counter() - started)
+        shutil.rmtree(out_root)
+    return best
+
+
+def tree_stats(symbol_path: str) -> Dict[str, int]:
+    zips = members = size = 0
+    for item in walk_symbol(symbol_path):
+        zips += 1
+        size += os.path.getsize(item.zip_path)
+        with ZipFile(item.zip_path) as z:
+            members += len(z.infolist())
+    return {"zips": zips, "members": members, "bytes": size}
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=EXPERIMENTS_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Return the cases slower than baseline by more than tolerance (0.2 = 20%).
+    """
+    regressions = []
+    for name, result in results["cases"].items():
+        before = baseline.get("cases", {}).get(name)
+        if before and result["seconds"] > before["seconds"] * (1 + tolerance):
+            regressions.append((name, before["seconds"], result["seconds"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the FOP maintenance scripts on a synthetic tree.")
+    parser.add_argument("--expiries", type=int, default=6, help="monthly expiry folders (default: 6)")
+    parser.add_argument("--zips", type=int, default=4, help="archives per expiry folder (default: 4)")
+    parser.add_argument("--strikes", type=int, default=2_000, help="csv members per archive (default: 2000)")
+    parser.add_argument("--rows", type=int, default=20, help="rows per csv (default: 20)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="processes/threads of the parallel cases (default: CPU count)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case, the best one is kept (default: 3)")
+    parser.add_argument("--cases", nargs="*", help="only run the cases starting with these prefixes, e.g. fix/ walk/")
+    parser.add_argument("--output", help="save the results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON results to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="slowdown accepted against --compare before failing (default: 0.2 = 20%%)")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    work_dir = tempfile.mkdtemp(prefix="fop-benchmark-")
+    try:
+        symbol_path = generate_tree(work_dir, "euu", args.expiries, args.zips, args.strikes, args.rows)
+        data_root = os.path.join(work_dir, "data")
+        stats = tree_stats(symbol_path)
+        print(f"Tree: {stats['zips']} zips, {stats['members']} members, {stats['bytes'] / 1e6:.1f} MB")
+
+        results = {
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "params": {key: getattr(args, key) for key in ("expiries", "zips", "strikes", "rows", "workers", "repeat")},
+            "tree": stats,
+            "cases": {},
+        }
+        print(f"{'case':<22}{'seconds':>10}{'MB/s':>10}{'members/s':>14}")
+        for name, case in build_cases(symbol_path, data_root, args.workers).items():
+            if args.cases and not any(name.startswith(prefix) for prefix in args.cases):
+                continue
+            seconds = time_case(case, work_dir, args.repeat)
+            results["cases"][name] = {"seconds": round(seconds, 6)}
+            if name.startswith("walk/"):
+                # listing never opens a zip, only the zip rate means something
+                results["cases"][name]["zips_per_s"] = round(stats["zips"] / seconds, 1)
+                print(f"{name:<22}{seconds:>10.4f}{'-':>10}{'-':>14}  ({stats['zips'] / seconds:.0f} zips/s)")
+                continue
+            results["cases"][name]["mb_per_s"] = round(stats["bytes"] / seconds / 1e6, 3)
+            results["cases"][name]["members_per_s"] = round(stats["members"] / seconds, 1)
+            print(f"{name:<22}{seconds:>10.4f}{stats['bytes'] / seconds / 1e6:>10.1f}"
+                  f"{stats['members'] / seconds:>14.0f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for name, before, after in regressions:
+            print(f"REGRESSION: {name}: {before:.3f}s -> {after:.3f}s (+{(after / before - 1) * 100:.0f}%)")
+        if regressions:
+            sys.exit(1)
+        print(f"No regression against {args.compare} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+fop_synthetic.py
+
+Synthetic future option (FOP) archive generator for the benchmarks.
+
+Builds a tree shaped like the production data:
+
+    <root>/data/futureoption/cme/minute/<symbol>/<YYYYMM>/<YYYYMMDD>_quote_american.zip
+        <YYYYMMDD>_<symbol>_minute_quote_american_<call|put>_<strike>_<option expiry>.csv
+
+Strikes step by 10 from 10,000, so with the 'euu' rule of
+fix_missed_strike_price_precision.py one strike out of five ends in 2 or 7
+and gets renamed. Expiry folders are consecutive months, so two out of three
+are merged into their quarter folder by merge_future_option_expiry.py.
+The output is deterministic for a given seed.
+
+Usage:
+  python experiments/fop_synthetic.py <root> [--expiries N] [--zips N] [--strikes N] [--rows N]
+"""
+
+import argparse
+import os
+import random
+from zipfile import ZipFile, ZIP_DEFLATED
+
+
+def _month(start_year: int, start_month: int, offset: int) -> str:
+    year, month = divmod(start_month - 1 + offset, 12)
+    return f"{start_year + year}{month + 1:02d}"
+
+
+def generate_csv(rnd: random.Random, rows: int) -> str:
+    """
+    Minute quote rows: milliseconds since midnight, bid, bid size, ask, ask size.
+    """
+    price = rnd.uniform(1, 500)
+    lines = []
+    for row in range(rows):
+        price = max(0.05, price + rnd.uniform(-0.5, 0.5))
+        bid = round(price, 2)
+        ask = round(price + rnd.choice((0.05, 0.1, 0.15)), 2)
+        lines.append(f"{60_000 * (row + 570)},{bid},{rnd.randint(1, 200)},{ask},{rnd.randint(1, 200)}")
+    return "\n".join(lines) + "\n"
+
+
+def generate_zip(path: str, date: str, symbol: str, option_expiry: str, strikes: int, rows: int,
+                 rnd: random.Random, compression: int = ZIP_DEFLATED):
+    """
+    Write one day archive holding a call and a put csv for every strike.
+    """
+    with ZipFile(path, "w", compression) as z:
+        for i in range(strikes):
+            strike = 10_000 + 10 * (i // 2)
+            right = "call" if i % 2 == 0 else "put"
+            z.writestr(f"{date}_{symbol}_minute_quote_american_{right}_{strike}_{option_expiry}.csv",
+                       generate_csv(rnd, rows))
+
+
+def generate_tree(root: str, symbol: str = "euu", expiries: int = 6, zips: int = 4, strikes: int = 200,
+                  rows: int = 20, seed: int = 42) -> str:
+    """
+    Generate a synthetic symbol tree under root and return the symbol folder.
+
+    Args:
+        expiries (int): Consecutive monthly expiry folders, from 202501.
+        zips (int): Day archives per expiry folder.
+        strikes (int): Csv members per archive (calls and puts).
+        rows (int): Rows per csv, i.e. the uncompressed member size (~30 bytes a row).
+    """
+    rnd = random.Random(seed)
+    symbol_path = os.path.join(root, "data", "futureoption", "cme", "minute", symbol)
+    for e in range(expiries):
+        expiry = _month(2025, 1, e)
+        expiry_path = os.path.join(symbol_path, expiry)
+        os.makedirs(expiry_path, exist_ok=True)
+        for day in range(zips):
+            date = f"{_month(2024, 12, e)}{day + 1:02d}"
+            generate_zip(os.path.join(expiry_path, f"{date}_quote_american.zip"), date, symbol,
+                         f"{expiry}15", strikes, rows, rnd)
+    return symbol_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic FOP archive tree.")
+    parser.add_argument("root", help="directory receiving data/futureoption/...")
+    parser.add_argument("--symbol", default="euu")
+    parser.add_argument("--expiries", type=int, default=6, help="monthly expiry folders (default: 6)")
+    parser.add_argument("--zips", type=int, default=4, help="archives per expiry folder (default: 4)")
+    parser.add_argument("--strikes", type=int, default=200, help="csv members per archive (default: 200)")
+    parser.add_argument("--rows", type=int, default=20, help="rows per csv (default: 20)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    symbol_path = generate_tree(args.root, args.symbol, args.expiries, args.zips, args.strikes, args.rows,
+                                args.seed)
+    print(f"Generated: {symbol_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+import asyncio
+import contextlib
+import itertools
+import time
+import grpc
+from LoginFailedException import LoginFailedException
+from NetworkFailedException import NetworkFailedException
+from ServerNotAvailableException import ServerNotAvailableException
+from SessionNotFoundException import SessionNotFoundException
+from StreamingAlreadyExistsException import StreamingAlreadyExistsException
+from emsxapiconfig import EMSXAPIConfig
+from emsxapilibrary import (EMSXAPILibrary, HeartBeatStatus, build_channel_credentials, build_channel_options,
+                            srp_client_proof, start_internet_probe)
+
+# Import your Python gRPC generated files here, without any package name
+import utilities_pb2
+import utilities_pb2_grpc
+import market_data_pb2_grpc
+import order_pb2_grpc
+
+
+class AsyncEMSXAPILibrary:
+    """
+    asyncio counterpart of EMSXAPILibrary, built on grpc.aio.
+
+    Same configuration, channel pool, login (plain or SRP), heartbeat and stub
+    accessors, but every call is awaited on the event loop: server streams are
+    consumed with "async for" and the heartbeat runs as an asyncio task, so any
+    number of subscriptions share one thread.
+
+    Example:
+
+        lib = await AsyncEMSXAPILibrary.create()
+        await lib.login()
+        await lib.start_listening_heartbeat(60)
+        async for response in lib.get_order_service_stub().SubscribeOrderInfo(request):
+            ...
+        await lib.close()
+    """
+
+    def __init__(self, config_file_name='config.cfg'):
+        self.config = EMSXAPIConfig(config_file_name)
+        self._channels = []
+        self._utility_svc_stubs = []
+        self._mkt_data_svc_stubs = []
+        self._order_service_stubs = []
+        self._utility_stub_counter = itertools.count()
+        self._mkt_data_stub_counter = itertools.count()
+        self._order_stub_counter = itertools.count()
+        self.heartbeat_task = None
+        self.is_logged_in = False
+        self.error_handler = None
+        self.userToken = ''
+        self.retry_count = 0
+        # serializes the (re)opening of this client's channels, other clients do not wait on it
+        self.channel_lock = asyncio.Lock()
+
+    instance = None
+
+    @staticmethod
+    async def create(config_file_name: str = 'config.cfg'):
+        # no await between the check and the assignment: atomic on the event loop without a lock
+        if AsyncEMSXAPILibrary.instance is None:
+            AsyncEMSXAPILibrary.instance = AsyncEMSXAPILibrary(config_file_name)
+        instance = AsyncEMSXAPILibrary.instance
+        async with instance.channel_lock:
+            # concurrent create() calls wait for the first one to open the channels; after a
+            # failure the next create() tries again
+            if not instance._channels:
+                await instance._open_channel()
+        return instance
+
+    @staticmethod
+    def get():
+        return AsyncEMSXAPILibrary.instance
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def get_is_logged_in(self):
+        # a single event loop thread touches it, no lock needed
+        return self.is_logged_in
+
+    def get_utility_service_stub(self):
+        return EMSXAPILibrary._next_stub(self._utility_svc_stubs, self._utility_stub_counter)
+
+    def get_market_data_service_stub(self):
+        return EMSXAPILibrary._next_stub(self._mkt_data_svc_stubs, self._mkt_data_stub_counter)
+
+    def get_order_service_stub(self):
+        return EMSXAPILibrary._next_stub(self._order_service_stubs, self._order_stub_counter)
+
+    def create_channel(self, host_name, port):
+        channel_options = build_channel_options(self.config)
+        credentials = build_channel_credentials(self.config)
+        target = f"{host_name}:{port}"
+        if credentials is not None:
+            self._channels = [grpc.aio.secure_channel(target, credentials, channel_options)
+                              for _ in range(self.config.channelPoolSize)]
+        else:
+            self._channels = [grpc.aio.insecure_channel(target, options=channel_options)
+                              for _ in range(self.config.channelPoolSize)]
+
+    def init_stubs(self):
+        self._utility_svc_stubs = [utilities_pb2_grpc.UtilityServicesStub(self._channels[i])
+                                   for i in self.config.utilityChannels]
+        self._mkt_data_svc_stubs = [market_data_pb2_grpc.MarketDataServiceStub(self._channels[i])
+                                    for i in self.config.marketDataChannels]
+        self._order_service_stubs = [order_pb2_grpc.SubmitOrderServiceStub(self._channels[i])
+                                     for i in self.config.orderChannels]
+
+    async def open_channel(self):
+        async with self.channel_lock:
+            await self._open_channel()
+
+    async def _open_channel(self):
+        # same bootstrap as EMSXAPILibrary.open_channel: wait for READY under one deadline,
+        # the optional internet probe runs in a daemon thread alongside (not in the default
+        # executor, which asyncio.run waits for on shutdown)
+        await self.close_channel()
+        deadline = time.monotonic() + self.config.connectTimeoutMS / 1000
+        internet_probe = None
+        if self.config.checkInternet:
+            internet_probe = start_internet_probe((deadline - time.monotonic()) * 1000)
+        self.create_channel(self.config.server, self.config.port)
+        try:
+            await asyncio.wait_for(asyncio.gather(*(channel.channel_ready() for channel in self._channels)),
+                                   max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            await self.close_channel()
+            if internet_probe is not None and not await self._internet_probe_result(internet_probe, deadline):
+                raise NetworkFailedException("Network not available")
+            raise ServerNotAvailableException(
+                f"Server {self.config.server} not responding within {self.config.connectTimeoutMS} ms, might be down.")
+        self.init_stubs()
+
+    @staticmethod
+    async def _internet_probe_result(probe, deadline):
+        # a probe that has not connected by the deadline counts as no network
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(probe), max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            return False
+
+    async def close_channel(self):
+        channels, self._channels = self._channels, []
+        # stubs of closed channels are dropped with them, as in EMSXAPILibrary.close_channel
+        self._utility_svc_stubs = []
+        self._mkt_data_svc_stubs = []
+        self._order_service_stubs = []
+        for channel in channels:
+            with contextlib.suppress(Exception):
+                await channel.close()
+
+    async def close(self):
+        await self.suspend_heartbeat_task()
+        await self.logout()
+        await self.close_channel()
+
+    async def _connect(self):
+        try:
+            connect_request = utilities_pb2.ConnectRequest(
+                UserName=self.config.user,
+                Domain=self.config.domain,
+                Password=self.config.password,
+                Locale=self.config.locale
+            )
+            connect_response = await self.get_utility_service_stub().Connect(connect_request)
+            if not connect_response.UserToken:
+                raise LoginFailedException("Login failed: No user token received")
+            self.userToken = connect_response.UserToken
+            return True
+        except grpc.RpcError as rpc_error:
+            raise LoginFailedException(rpc_error.details(), rpc_error)
+
+    async def login(self):
+        try:
+            self.is_logged_in = False
+            if self.config.srpLogin:
+                self.is_logged_in = await self._srp_login()
+            else:
+                self.is_logged_in = await self._connect()
+
+            if not self.is_logged_in:
+                raise LoginFailedException('Failed to login')
+
+        except grpc.RpcError as rpc_error:
+            raise LoginFailedException(rpc_error.details(), rpc_error)
+
+    async def _srp_login(self):
+        try:
+            srp_login = utilities_pb2.StartLoginSrpRequest(UserName=self.config.user,
+                                                           Domain=self.config.domain)
+
+            self.write_to_log('Connecting...')
+            resp_start_login_srp = await self.get_utility_service_stub().StartLoginSrp(srp_login)
+            if resp_start_login_srp.Response != 'success':
+                self.write_to_log('Failed to fetch UserToken')
+                self.write_to_log(resp_start_login_srp.Response)
+                return False
+
+            u_name = self.config.user
+            domain_connect = self.config.domain
+            identity = "@".join([u_name.upper(), domain_connect.upper()])
+            self.srp_transactid = resp_start_login_srp.srpTransactId
+            # pure CPU big-number math, a few milliseconds: not worth a thread hop
+            usr, srp_ax, srp_m_hex = srp_client_proof(identity, self.config.password, resp_start_login_srp)
+            self.kc = usr.K
+            self.strEpha = str(srp_ax)
+
+            srp_complogin = utilities_pb2.CompleteLoginSrpRequest(Identity=identity,
+                                                                  srpTransactId=self.srp_transactid,
+                                                                  strEphA=str(srp_ax),
+                                                                  strMc=srp_m_hex,
+                                                                  UserName=u_name, Domain=domain_connect.upper(),
+                                                                  Locale=self.config.locale.upper())
+            connect_response = await self.get_utility_service_stub().CompleteLoginSrp(srp_complogin)
+            if not connect_response.Response == 'success':
+                self.write_to_log(connect_response.Response)
+                return False
+            if not connect_response.UserToken:
+                self.write_to_log("Login failed: No user token received")
+                return False
+            self.write_to_log('Connected!')
+            self.userToken = connect_response.UserToken
+            return True
+        except Exception as e:
+            self.write_to_log(e)
+            return False
+
+    async def logout(self):
+        if not self.is_logged_in or not self.userToken:
+            return
+        try:
+            dis_conn_req = utilities_pb2.DisconnectRequest(UserToken=self.userToken)
+            disconnect_response = await self.get_utility_service_stub().Disconnect(dis_conn_req)
+            if disconnect_response.ServerResponse == "success":
+                self.write_to_log("Logged out")
+            else:
+                self.write_to_log(disconnect_response.OptionalFields["ErrorMessage"])
+        except grpc.RpcError as rpc_error:
+            self.write_to_log(rpc_error.details())
+        finally:
+            self.userToken = ''
+            self.is_logged_in = False
+
+    async def start_listening_heartbeat(self, req_timeout):
+        if not self.is_logged_in:
+            raise Exception("User needs to login first")
+
+        await self.suspend_heartbeat_task()
+        self.heartbeat_task = asyncio.create_task(self._heartbeat_task_function(req_timeout))
+
+    async def suspend_heartbeat_task(self):
+        if self.heartbeat_task is not None:
+            self.heartbeat_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.heartbeat_task
+            self.heartbeat_task = None
+
+    async def _heartbeat_task_function(self, req_timeout):
+        # the retry policy of EMSXAPILibrary._heartbeat_thread_function, with awaited sleeps
+        try:
+            refresh_channel = False
+            refresh_login = False
+            self.retry_count = 0
+            while self.is_logged_in and self.retry_count < self.config.maxRetryCount:
+                try:
+                    self.retry_count += 1
+                    if refresh_channel:
+                        await self.open_channel()
+                    if refresh_login:
+                        self.is_logged_in = False
+                        await self.login()
+                    refresh_channel = False
+                    refresh_login = False
+                    await self.exec_subscribe_heart_beat(req_timeout)
+                except grpc.RpcError:
+                    refresh_channel, refresh_login = True, False
+                    await self._retry_delay("Runtime IO issue has happened. Attempting again")
+                except SessionNotFoundException:
+                    refresh_channel, refresh_login = False, True
+                    await self._retry_delay("User session not found. Attempting login again")
+                except StreamingAlreadyExistsException:
+                    refresh_channel, refresh_login = False, False
+                    await self._retry_delay("Previous streaming has still not ended on server. Attempting again")
+                except ServerNotAvailableException:
+                    refresh_channel, refresh_login = True, True
+                    await self._retry_delay("Server seems to be unavailable at the moment. Attempting again")
+                except NetworkFailedException:
+                    refresh_channel, refresh_login = True, False
+                    await self._retry_delay("Network issues detected on client side. Attempting again")
+
+            if self.retry_count >= self.config.maxRetryCount:
+                raise Exception("Fatal: Could not succeed even after multiple retries. Aborting the operation")
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as ex:
+            self.write_to_log(ex)
+            if self.error_handler is not None:
+                self.error_handler.on_error(ex)
+
+    async def _retry_delay(self, message):
+        delay_ms = self.calculate_delay_millis(self.retry_count)
+        self.write_to_log(f"Error: {message}({self.retry_count}) in {delay_ms} ms...")
+        await asyncio.sleep(delay_ms / 1000)
+
+    async def exec_subscribe_heart_beat(self, req_timeout):
+        subscribe_request = utilities_pb2.SubscribeHeartBeatRequest(
+            UserToken=self.userToken,
+            TimeoutInSeconds=req_timeout
+        )
+
+        hb_call = self.get_utility_service_stub().SubscribeHeartBeat(subscribe_request)
+        try:
+            async for response in hb_call:
+                res_status = response.Status
+                server_msg = response.Acknowledgement.ServerResponse
+                self.write_to_log(f"[{EMSXAPILibrary.get_current_time()}] HeartBeat status: {res_status} | {server_msg}")
+
+                if res_status == HeartBeatStatus.DEAD:
+                    raise SessionNotFoundException(f"Session not found for user token {self.userToken}")
+                elif res_status == HeartBeatStatus.UNKNOWN:
+                    raise RuntimeError(f"Status received as {res_status}")
+                elif server_msg == "Error: Active streaming subscription already exists.":
+                    raise StreamingAlreadyExistsException("Heartbeat subscription already exists")
+
+                self.retry_count = 1
+        finally:
+            # stop the server stream on errors and on cancellation of the heartbeat task
+            hb_call.cancel()
+
+    def write_to_log(self, msg):
+        print(msg)
+
+    def calculate_delay_millis(self, retry_count):
+        return int(pow(2, retry_count) * self.config.retryDelayMS)
@@ -50,4 +50,25 @@ class EMSXAPIConfig:
         self.keepAliveTimeout = int(config_dict.get('keep_alive_timeout', '30000'))
         self.maxRetryCount = int(config_dict.get('max_retry_count', '3'))
         self.retryDelayMS = int(config_dict.get('retry_delay_ms', '1000'))
-        self.maxMessageSize = 104*1024*1024
\ No newline at end of file
+        # deadline for the channel to become READY when it is opened
+        self.connectTimeoutMS = int(config_dict.get('connect_timeout_ms', '3000'))
+        # probe www.google.com alongside, only to tell a local network failure from a down server
+        self.checkInternet = config_dict.get('check_internet', 'false').lower() == 'true'
+        self.maxMessageSize = 104*1024*1024
+        # channels (HTTP/2 connections) opened to the server, and the channels each service runs on
+        self.channelPoolSize = int(config_dict.get('channel_pool_size', '1'))
+        if self.channelPoolSize < 1:
+            raise ValueError(f"channel_pool_size must be at least 1, got {self.channelPoolSize}")
+        # by default market data gets its own channels, so streams do not slow down orders
+        default_market_data_channels = ','.join(str(i) for i in range(1, self.channelPoolSize)) or '0'
+        self.utilityChannels = self._channel_indexes(config_dict, 'utility_channels', '0')
+        self.orderChannels = self._channel_indexes(config_dict, 'order_channels', '0')
+        self.marketDataChannels = self._channel_indexes(config_dict, 'market_data_channels',
+                                                        default_market_data_channels)
+
+    def _channel_indexes(self, config_dict, key, default):
+        # "1,2" -> [1, 2]: the channels of the pool a service's stubs are spread over
+        indexes = [int(index) for index in config_dict.get(key, default).split(',') if index.strip()]
+        if not indexes or any(index < 0 or index >= self.channelPoolSize for index in indexes):
+            raise ValueError(f"{key} must list channels between 0 and {self.channelPoolSize - 1}, got {indexes}")
+        return indexes
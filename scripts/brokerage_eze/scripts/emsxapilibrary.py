@@ -2,10 +2,12 @@ import datetime
 import enum
 import hashlib
 import grpc
+import itertools
 import threading
 import time
 import os
 import socket
+import concurrent.futures
 from LoginFailedException import LoginFailedException
 from NetworkFailedException import NetworkFailedException
 from ServerNotAvailableException import ServerNotAvailableException
@@ -24,13 +26,101 @@ import market_data_pb2_grpc
 import order_pb2_grpc
 
 
+def build_channel_options(config):
+    return [
+        ('grpc.keepalive_time_ms', config.keepAliveTime),
+        ('grpc.keepalive_timeout_ms', config.keepAliveTimeout),
+        ('grpc.keepalive_permit_without_calls', 1),
+        ('grpc.max_receive_message_length', config.maxMessageSize),
+        ('grpc.enable_http_proxy', 0),
+        # channels with the same target and options otherwise share one connection (global subchannel pool)
+        ('grpc.use_local_subchannel_pool', 1)
+    ]
+
+
+def build_channel_credentials(config):
+    # None for an insecure channel
+    if not (config.ssl and config.certFilePath is not None):
+        return None
+    cert_file = config.certFilePath
+    if not os.path.exists(cert_file):
+        raise RuntimeError("Certificate file " + cert_file + " does not exist")
+
+    # channel_options.append(('grpc.ssl_target_name_override', 'localhost'))
+    with open(cert_file, 'rb') as f:  # path to roots.pem file
+        cert_data = f.read()
+    return grpc.ssl_channel_credentials(root_certificates=cert_data)
+
+
+def start_internet_probe(timeout_ms):
+    # a daemon thread, not an executor: a probe still connecting never holds up interpreter exit
+    probe = concurrent.futures.Future()
+    # running from the start: a caller giving up on it cannot cancel it under the thread
+    probe.set_running_or_notify_cancel()
+
+    def run_probe():
+        probe.set_result(EMSXAPILibrary._can_connect("www.google.com", 80, timeout_ms))
+
+    threading.Thread(target=run_probe, name="emsx-internet-probe", daemon=True).start()
+    return probe
+
+
+def internet_probe_result(probe, deadline):
+    # a probe that has not connected by the deadline counts as no network
+    try:
+        return probe.result(timeout=max(0.0, deadline - time.monotonic()))
+    except concurrent.futures.TimeoutError:
+        return False
+
+
+def srp_client_proof(identity, password, resp_start_login_srp):
+    # SRP client side of the login: returns (srp user, ephemeral A as int, proof M as hex)
+    srp_g = resp_start_login_srp.srpg
+    srp_n = resp_start_login_srp.srpN
+    srp_b = resp_start_login_srp.srpb
+    srp_salt = resp_start_login_srp.srpSalt
+    srp_salt_byte = bytes.fromhex(srp_salt)
+    int_b = int('0' + srp_b)
+    srp_b_bytes = int_b.to_bytes(128, 'big')
+    int_n = int('0' + srp_n)
+    bytes_n = int_n.to_bytes(128, 'big')
+    hex_s_n = bytes_n.hex()
+    int_g = int('0' + srp_g)
+    bytes_g = int_g.to_bytes(128, 'big')
+    hex_g = bytes_g.hex()
+    usr = None
+    a = None
+
+    if hex_s_n and srp_g:
+        usr = _pysrp.User(identity, password, hash_alg=SHA256, ng_type=NG_CUSTOM, n_hex=hex_s_n,
+                          g_hex=hex_g)
+        concate_ng = bytes_n + bytes_g
+        k_ng = hashlib.sha256(concate_ng).hexdigest()
+        k_bytes = bytes.fromhex(k_ng)
+        usr.k = int.from_bytes(k_bytes, 'big')
+        uname, a = usr.start_authentication()
+    if a is None:
+        print("Failed")
+    srp_ax = int.from_bytes(a, 'big')
+    # Server => Client: s, B
+    m = usr.process_challenge(srp_salt_byte, srp_b_bytes)
+    if m is None:
+        print("Failed")
+    return usr, srp_ax, m.hex()
+
+
 class EMSXAPILibrary(metaclass=SingletonMeta):
     def __init__(self, config_file_name = 'config.cfg'):
         self.config = EMSXAPIConfig(config_file_name)
         self._channel = None
-        self._utility_svc_stub = None
-        self._mkt_data_svc_stub = None
-        self._order_service_stub = None
+        self._channels = []
+        self._utility_svc_stubs = []
+        self._mkt_data_svc_stubs = []
+        self._order_service_stubs = []
+        # one round-robin counter per service, so calls to one service do not skew another
+        self._utility_stub_counter = itertools.count()
+        self._mkt_data_stub_counter = itertools.count()
+        self._order_stub_counter = itertools.count()
         self.heartbeat_thread = None
         self.is_logged_in = False
         self.heartbeat_exit_signal = False
@@ -62,41 +152,41 @@ class EMSXAPILibrary(metaclass=SingletonMeta):
         with self.logged_in_lock:
             self.is_logged_in = value
 
+    @staticmethod
+    def _next_stub(stubs, counter):
+        # round-robin over the channels of the service; next() on itertools.count is atomic under the GIL
+        if not stubs:
+            return None
+        return stubs[next(counter) % len(stubs)]
+
     def get_utility_service_stub(self):
-        return self._utility_svc_stub
+        return self._next_stub(self._utility_svc_stubs, self._utility_stub_counter)
 
     def get_market_data_service_stub(self):
-        return self._mkt_data_svc_stub
+        return self._next_stub(self._mkt_data_svc_stubs, self._mkt_data_stub_counter)
 
     def get_order_service_stub(self):
-        return self._order_service_stub
-      
+        return self._next_stub(self._order_service_stubs, self._order_stub_counter)
 
     def create_channel(self, host_name, port):
-        channel_options = [
-            ('grpc.keepalive_time_ms', self.config.keepAliveTime),
-            ('grpc.keepalive_timeout_ms', self.config.keepAliveTimeout),
-            ('grpc.keepalive_permit_without_calls', 1),
-            ('grpc.max_receive_message_length', self.config.maxMessageSize),
-            ('grpc.enable_http_proxy', 0)
-        ]
-        if self.config.ssl and self.config.certFilePath is not None:
-            cert_file = self.config.certFilePath
-            if not os.path.exists(cert_file):
-                raise RuntimeError("Certificate file " + cert_file + " does not exist")
-            
-            # channel_options.append(('grpc.ssl_target_name_override', 'localhost'))
-            with open(cert_file, 'rb') as f:  # path to roots.pem file
-                cert_data = f.read()
-            credentials = grpc.ssl_channel_credentials(root_certificates=cert_data)
-            self._channel = grpc.secure_channel(f"{host_name}:{port}", credentials, channel_options)
-        else:
-            self._channel = grpc.insecure_channel(f"{host_name}:{port}", options=channel_options)
+        # config.channelPoolSize channels, each one its own HTTP/2 connection and flow-control window
+        self._channels = [self._create_pool_channel(host_name, port) for _ in range(self.config.channelPoolSize)]
+        self._channel = self._channels[0]
+
+    def _create_pool_channel(self, host_name, port):
+        channel_options = build_channel_options(self.config)
+        credentials = build_channel_credentials(self.config)
+        if credentials is not None:
+            return grpc.secure_channel(f"{host_name}:{port}", credentials, channel_options)
+        return grpc.insecure_channel(f"{host_name}:{port}", options=channel_options)
 
     def init_stubs(self):
-        self._utility_svc_stub = utilities_pb2_grpc.UtilityServicesStub(self._channel)
-        self._mkt_data_svc_stub = market_data_pb2_grpc.MarketDataServiceStub(self._channel)
-        self._order_service_stub = order_pb2_grpc.SubmitOrderServiceStub(self._channel)
+        self._utility_svc_stubs = [utilities_pb2_grpc.UtilityServicesStub(self._channels[i])
+                                   for i in self.config.utilityChannels]
+        self._mkt_data_svc_stubs = [market_data_pb2_grpc.MarketDataServiceStub(self._channels[i])
+                                    for i in self.config.marketDataChannels]
+        self._order_service_stubs = [order_pb2_grpc.SubmitOrderServiceStub(self._channels[i])
+                                     for i in self.config.orderChannels]
 
     def _connect(self):
         try:
@@ -146,38 +236,7 @@ class EMSXAPILibrary(metaclass=SingletonMeta):
                 locale_connect = self.config.locale
 
                 self.srp_transactid = resp_start_login_srp.srpTransactId
-                srp_g = resp_start_login_srp.srpg
-                srp_n = resp_start_login_srp.srpN
-                srp_b = resp_start_login_srp.srpb
-                srp_salt = resp_start_login_srp.srpSalt
-                srp_salt_byte = bytes.fromhex(srp_salt)
-                int_b = int('0' + srp_b)
-                srp_b_bytes = int_b.to_bytes(128, 'big')
-                int_n = int('0' + srp_n)
-                bytes_n = int_n.to_bytes(128, 'big')
-                hex_s_n = bytes_n.hex()
-                int_g = int('0' + srp_g)
-                bytes_g = int_g.to_bytes(128, 'big')
-                hex_g = bytes_g.hex()
-                usr = None
-                a = None
-
-                if hex_s_n and srp_g:
-                    usr = _pysrp.User(identity, pswrd_connect, hash_alg=SHA256, ng_type=NG_CUSTOM, n_hex=hex_s_n,
-                                      g_hex=hex_g)
-                    concate_ng = bytes_n + bytes_g
-                    k_ng = hashlib.sha256(concate_ng).hexdigest()
-                    k_bytes = bytes.fromhex(k_ng)
-                    usr.k = int.from_bytes(k_bytes, 'big')
-                    uname, a = usr.start_authentication()
-                if a is None:
-                    print("Failed")
-                srp_ax = int.from_bytes(a, 'big')
-                # Server => Client: s, B
-                m = usr.process_challenge(srp_salt_byte, srp_b_bytes)
-                if m is None:
-                    print("Failed")
-                srp_m_hex = m.hex()
+                usr, srp_ax, srp_m_hex = srp_client_proof(identity, pswrd_connect, resp_start_login_srp)
 
                 self.kc = usr.K
                 self.strEpha = str(srp_ax)
@@ -231,22 +290,40 @@ class EMSXAPILibrary(metaclass=SingletonMeta):
             self.set_is_logged_in(False)
 
     def close_channel(self):
-        if self._channel is not None :
+        for channel in self._channels:
             try:
-                self._channel._channel.close()
-                self._channel._channel.wait_for_state_change(grpc.ChannelConnectivity.IDLE, 5)
+                channel.close()
             except:
                 pass
+        # stubs of closed channels are dropped with them: get_*_service_stub() returns None until the next open
+        self._channels = []
+        self._channel = None
+        self._utility_svc_stubs = []
+        self._mkt_data_svc_stubs = []
+        self._order_service_stubs = []
 
     def open_channel(self):
-        if not self.can_connect_to_internet():
-            raise NetworkFailedException("Network not available")
-        if self.can_connect_to_server():
+        # wait for grpc's own READY state (a single connection attempt) instead of probing the
+        # server first; the optional internet probe only runs alongside, to tell a local
+        # network failure from a server outage
+        self.close_channel()
+        # every channel of the pool and the probe share one deadline
+        deadline = time.monotonic() + self.config.connectTimeoutMS / 1000
+        internet_probe = None
+        if self.config.checkInternet:
+            internet_probe = start_internet_probe((deadline - time.monotonic()) * 1000)
+        self.create_channel(self.config.server, self.config.port)
+        try:
+            for ready_future in [grpc.channel_ready_future(channel) for channel in self._channels]:
+                ready_future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except grpc.FutureTimeoutError:
             self.close_channel()
-            self.create_channel(self.config.server, self.config.port)
-            self.init_stubs()
-            return
-        raise ServerNotAvailableException(f"Server {self.config.server} not responding, might be down.")
+            if internet_probe is not None and not internet_probe_result(internet_probe, deadline):
+                raise NetworkFailedException("Network not available")
+            raise ServerNotAvailableException(
+                f"Server {self.config.server} not responding within {self.config.connectTimeoutMS} ms, might be down.")
+        # a ready channel does not wait for the internet probe
+        self.init_stubs()
 
     def start_listening_heartbeat(self, req_timeout):
         if not self.get_is_logged_in():
@@ -383,28 +460,20 @@ class EMSXAPILibrary(metaclass=SingletonMeta):
     def sleep(self, delayMs):
         time.sleep(delayMs/1000)
 
-    def can_connect_to_internet(self):
+    @staticmethod
+    def _can_connect(host, port, timeout_ms):
+        # the timeout is per socket: socket.setdefaulttimeout would leak into every other socket
         try:
-            host = "www.google.com"
-            port = 80
-            timeout_ms = 3000
-            socket.setdefaulttimeout(timeout_ms / 1000.0)
-            socket.socket(socket.AF_INET, socket.SOCK_STREAM).connect((host, port))
-            return True
-        except (socket.gaierror, socket.timeout):
+            with socket.create_connection((host, port), timeout=timeout_ms / 1000.0):
+                return True
+        except OSError:
             return False
 
-    def can_connect_to_server(self):
-        host = self.config.server
-        port = self.config.port
-        timeout_ms = 3000
+    def can_connect_to_internet(self, timeout_ms=3000):
+        return self._can_connect("www.google.com", 80, timeout_ms)
 
-        try:
-            socket.setdefaulttimeout(timeout_ms / 1000.0)
-            socket.socket(socket.AF_INET, socket.SOCK_STREAM).connect((host, port))
-            return True
-        except (socket.gaierror, socket.timeout, ConnectionRefusedError):
-            return False
+    def can_connect_to_server(self, timeout_ms=3000):
+        return self._can_connect(self.config.server, self.config.port, timeout_ms)
 
     def __del__(self):
         self.suspend_heartbeat_thread()
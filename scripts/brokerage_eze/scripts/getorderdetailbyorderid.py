@@ -1,7 +1,9 @@
+import grpc
 import order_pb2
 import json
 from threading import Event
 from emsxapilibrary import EMSXAPILibrary
+from orderdetailbatch import get_order_details_by_order_ids
 
 
 class GetOrderDetailByOrderId:
@@ -9,6 +11,7 @@ class GetOrderDetailByOrderId:
         EMSXAPILibrary.create()
         self.xapiLib = EMSXAPILibrary.get()
         self.order_id = "order-id"
+        self.order_ids = []  # several order ids are looked up concurrently, see get_order_details_by_order_ids
 
     def get_order_detail_by_order_id(self):
         self.xapiLib.login()
@@ -21,7 +24,24 @@ class GetOrderDetailByOrderId:
 
         self.xapiLib.logout()
 
+    def get_order_details_by_order_ids(self):
+        self.xapiLib.login()
+
+        # up to 16 calls in flight, transient failures retried with backoff, results in order_ids order
+        for result in get_order_details_by_order_ids(self.xapiLib, self.order_ids):
+            if result.error is not None:
+                # a failed re-login is reported as a LoginFailedException, not an RpcError
+                details = result.error.details() if isinstance(result.error, grpc.RpcError) else result.error
+                print(f"{result.key}: failed after {result.attempts} attempts: {details}")
+            else:
+                print(result.response)
+
+        self.xapiLib.logout()
+
 
 if __name__ == "__main__":
     order_search_example = GetOrderDetailByOrderId()  # password
-    order_search_example.get_order_detail_by_order_id()
+    if order_search_example.order_ids:
+        order_search_example.get_order_details_by_order_ids()
+    else:
+        order_search_example.get_order_detail_by_order_id()
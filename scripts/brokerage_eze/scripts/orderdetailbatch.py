@@ -0,0 +1,226 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import grpc
+import order_pb2
+from LoginFailedException import LoginFailedException
+
+# transient failures worth another attempt; anything else is returned as the error of its key
+RETRYABLE_CODES = {
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+    grpc.StatusCode.ABORTED,
+}
+
+
+class BatchResult(NamedTuple):
+    """
+    Outcome of the lookup of one key: response on success, error otherwise (the last
+    RpcError, or the LoginFailedException of a failed re-login).
+    """
+    key: object
+    response: object
+    error: Exception
+    attempts: int
+
+
+class _TokenRefresher:
+    # an expired session makes every in-flight call fail at once: only the first one logs in again,
+    # the other ones retry with the token it obtained, or get the LoginFailedException it raised
+    def __init__(self, xapi_lib):
+        self.xapi_lib = xapi_lib
+        self.lock = threading.Lock()
+        self.failed_login = (None, None)
+
+    def refresh(self, stale_token):
+        with self.lock:
+            if self.xapi_lib.userToken == stale_token:
+                if self.failed_login[0] == stale_token:
+                    raise self.failed_login[1]
+                try:
+                    self.xapi_lib.login()
+                except LoginFailedException as login_error:
+                    self.failed_login = (stale_token, login_error)
+                    raise
+        return self.xapi_lib.userToken
+
+
+class _AsyncTokenRefresher:
+    # _TokenRefresher for AsyncEMSXAPILibrary
+    def __init__(self, lib):
+        self.lib = lib
+        self.lock = asyncio.Lock()
+        self.failed_login = (None, None)
+
+    async def refresh(self, stale_token):
+        async with self.lock:
+            if self.lib.userToken == stale_token:
+                if self.failed_login[0] == stale_token:
+                    raise self.failed_login[1]
+                try:
+                    await self.lib.login()
+                except LoginFailedException as login_error:
+                    self.failed_login = (stale_token, login_error)
+                    raise
+        return self.lib.userToken
+
+
+def _backoff_seconds(xapi_lib, attempt):
+    return xapi_lib.calculate_delay_millis(attempt) / 1000
+
+
+def _call_with_retry(xapi_lib, stub_method_name, make_request, key, max_retries, timeout_s, refresher):
+    attempt = 0
+    while True:
+        attempt += 1
+        token = xapi_lib.userToken
+        try:
+            stub_method = getattr(xapi_lib.get_order_service_stub(), stub_method_name)
+            return BatchResult(key, stub_method(make_request(key, token), timeout=timeout_s), None, attempt)
+        except grpc.RpcError as rpc_error:
+            code = rpc_error.code()
+            if attempt > max_retries or (code not in RETRYABLE_CODES and code != grpc.StatusCode.UNAUTHENTICATED):
+                return BatchResult(key, None, rpc_error, attempt)
+            if code == grpc.StatusCode.UNAUTHENTICATED:
+                try:
+                    refresher.refresh(token)
+                except LoginFailedException as login_error:
+                    # reported like exhausted retries: the other keys of the batch still get their results
+                    return BatchResult(key, None, login_error, attempt)
+            else:
+                time.sleep(_backoff_seconds(xapi_lib, attempt))
+
+
+def batch_unary(xapi_lib, stub_method_name, make_request, keys, max_in_flight=16, max_retries=None,
+                timeout_s=30):
+    """
+    Call an order service unary method once per key, at most max_in_flight calls at a time.
+
+    make_request(key, user_token) builds the request of a key. Failed calls with
+    a transient status are retried with the exponential backoff of the library
+    (retry_delay_ms, at most max_retries times, default max_retry_count); an
+    UNAUTHENTICATED status logs in again once for all the calls and retries with
+    the new token; if that login fails, its LoginFailedException is the error of
+    the affected keys.
+
+    Returns an iterator of BatchResult in the order of keys; results are yielded
+    as soon as the ones before them are done, keys are consumed lazily.
+    """
+    if max_retries is None:
+        max_retries = xapi_lib.config.maxRetryCount
+    refresher = _TokenRefresher(xapi_lib)
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        window = deque()
+        for key in keys:
+            window.append(executor.submit(_call_with_retry, xapi_lib, stub_method_name, make_request, key,
+                                          max_retries, timeout_s, refresher))
+            # keep the queue bounded: wait for the oldest call before submitting more
+            if len(window) >= max_in_flight:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+
+
+def _order_id_request(order_id, user_token):
+    request = order_pb2.OrderDetailByOrderIdRequest()
+    request.UserToken = user_token
+    request.OrderId = order_id
+    return request
+
+
+def get_order_details_by_order_ids(xapi_lib, order_ids, max_in_flight=16, max_retries=None, timeout_s=30):
+    """
+    GetOrderDetailByOrderId for every order id, see batch_unary.
+
+    Example:
+
+        for result in get_order_details_by_order_ids(EMSXAPILibrary.get(), order_ids):
+            print(result.key, result.error or result.response)
+    """
+    return batch_unary(xapi_lib, "GetOrderDetailByOrderId", _order_id_request, order_ids, max_in_flight,
+                       max_retries, timeout_s)
+
+
+def get_order_details_by_order_tags(xapi_lib, order_tags, event_type="", tags_per_request=100, max_in_flight=16,
+                                    max_retries=None, timeout_s=30):
+    """
+    GetOrderDetailByOrderTag for order_tags, tags_per_request tags per call, see batch_unary.
+
+    The key of each BatchResult is the tuple of tags of its request.
+    """
+    def make_request(tags, user_token):
+        request = order_pb2.OrderDetailByOrderTagRequest()
+        request.UserToken = user_token
+        request.OrderTags.extend(tags)
+        request.OrderEventType = event_type
+        return request
+
+    def chunks():
+        chunk = []
+        for tag in order_tags:
+            chunk.append(tag)
+            if len(chunk) == tags_per_request:
+                yield tuple(chunk)
+                chunk = []
+        if chunk:
+            yield tuple(chunk)
+
+    return batch_unary(xapi_lib, "GetOrderDetailByOrderTag", make_request, chunks(), max_in_flight,
+                       max_retries, timeout_s)
+
+
+async def _call_with_retry_async(lib, stub_method_name, make_request, key, max_retries, timeout_s, refresher):
+    attempt = 0
+    while True:
+        attempt += 1
+        token = lib.userToken
+        try:
+            stub_method = getattr(lib.get_order_service_stub(), stub_method_name)
+            return BatchResult(key, await stub_method(make_request(key, token), timeout=timeout_s), None, attempt)
+        except grpc.RpcError as rpc_error:
+            code = rpc_error.code()
+            if attempt > max_retries or (code not in RETRYABLE_CODES and code != grpc.StatusCode.UNAUTHENTICATED):
+                return BatchResult(key, None, rpc_error, attempt)
+            if code == grpc.StatusCode.UNAUTHENTICATED:
+                try:
+                    await refresher.refresh(token)
+                except LoginFailedException as login_error:
+                    return BatchResult(key, None, login_error, attempt)
+            else:
+                await asyncio.sleep(_backoff_seconds(lib, attempt))
+
+
+async def batch_unary_async(lib, stub_method_name, make_request, keys, max_in_flight=64, max_retries=None,
+                            timeout_s=30):
+    """
+    batch_unary for AsyncEMSXAPILibrary: an async iterator of BatchResult in the order of keys.
+    """
+    if max_retries is None:
+        max_retries = lib.config.maxRetryCount
+    refresher = _AsyncTokenRefresher(lib)
+    window = deque()
+    try:
+        for key in keys:
+            window.append(asyncio.ensure_future(_call_with_retry_async(
+                lib, stub_method_name, make_request, key, max_retries, timeout_s, refresher)))
+            if len(window) >= max_in_flight:
+                yield await window.popleft()
+        while window:
+            yield await window.popleft()
+    finally:
+        # the consumer stopped early: do not leave calls running
+        for task in window:
+            task.cancel()
+
+
+def get_order_details_by_order_ids_async(lib, order_ids, max_in_flight=64, max_retries=None, timeout_s=30):
+    """
+    Async iterator of BatchResult for GetOrderDetailByOrderId, see batch_unary_async.
+    """
+    return batch_unary_async(lib, "GetOrderDetailByOrderId", _order_id_request, order_ids, max_in_flight,
+                             max_retries, timeout_s)
@@ -0,0 +1,135 @@
+"""
+compact_future_option_archives.py
+
+This script removes duplicate CSV entries from future option zip archives.
+
+zipfile allows several members with the same name, and merged quarter archives
+written in append mode can hold several copies of the same CSV. Only the last
+copy is ever read, the other ones waste disk space and slow down every reader.
+
+Each zip file of every expiry folder is rewritten in place with only the last
+entry of each name. Members are copied without recompression and the new
+archive replaces the old one only once it is complete. Archives without
+duplicates are not touched.
+
+Example usage:
+
+    python scripts/compact_future_option_archives.py data/futureoption/cme/minute/cau
+
+    # compact several symbols with 8 worker processes
+    python scripts/compact_future_option_archives.py --workers 8 data/futureoption/cme/minute/cau data/futureoption/cme/minute/adu
+
+Output:
+
+- Bytes reclaimed per expiry folder and in total.
+- The number of zip files that could not be compacted; the exit status is 1 when there are any.
+"""
+
+import os
+import sys
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+try:
+    from .fop.walk import walk_symbol
+    from .fop.zip_rewrite import compact_zip
+except ImportError:  # executed directly: python scripts/<script>.py
+    from fop.walk import walk_symbol
+    from fop.zip_rewrite import compact_zip
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(levelname)s: %(message)s'
+)
+
+
+def find_zip_files(symbol_path: str) -> List[Tuple[str, str]]:
+    """
+    Return (expiry, zip path) pairs of every zip file under symbol_path/<expiry>/.
+    """
+    return sorted((item.expiry, item.zip_path) for item in walk_symbol(symbol_path))
+
+
+def _compact_task(zip_path: str):
+    """
+    Worker entry point: never raises, so one broken zip does not abort the pool.
+    """
+    try:
+        return compact_zip(zip_path), None
+    except Exception as e:
+        return 0, str(e)
+
+
+def compact_symbol(symbol_path: str, workers: int = 1) -> Tuple[Dict[str, int], int]:
+    """
+    Compact every zip file of a symbol folder.
+
+    Returns:
+        Tuple[Dict[str, int], int]: Bytes reclaimed per expiry folder, and the
+        number of zip files that failed (logged, left untouched).
+    """
+    zip_files = find_zip_files(symbol_path)
+    zip_paths = [zip_path for _, zip_path in zip_files]
+
+    if workers > 1 and len(zip_paths) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(_compact_task, zip_paths, chunksize=16))
+    else:
+        outcomes = [_compact_task(zip_path) for zip_path in zip_paths]
+
+    reclaimed: Dict[str, int] = {}
+    errors = 0
+    for (expiry, zip_path), (reclaimed_bytes, error) in zip(zip_files, outcomes):
+        if error is not None:
+            logging.error(f"Error compacting {zip_path}: {error}")
+            errors += 1
+        reclaimed[expiry] = reclaimed.get(expiry, 0) + reclaimed_bytes
+    return reclaimed, errors
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Remove duplicate CSV entries from future option zip archives.")
+    parser.add_argument("paths", nargs="*",
+                        help="symbol folders, e.g. data/futureoption/cme/minute/adu")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of zip files compacted in parallel (default: 1)")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+
+    if not args.paths:
+        raise RuntimeError(
+            "No path argument provided. This script requires one or more symbol paths to run.\n"
+            "Example:\n  python3 scripts/compact_future_option_archives.py data/futureoption/cme/minute/adu"
+        )
+
+    total_reclaimed = 0
+    total_errors = 0
+    for provided_path in args.paths:
+        provided_path_abs = os.path.abspath(provided_path)
+        if not os.path.isdir(provided_path_abs):
+            logging.error(f"Provided path is not a directory: {provided_path_abs}")
+            total_errors += 1
+            continue
+
+        logging.info(f"Compacting provided path: {provided_path_abs}")
+        reclaimed, errors = compact_symbol(provided_path_abs, args.workers)
+        for expiry, reclaimed_bytes in sorted(reclaimed.items()):
+            logging.info(f"{expiry}: reclaimed {reclaimed_bytes} bytes")
+        total_reclaimed += sum(reclaimed.values())
+        total_errors += errors
+
+    if total_errors:
+        logging.error(f"Completed with {total_errors} error(s), reclaimed {total_reclaimed} bytes in total")
+        sys.exit(1)
+    logging.info(f"Done ✔ reclaimed {total_reclaimed} bytes in total")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""
+fix_and_merge_future_option.py
+
+Fix strike names and merge expiry folders into their quarter folders in a
+single pass: every source zip is read once and every destination zip is
+written once, instead of a full strike-fix pass into temp-output-directory
+followed by a full merge pass over that output.
+
+Usage (required):
+  python scripts/fix_and_merge_future_option.py [--fix {precision,cad}] [--no-merge] [--workers N]
+      [--codec CODEC] [--level N] [--resume] [--verify] [--metrics FILE] [--profile FILE] [--tracemalloc]
+      <path1> [<path2> ...]
+
+Each provided path should be a symbol folder:
+  data/futureoption/<exchange>/minute/<symbol>
+
+Member transforms, applied in order to the member names of every source zip:
+
+- --fix precision: strike precision fix of fix_missed_strike_price_precision.py
+- --fix cad: CAD strike rescaling of fix_cad_future_strike.py
+
+Without --fix every fix that has a rule for the symbol is applied. Unless
+--no-merge is given, every non-quarter expiry folder is re-targeted to its
+quarter folder (see merge_future_option_expiry.py), duplicate member names
+keeping the last one in expiry order.
+
+Output is written to "temp-output-directory" in the same relative structure
+as the source folders. --verify compares that output with the sources
+instead of writing (CRC32 and sizes from the central directories, --workers
+processes). --resume records every finished source zip in a journal there
+and skips the zips already recorded. --metrics FILE saves a JSON run summary
+with the p50/p99 latency per destination zip.
+
+Importable: run(paths, out_root, fixes=..., merge=..., workers=...) returns a
+RunResult instead of logging a summary, verify(...) the verification errors.
+"""
+
+import os
+import sys
+import argparse
+import functools
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List
+
+try:
+    from . import fix_cad_future_strike, fix_missed_strike_price_precision
+    from .merge_future_option_expiry import (
+        MergeStep, check_symbol_path, collect_merge_groups, get_sorted_expiry_folders, plan_merge)
+    from .fop.journal import Journal
+    from .fop.metrics import ArchiveMetrics, RunMetrics, RunResult, add_metrics_arguments, profiling
+    from .fop.pipeline import GroupResult, TransformChain, rewrite_group
+    from .fop.pool import submit_bounded
+    from .fop.verify import report, verify_groups
+    from .fop.zip_rewrite import DEFAULT_COMPRESSION, add_compression_arguments, compression_from_args
+except ImportError:  # executed directly: python scripts/<script>.py
+    import fix_cad_future_strike
+    import fix_missed_strike_price_precision
+    from merge_future_option_expiry import (
+        MergeStep, check_symbol_path, collect_merge_groups, get_sorted_expiry_folders, plan_merge)
+    from fop.journal import Journal
+    from fop.metrics import ArchiveMetrics, RunMetrics, RunResult, add_metrics_arguments, profiling
+    from fop.pipeline import GroupResult, TransformChain, rewrite_group
+    from fop.pool import submit_bounded
+    from fop.verify import report, verify_groups
+    from fop.zip_rewrite import DEFAULT_COMPRESSION, add_compression_arguments, compression_from_args
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(levelname)s: %(message)s'
+)
+
+JOURNAL_FILE_NAME = "fix-and-merge-journal.jsonl"
+
+
+def precision_transform(symbol: str):
+    rule = fix_missed_strike_price_precision.StrikeScalingFactors.get(symbol)
+    if rule is None:
+        return None
+    return functools.partial(fix_missed_strike_price_precision.resolve_member_names,
+                             strike_scaling_factor_rule=rule)
+
+
+def cad_transform(symbol: str):
+    rules = fix_cad_future_strike.StrikeScalingFactors.get(symbol)
+    if rules is None:
+        return None
+    return functools.partial(fix_cad_future_strike.resolve_member_names,
+                             strike_scaling_rules=rules)
+
+
+# --fix name -> factory returning the member transform of a symbol, None without a rule
+FIXES = {
+    "precision": precision_transform,
+    "cad": cad_transform,
+}
+
+
+def build_transform(symbol: str, fixes: List[str] = None) -> TransformChain:
+    """
+    Chain the requested fixes for symbol; without fixes, every fix with a rule for it.
+
+    Raises:
+        RuntimeError: A requested fix has no rule for symbol.
+    """
+    transforms = []
+    for name in fixes or FIXES:
+        transform = FIXES[name](symbol)
+        if transform is None:
+            if fixes:
+                raise RuntimeError(f"No '{name}' fix configured for symbol '{symbol}'")
+            continue
+        transforms.append(transform)
+    return TransformChain(transforms)
+
+
+def plan_groups(src_root: str, out_root: str, data_root: str = "data", merge: bool = True,
+                journal: Journal = None) -> Dict[str, List[str]]:
+    """
+    Map every destination zip to its source zips, in expiry order.
+
+    With merge=False every expiry folder keeps its own name.
+    """
+    expiries = get_sorted_expiry_folders(src_root)
+    steps = plan_merge(expiries) if merge else [MergeStep(exp, exp) for exp in expiries]
+    return collect_merge_groups(src_root, out_root, data_root, steps, journal)
+
+
+def _rewrite_group_task(src_zips, dst_zip, transform, compression):
+    """
+    Worker entry point: never raises, so one broken zip does not abort the pool.
+
+    Returns (dst_zip, src_zips, result, error, ArchiveMetrics or None on error).
+    """
+    started = time.perf_counter()
+    try:
+        result = rewrite_group(src_zips, dst_zip, transform, compression)
+    except Exception as e:
+        return dst_zip, src_zips, None, str(e), None
+    metrics = ArchiveMetrics.measure(src_zips, dst_zip, time.perf_counter() - started,
+                                     result.total, result.renamed)
+    return dst_zip, src_zips, result, None, metrics
+
+
+def run_groups(groups: Dict[str, List[str]], transform: TransformChain, compression,
+               workers: int = 1, journal: Journal = None, metrics: RunMetrics = None) -> GroupResult:
+    """
+    Write every destination zip of groups and sum their counters.
+
+    With workers > 1 whole destinations are dispatched to a process pool, at
+    most 2 * workers of them (and their pickled transform) ahead of the
+    results. With a journal, the sources of every finished destination are
+    recorded (by this process only, so the journal has a single writer). With
+    metrics, the timing and sizes of every destination are added to it.
+    """
+    summary = GroupResult()
+    errors = 0
+    tasks = ((src_zips, dst_zip, transform, compression) for dst_zip, src_zips in groups.items())
+
+    if workers > 1 and len(groups) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for _, outcome in submit_bounded(executor, _rewrite_group_task, tasks, 2 * workers):
+                errors += _collect(summary, journal, metrics, *outcome)
+    else:
+        for task in tasks:
+            errors += _collect(summary, journal, metrics, *_rewrite_group_task(*task))
+
+    logging.info(f"Summary: renamed {summary.renamed} and replaced {summary.replaced} of "
+                 f"{summary.total} CSV files into {len(groups)} zip files ({errors} failed)")
+    return summary
+
+
+def _collect(summary: GroupResult, journal: Journal, metrics: RunMetrics,
+             dst_zip, src_zips, result, error, archive_metrics) -> int:
+    if error is not None:
+        logging.error(f"Error writing {dst_zip}: {error}")
+        if metrics is not None:
+            metrics.add_failure(f"Error writing {dst_zip}: {error}")
+        return 1
+    if metrics is not None:
+        metrics.add(archive_metrics)
+    summary.renamed += result.renamed
+    summary.replaced += result.replaced
+    summary.total += result.total
+    if journal is not None:
+        for src_zip in src_zips:
+            journal.record(src_zip, dst_zip)
+    return 0
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Fix future option strikes and merge expiry folders in one pass.")
+    parser.add_argument("paths", nargs="*",
+                        help="symbol folders, e.g. data/futureoption/cme/minute/euu")
+    parser.add_argument("--fix", action="append", choices=list(FIXES),
+                        help="member transform to apply, in order; repeatable (default: every fix of the symbol)")
+    parser.add_argument("--no-merge", dest="merge", action="store_false",
+                        help="keep every expiry folder instead of merging it into its quarter")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of destination zips written in parallel (default: 1)")
+    add_compression_arguments(parser)
+    parser.add_argument("--resume", action="store_true",
+                        help="skip zips recorded as finished in the output journal and record new ones")
+    parser.add_argument("--verify", action="store_true",
+                        help="compare the CRC32 and sizes of an earlier run's output with the sources, do not write")
+    add_metrics_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def _prepare_path(provided_path: str, fixes: List[str] = None):
+    """
+    Validate a symbol folder and build its transform.
+
+    Returns:
+        Tuple[str, str, TransformChain]: (absolute path, data root, transform).
+
+    Raises:
+        RuntimeError: Invalid path, or a requested fix without a rule for the symbol.
+    """
+    parts = check_symbol_path(provided_path)
+    return os.path.abspath(provided_path), parts[0], build_transform(parts[4], fixes)
+
+
+def run(paths: Iterable[str], out_root: str, fixes: List[str] = None, merge: bool = True, workers: int = 1,
+        compression=DEFAULT_COMPRESSION, resume: bool = False, metrics: RunMetrics = None) -> RunResult:
+    """
+    Fix and merge every symbol folder into out_root in a single pass.
+
+    Library entry point of the script: progress goes to logging only and the
+    outcome is returned. Invalid paths, symbols without the requested fixes
+    and failed destination zips are reported in RunResult.errors and do not
+    stop the other ones.
+
+    Args:
+        paths (Iterable[str]): Symbol folders, data/futureoption/<exchange>/minute/<symbol>.
+        out_root (str): Output directory, receiving futureoption/<exchange>/minute/<symbol>.
+        fixes (List[str]): Names of FIXES to apply in order, default every fix of the symbol.
+        merge (bool): Merge the expiry folders into their quarter folders.
+        resume (bool): Skip (and record) finished source zips in a journal inside out_root.
+        metrics (RunMetrics): Collector to fill, a new one by default.
+    """
+    if workers < 1:
+        raise RuntimeError(f"workers must be at least 1, got {workers}")
+    metrics = metrics if metrics is not None else RunMetrics()
+    os.makedirs(out_root, exist_ok=True)
+    journal = Journal(os.path.join(out_root, JOURNAL_FILE_NAME)) if resume else None
+
+    for provided_path in paths:
+        try:
+            provided_path_abs, data_root, transform = _prepare_path(provided_path, fixes)
+        except RuntimeError as e:
+            metrics.add_error(str(e))
+            continue
+        logging.info(f"Processing provided path: {provided_path_abs} "
+                     f"({len(transform)} member transforms, merge: {merge})")
+        groups = plan_groups(provided_path_abs, out_root, data_root, merge, journal)
+        run_groups(groups, transform, compression, workers, journal, metrics)
+    return metrics.result(out_root)
+
+
+def verify(paths: Iterable[str], out_root: str, fixes: List[str] = None, merge: bool = True,
+           workers: int = 1) -> List[str]:
+    """
+    Compare the output of an earlier run with its sources; return the error messages.
+    """
+    error_messages = []
+    for provided_path in paths:
+        try:
+            provided_path_abs, data_root, transform = _prepare_path(provided_path, fixes)
+        except RuntimeError as e:
+            error_messages.append(str(e))
+            continue
+        logging.info(f"Verifying provided path: {provided_path_abs}")
+        groups = plan_groups(provided_path_abs, out_root, data_root, merge)
+        results = verify_groups(((src_zips, dst_zip, transform) for dst_zip, src_zips in groups.items()),
+                                workers)
+        if report(results, logging.info):
+            error_messages.append(f"Verification failed for: {provided_path_abs}")
+    return error_messages
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+
+    if not args.paths:
+        raise RuntimeError(
+            "No path argument provided. This script requires one or more symbol paths to run.\n"
+            "Example:\n  python3 scripts/fix_and_merge_future_option.py data/futureoption/cme/minute/euu"
+        )
+    if args.workers < 1:
+        raise RuntimeError(f"--workers must be at least 1, got {args.workers}")
+
+    temp_output_directory = os.path.join(os.path.dirname(
+        os.path.abspath(__file__)), "temp-output-directory")
+    metrics = RunMetrics()
+
+    with profiling(args.profile, args.tracemalloc, logging.info):
+        if args.verify:
+            error_messages = verify(args.paths, temp_output_directory, args.fix, args.merge, args.workers)
+        else:
+            error_messages = run(args.paths, temp_output_directory, args.fix, args.merge, args.workers,
+                                 compression_from_args(args), args.resume, metrics).errors
+
+    if args.metrics and not args.verify:
+        metrics.write_json(args.metrics)
+        logging.info(f"Metrics written to: {args.metrics}")
+
+    if error_messages:
+        logging.error("Completed with %d error(s):", len(error_messages))
+        for msg in error_messages:
+            logging.error(msg)
+    else:
+        logging.info("Done ✔")
+
+
+if __name__ == "__main__":
+    main()
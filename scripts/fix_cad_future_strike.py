@@ -2,26 +2,86 @@
 run_by_path.py
 
 Usage (required):
-  python run_by_path.py <path1> [<path2> ...]
+  python run_by_path.py [--scan-workers N] [--skip-unchanged] [--codec CODEC] [--level N] [--resume] [--plan [--manifest FILE]] [--verify [--workers N]]
+      [--metrics FILE] [--profile FILE] [--tracemalloc] <path1> [<path2> ...]
 
 Each provided path should be a symbol folder, e.g.:
   futureoption/cbot/minute/ozc [futureoption/cbot/minute/oym ...]
 
 If no path is provided the script will raise an exception and exit
 (immediate fail-safe to avoid processing all data by accident).
+
+--plan only reads the central directory of every zip and reports how many
+files would be renamed per zip and per expiry, plus a JSON manifest, without
+writing any zip.
+
+--codec and --level choose how rewritten members are compressed (default:
+deflated at the default level).
+
+Expiry folders are listed with os.scandir by --scan-workers threads
+(default: 4) and every zip is processed as soon as it is found.
+
+--verify checks the output of an earlier run instead of writing it, by
+comparing the CRC32 and sizes of the source and output central directories
+under the applied renames (--workers processes, default: CPU count). Pass
+--skip-unchanged again when verifying a --skip-unchanged run, so zips it left
+out are not failures.
+
+--metrics FILE writes a JSON run summary (per-zip latency p50/p99, bytes
+in/out, member and rename counts); --profile FILE and --tracemalloc profile
+the run with cProfile and tracemalloc.
+
+--resume records every finished zip in a journal in the output directory
+and skips the zips already recorded there.
+
+Zips in which no file is renamed are hard-linked into the output tree
+instead of being rewritten; --skip-unchanged leaves them out entirely.
+
+Output goes to temp-output-directory next to this script (OUT_BASE); library
+callers use run(paths, out_root) instead, which returns a RunResult.
 """
 
 import os
-import re
 import sys
+import argparse
+import functools
+import time
+from bisect import bisect_right
 from datetime import datetime
-from zipfile import ZipFile, ZIP_DEFLATED
+from zipfile import ZipFile
 from decimal import Decimal
+from typing import Callable, Iterable
+
+try:
+    from .fop.filename import parse_fop_filename
+    from .fop.journal import Journal
+    from .fop.metrics import (
+        ArchiveMetrics, LineBuffer, RunMetrics, RunResult, ZipProcessResult, add_metrics_arguments, profiling)
+    from .fop.plan import plan_zip, print_plan, write_manifest
+    from .fop.verify import report, verify_groups
+    from .fop.walk import relative_symbol_path, walk_symbol
+    from .fop.zip_rewrite import (
+        DEFAULT_COMPRESSION, Compression, add_compression_arguments, atomic_zip, compression_from_args,
+        copy_member, place_unchanged)
+except ImportError:  # executed directly: python scripts/<script>.py
+    from fop.filename import parse_fop_filename
+    from fop.journal import Journal
+    from fop.metrics import (
+        ArchiveMetrics, LineBuffer, RunMetrics, RunResult, ZipProcessResult, add_metrics_arguments, profiling)
+    from fop.plan import plan_zip, print_plan, write_manifest
+    from fop.verify import report, verify_groups
+    from fop.walk import relative_symbol_path, walk_symbol
+    from fop.zip_rewrite import (
+        DEFAULT_COMPRESSION, Compression, add_compression_arguments, atomic_zip, compression_from_args,
+        copy_member, place_unchanged)
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # Output base (single global folder next to script)
-OUT_BASE = os.path.join(SCRIPT_DIR, "/temp-output-directory")
+OUT_BASE = os.path.join(SCRIPT_DIR, "temp-output-directory")
+
+# resumable runs record finished zips here, inside the output directory
+JOURNAL_FILE_NAME = "fix_cad_future_strike.journal.jsonl"
 
 DEFAULT_START_DATE = "19990101"
 DEFAULT_END_DATE = "99991231"
@@ -31,33 +91,74 @@ def to_date(yyyymmdd: str):
     return datetime.strptime(yyyymmdd, "%Y%m%d").date()
 
 
+@functools.lru_cache(maxsize=65_536)
+def to_date_key(yyyymmdd: str) -> int:
+    """
+    Validate a YYYYMMDD date once and return it as the integer YYYYMMDD.
+    """
+    to_date(yyyymmdd)  # raises ValueError for invalid dates
+    return int(yyyymmdd)
+
+
 class StrikeScalingRule:
     def __init__(self, start_date, end_date, strike_scaling_factor):
         self.start_date = to_date(start_date)
         self.end_date = to_date(end_date)
+        self.start_key = to_date_key(start_date)
+        self.end_key = to_date_key(end_date)
         self.factor = strike_scaling_factor
 
     def applies_to(self, date: str) -> bool:
-        converted_date = to_date(date)
-        return self.start_date <= converted_date <= self.end_date
+        return self.start_key <= to_date_key(date) <= self.end_key
 
     def __repr__(self):
         return (f"StrikeScalingRule(start_date={self.start_date}, "
                 f"end_date={self.end_date}, factor={self.factor})")
 
 
+class StrikeScalingRules:
+    """
+    Date-ranged strike scaling rules of one symbol.
+
+    The rules are kept sorted by start date in an interval index and must not
+    overlap; the rule of a file date is found with a bisect on the integer
+    YYYYMMDD start dates.
+    """
+
+    def __init__(self, *rules: StrikeScalingRule):
+        self.rules = sorted(rules, key=lambda rule: rule.start_key)
+        for previous, rule in zip(self.rules, self.rules[1:]):
+            if rule.start_key <= previous.end_key:
+                raise ValueError(
+                    f"Overlapping strike scaling rules: {previous} and {rule}")
+        self._start_keys = [rule.start_key for rule in self.rules]
+
+    def find(self, date: str):
+        """
+        Return the rule covering the YYYYMMDD date, or None.
+        """
+        date_key = to_date_key(date)
+        index = bisect_right(self._start_keys, date_key) - 1
+        if index >= 0 and date_key <= self.rules[index].end_key:
+            return self.rules[index]
+        return None
+
+    def __repr__(self):
+        return f"StrikeScalingRules({', '.join(repr(rule) for rule in self.rules)})"
+
+
 class StrikeScalingFactors:
     DATA = {
         # cme
-        "cau": StrikeScalingRule("20251208", DEFAULT_END_DATE, 10)
-        # "gbu": StrikeScalingRule(DEFAULT_START_DATE, "20210219", 0.1),
-        # "nq":  StrikeScalingRule("20200727", "20230317", 0.1),
-        # "jpu": StrikeScalingRule("20251113", DEFAULT_END_DATE, 100_000),
-        # "mnq": StrikeScalingRule(DEFAULT_START_DATE, "20230317", 0.1),
+        "cau": StrikeScalingRules(StrikeScalingRule("20251208", DEFAULT_END_DATE, 10)),
+        # "gbu": StrikeScalingRules(StrikeScalingRule(DEFAULT_START_DATE, "20210219", 0.1)),
+        # "nq":  StrikeScalingRules(StrikeScalingRule("20200727", "20230317", 0.1)),
+        # "jpu": StrikeScalingRules(StrikeScalingRule("20251113", DEFAULT_END_DATE, 100_000)),
+        # "mnq": StrikeScalingRules(StrikeScalingRule(DEFAULT_START_DATE, "20230317", 0.1)),
         # cbot
-        # "oub": StrikeScalingRule(DEFAULT_START_DATE, "20160304", 0.1),
-        # "ozb": StrikeScalingRule(DEFAULT_START_DATE, "20160304", 0.1),
-        # "ozl": StrikeScalingRule(DEFAULT_START_DATE, "20250207", 0.1),
+        # "oub": StrikeScalingRules(StrikeScalingRule(DEFAULT_START_DATE, "20160304", 0.1)),
+        # "ozb": StrikeScalingRules(StrikeScalingRule(DEFAULT_START_DATE, "20160304", 0.1)),
+        # "ozl": StrikeScalingRules(StrikeScalingRule(DEFAULT_START_DATE, "20250207", 0.1)),
     }
 
     @classmethod
@@ -65,20 +166,6 @@ class StrikeScalingFactors:
         return cls.DATA.get(symbol)
 
 
-# regexes to match "<prefix>_<strike>_<expiry>.csv"
-RE_FOP_FILENAME_PATTERN = re.compile(
-    r"^(?P<date>\d{8})_"              # 20251103
-    r"(?P<fop_ticker>[a-zA-Z0-9]+)_"     # adu
-    r"(?P<resolution>[a-zA-Z]+)_"     # minute
-    r"(?P<tick_type>[a-zA-Z]+)_"      # quote
-    r"(?P<style>[a-zA-Z]+)_"          # american
-    r"(?P<right>[a-zA-Z]+)_"          # call
-    r"(?P<strike>\d+(?:\.\d+)?)_"               # 6250000, 6.25
-    r"(?P<expiry>\d{6,8})"            # 20260306
-    r"(?P<extension>\.csv)$",         # .csv
-    re.IGNORECASE
-)
-
 LEAN_OPTION_SCALE = Decimal(10_000)
 
 
@@ -99,55 +186,236 @@ def scale_strike(original_strike_str, scaling) -> str:
     return format(scale_strike_price, 'f')
 
 
-def process_zip(zip_path, out_zip_path, strike_scaling_factor_rule: StrikeScalingRule):
-    print(f"--> Processing zip: {zip_path}")
+def _parse_member_name(member_name: str):
+    if not member_name.lower().endswith(".csv"):
+        raise RuntimeError(
+            f"Unexpected file type: {member_name} (expected a .csv file)")
+
+    parsed_filename = parse_fop_filename(member_name)
+
+    if parsed_filename is None:
+        raise ValueError(
+            f"Filename does not match expected FOP pattern: {member_name}")
+
+    return parsed_filename
+
+
+def _rescale_member_name(member_name: str, strike: str, rule_or_error) -> str:
+    try:
+        if isinstance(rule_or_error, Exception):
+            raise rule_or_error
+        if rule_or_error is not None:
+            new_strike = scale_strike(strike, rule_or_error.factor)
+            return member_name.replace(
+                f"_{strike}_", f"_{new_strike}_")
+    except Exception as e:
+        print(
+            f"WARNING  Could not scale strike in '{member_name}': {e}")
+
+    return member_name
+
+
+def resolve_member_names(member_names, strike_scaling_rules: StrikeScalingRules):
+    """
+    Return the corrected names of all the members of one archive.
+
+    The members of an archive share its date, so the rule lookup (and the date
+    parsing behind it) runs once per distinct date instead of once per member.
+    Raises RuntimeError/ValueError for members that are not FOP CSV files.
+    """
+    rules_by_date = {}
+    new_names = []
+    for member_name in member_names:
+        parsed_filename = _parse_member_name(member_name)
+        file_date = parsed_filename.date
+        if file_date not in rules_by_date:
+            try:
+                rules_by_date[file_date] = strike_scaling_rules.find(file_date)
+            except ValueError as e:
+                rules_by_date[file_date] = e
+        new_names.append(_rescale_member_name(
+            member_name, parsed_filename.strike, rules_by_date[file_date]))
+    return new_names
+
+
+def resolve_member_name(member_name: str, strike_scaling_rules: StrikeScalingRules) -> str:
+    """
+    Return the corrected name of a zip member, or member_name when it needs no fix.
+    """
+    return resolve_member_names([member_name], strike_scaling_rules)[0]
+
+
+def process_zip(zip_path, out_zip_path, strike_scaling_rules: StrikeScalingRules,
+                skip_unchanged: bool = False, compression: Compression = DEFAULT_COMPRESSION,
+                verbose: bool = True) -> ZipProcessResult:
+    """
+    Rewrite zip_path into out_zip_path with the CAD strikes rescaled.
+
+    Returns:
+        ZipProcessResult: The renamed, skipped and total member counters.
+    """
+    # the output of one zip is written at once, as in fix_missed_strike_price_precision
+    out = LineBuffer(enabled=verbose)
+    try:
+        return _process_zip(zip_path, out_zip_path, strike_scaling_rules, skip_unchanged, compression, out)
+    finally:
+        out.flush()
+
+
+def _process_zip(zip_path, out_zip_path, strike_scaling_rules, skip_unchanged, compression,
+                 out: LineBuffer) -> ZipProcessResult:
+    out.add(f"--> Processing zip: {zip_path}")
 
     counter_csv_files = 0
     counter_skip_files = 0
     counter_total_files = 0
     with ZipFile(zip_path, "r") as zip_file:
-        os.makedirs(os.path.dirname(out_zip_path), exist_ok=True)
-        with ZipFile(out_zip_path, "w", compression=ZIP_DEFLATED) as output_zip_file:
-            counter_total_files = len(zip_file.infolist())
-            for file_in_zip in zip_file.infolist():
-                original_name_file_csv = file_in_zip.filename
-                new_name_file_csv = original_name_file_csv
-
-                if not original_name_file_csv.lower().endswith(".csv"):
-                    raise RuntimeError(
-                        f"Unexpected file type: {original_name_file_csv} (expected a .csv file)")
-
-                filename_match = RE_FOP_FILENAME_PATTERN.match(
-                    original_name_file_csv)
-
-                if not filename_match:
-                    raise ValueError(
-                        f"Filename does not match expected FOP pattern: {original_name_file_csv}")
-
-                try:
-                    file_date = filename_match.group("date")
-                    if strike_scaling_factor_rule.applies_to(file_date):
-                        strike = filename_match.group("strike")
-                        new_strike = scale_strike(
-                            strike, strike_scaling_factor_rule.factor)
-                        new_name_file_csv = original_name_file_csv.replace(
-                            f"_{strike}_", f"_{new_strike}_")
-                        counter_csv_files += 1
-                    else:
-                        counter_skip_files += 1
-                except Exception as e:
-                    print(
-                        f"WARNING  Could not scale strike in '{original_name_file_csv}': {e}")
-
-                data_file_csv = zip_file.read(original_name_file_csv)
-                output_zip_file.writestr(new_name_file_csv, data_file_csv)
-
-    print(f"Processed {counter_csv_files} CSV files (skipped {counter_skip_files}) out of {counter_total_files} in: {out_zip_path}")
+        # decide every new name from the central directory before writing anything
+        files_in_zip = zip_file.infolist()
+        new_names_file_csv = resolve_member_names(
+            [file_in_zip.filename for file_in_zip in files_in_zip], strike_scaling_rules)
+        counter_total_files = len(files_in_zip)
+
+        if new_names_file_csv == [file_in_zip.filename for file_in_zip in files_in_zip] and \
+                all(compression.keeps(file_in_zip) for file_in_zip in files_in_zip):
+            placed = place_unchanged(zip_path, out_zip_path, skip_unchanged)
+            out.add(f"Unchanged ({placed}) {counter_total_files} CSV files in: {zip_path}")
+            return ZipProcessResult(0, counter_total_files, counter_total_files)
+
+        # written to a temporary file and renamed into place once complete, so an
+        # interrupted run never leaves a truncated zip in the output tree
+        with atomic_zip(out_zip_path) as output_zip_file:
+            for file_in_zip, new_name_file_csv in zip(files_in_zip, new_names_file_csv):
+                if new_name_file_csv != file_in_zip.filename:
+                    counter_csv_files += 1
+                else:
+                    counter_skip_files += 1
+
+                # members already in the requested codec are copied as-is (only the headers
+                # are rewritten), any other member is streamed and recompressed with a fixed buffer
+                copy_member(zip_file, file_in_zip, output_zip_file, new_name_file_csv,
+                            compression.compress_type, compression.compresslevel)
+
+    out.add(f"Processed {counter_csv_files} CSV files (skipped {counter_skip_files}) out of {counter_total_files} in: {out_zip_path}")
+    return ZipProcessResult(counter_csv_files, counter_skip_files, counter_total_files)
+
+
+def iter_work_items(provided_paths, out_root: str = OUT_BASE, scan_workers: int = 1,
+                    log: Callable[[str], None] = print, metrics: RunMetrics = None):
+    """
+    Lazily yield (symbol, expiry, zip_path, out_zip_path, rules) for every zip of the symbol folders.
+
+    Symbols without scaling rules are reported (and added to metrics.errors) and skipped.
+    """
+    for provided_path in provided_paths:
+        provided_path_abs = os.path.abspath(provided_path)
+        log(f"\n===== Processing provided path: {provided_path_abs} =====")
+
+        symbol = os.path.basename(provided_path_abs).lower()
+        strike_scaling_rules = StrikeScalingFactors.get(symbol)
+        if not strike_scaling_rules:
+            log(f"ERROR:: No scaling configured for symbol '{symbol}'")
+            if metrics is not None:
+                metrics.add_error(f"No scaling configured for symbol '{symbol}' ({provided_path_abs})")
+            continue
+
+        log(f"====== FOP ticker '{symbol}' | Strike scaling factor: '{strike_scaling_rules}'")
+
+        # mirror the path from its futureoption folder on to keep the output structure readable
+        rel_src = relative_symbol_path(provided_path_abs)
+
+        # expiry folders are listed by a thread pool, zips are handled as they are found
+        for _, expiry, zip_path in walk_symbol(provided_path_abs, scan_workers, symbol):
+            out_zip_path = os.path.join(out_root, rel_src, expiry, os.path.basename(zip_path))
+            yield symbol, expiry, zip_path, out_zip_path, strike_scaling_rules
+
+
+def _quiet(line: str):
+    pass
+
+
+def run(paths: Iterable[str], out_root: str = OUT_BASE, scan_workers: int = 4, skip_unchanged: bool = False,
+        compression: Compression = DEFAULT_COMPRESSION, resume: bool = False, verbose: bool = False,
+        metrics: RunMetrics = None) -> RunResult:
+    """
+    Rescale the CAD strikes of every zip of the symbol folders into out_root.
+
+    Library entry point of the script: nothing is printed unless verbose is set,
+    the outcome is returned instead. Paths that are not directories, symbols
+    without scaling rules and failed zips are reported in RunResult.errors and
+    do not stop the other ones.
+
+    Args:
+        paths (Iterable[str]): Symbol folders, e.g. data/futureoption/cme/minute/cau.
+        out_root (str): Output directory, the folders are mirrored from their
+            "futureoption" component on.
+        resume (bool): Skip (and record) finished zips in a journal inside out_root.
+        metrics (RunMetrics): Collector to fill, a new one by default.
+
+    Returns:
+        RunResult: The run summary, the metrics of every zip and the errors.
+    """
+    log = print if verbose else _quiet
+    metrics = metrics if metrics is not None else RunMetrics()
+    os.makedirs(out_root, exist_ok=True)
+    journal = Journal(os.path.join(out_root, JOURNAL_FILE_NAME)) if resume else None
+
+    symbol_paths = []
+    for path in paths:
+        if os.path.isdir(path):
+            symbol_paths.append(path)
+        else:
+            metrics.add_error(f"Provided path is not a directory: {os.path.abspath(path)}")
+
+    for _, _, zip_path, out_zip_path, strike_scaling_rules in iter_work_items(
+            symbol_paths, out_root, scan_workers, log, metrics):
+        if journal is not None and journal.is_done(zip_path):
+            log(f"Already done (journal): {zip_path}")
+            continue
+        started = time.perf_counter()
+        try:
+            result = process_zip(zip_path, out_zip_path, strike_scaling_rules,
+                                 skip_unchanged, compression, verbose)
+            if journal is not None:
+                journal.record(zip_path, out_zip_path)
+            metrics.add(ArchiveMetrics.measure(
+                [zip_path], out_zip_path, time.perf_counter() - started, result.total, result.renamed))
+        except Exception as e:
+            log(f"EXCEPTION: Error processing {zip_path}: {e}")
+            metrics.add_failure(f"Error processing {zip_path}: {e}")
+    return metrics.result(out_root)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Rescale CAD future option strikes in FOP zip files.")
+    parser.add_argument("paths", nargs="*",
+                        help="symbol folders, e.g. futureoption/cme/minute/cau")
+    parser.add_argument("--scan-workers", type=int, default=4,
+                        help="threads listing expiry folders concurrently (default: 4)")
+    parser.add_argument("--skip-unchanged", action="store_true",
+                        help="leave zips without renames out of the output instead of hard-linking them "
+                             "(with --verify: do not expect them in the output)")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip zips recorded as finished in the output journal and record new ones")
+    add_compression_arguments(parser)
+    parser.add_argument("--plan", action="store_true",
+                        help="only report the planned renames, do not write any zip")
+    parser.add_argument("--manifest",
+                        help="JSON manifest path for --plan (default: <OUT_BASE>/plan-manifest.json)")
+    parser.add_argument("--verify", action="store_true",
+                        help="compare the CRC32 and sizes of an earlier run's output with the sources, do not write")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="processes comparing zip files for --verify (default: CPU count)")
+    add_metrics_arguments(parser)
+    return parser.parse_args(argv)
 
 
 def main():
+    args = parse_args(sys.argv[1:])
+
     # Enforce that at least one path argument is provided.
-    if len(sys.argv) <= 1:
+    if not args.paths:
         # Throw an exception immediately per your requirement.
         raise RuntimeError(
             "No path argument provided. This script requires one or more symbol paths to run.\n"
@@ -158,43 +426,37 @@ def main():
     # Prepare output
     os.makedirs(OUT_BASE, exist_ok=True)
 
-    provided_paths = sys.argv[1:]
-    for provided_path in provided_paths:
-        provided_path_abs = os.path.abspath(provided_path)
-        print(f"\n===== Processing provided path: {provided_path_abs} =====")
-
-        if not os.path.isdir(provided_path_abs):
+    for provided_path in args.paths:
+        if not os.path.isdir(provided_path):
             raise RuntimeError(
-                f"Provided path is not a directory: {provided_path_abs}")
-
-        symbol = os.path.basename(provided_path_abs).lower()
-        strike_scaling_factor_rule = StrikeScalingFactors.get(symbol)
-        if not strike_scaling_factor_rule:
-            print(f"ERROR:: No scaling configured for symbol '{symbol}'")
-            continue
-
-        print(
-            f"====== FOP ticker '{symbol}' | Strike scaling factor: '{strike_scaling_factor_rule}'")
-
-        # preserve path starting after SCRIPT_DIR to make output structure readable
-        rel_src = os.path.relpath(provided_path_abs, SCRIPT_DIR)
-
-        for expiry in os.listdir(provided_path_abs):
-            expiry_path = os.path.join(provided_path_abs, expiry)
-            out_expiry = os.path.join(OUT_BASE, rel_src, expiry)
-            os.makedirs(out_expiry, exist_ok=True)
-
-            for file in os.listdir(expiry_path):
-                if not file.lower().endswith(".zip"):
-                    continue  # skip non-zip files
-
-                zip_path = os.path.join(expiry_path, file)
-                out_zip_path = os.path.join(out_expiry, file)
-                try:
-                    process_zip(zip_path, out_zip_path,
-                                strike_scaling_factor_rule)
-                except Exception as e:
-                    print(f"EXCEPTION: Error processing {zip_path}: {e}")
+                f"Provided path is not a directory: {os.path.abspath(provided_path)}")
+
+    if args.plan:
+        plans = [plan_zip(symbol, expiry, zip_path, functools.partial(
+                     resolve_member_names, strike_scaling_rules=strike_scaling_rules))
+                 for symbol, expiry, zip_path, _, strike_scaling_rules in iter_work_items(
+                     args.paths, OUT_BASE, args.scan_workers)]
+        print_plan(plans)
+        manifest_path = args.manifest or os.path.join(
+            OUT_BASE, "plan-manifest.json")
+        write_manifest(plans, manifest_path)
+        print(f"Plan manifest written to: {manifest_path}")
+    elif args.verify:
+        verify_tasks = [([zip_path], out_zip_path, functools.partial(
+                            resolve_member_names, strike_scaling_rules=strike_scaling_rules))
+                        for _, _, zip_path, out_zip_path, strike_scaling_rules in iter_work_items(
+                            args.paths, OUT_BASE, args.scan_workers)]
+        failed = report(verify_groups(verify_tasks, args.workers, args.skip_unchanged))
+        if failed:
+            raise RuntimeError(f"{failed} zip files failed verification")
+    else:
+        metrics = RunMetrics()
+        with profiling(args.profile, args.tracemalloc):
+            run(args.paths, OUT_BASE, args.scan_workers, args.skip_unchanged, compression_from_args(args),
+                args.resume, verbose=True, metrics=metrics)
+        if args.metrics:
+            metrics.write_json(args.metrics)
+            print(f"Metrics written to: {args.metrics}")
 
     print("\n========== All provided paths processed successfully ==========")
 
@@ -2,21 +2,89 @@
 fix_missed_strike_price_precision.py
 
 Usage (required):
-  python fix_missed_strike_price_precision.py <path1> [<path2> ...]
+  python fix_missed_strike_price_precision.py [--workers N] [--scan-workers N] [--skip-unchanged] [--codec CODEC] [--level N] [--resume] [--plan [--manifest FILE]] [--verify]
+      [--metrics FILE] [--profile FILE] [--tracemalloc] <path1> [<path2> ...]
 
 Each provided path should be a symbol folder, e.g.:
   futureoption/cbot/minute/ozc [futureoption/cbot/minute/oym ...]
 
+--workers N rewrites up to N zip files in parallel, each one in its own
+process (default: 1, sequential). A failing zip is reported and does not
+stop the other ones.
+
+Zips in which no file is renamed are hard-linked into the output tree
+(copied across filesystems) instead of being rewritten; --skip-unchanged
+leaves them out of the output entirely.
+
+--codec {keep,stored,deflated,bzip2,lzma} and --level N choose how rewritten
+members are compressed (default: deflated at the default level), e.g.
+--level 1 for fast temporary output, --level 9 for archival or --codec keep
+to raw-copy every member as it is.
+
+Expiry folders are listed with os.scandir by --scan-workers threads
+(default: 4) and every zip is processed as soon as it is found.
+
+--verify checks the output of an earlier run instead of writing: every
+output zip must hold exactly the source members under their fixed names, with
+the same CRC32 and size, read from the central directories only. It runs
+--workers processes, by default one per CPU. Pass --skip-unchanged again when
+verifying a --skip-unchanged run, so zips it left out are not failures.
+
+--resume records every finished zip (size, mtime, fingerprint) in a journal in
+the output directory and skips the zips already recorded there, so an
+interrupted run continues where it stopped.
+
+--metrics FILE writes a JSON run summary (per-zip latency p50/p99, bytes
+in/out, member and rename counts); --profile FILE runs under cProfile and
+--tracemalloc reports the memory peak and top allocation sites.
+
+--plan only reads the central directory of every zip and reports how many
+files would be renamed per zip and per expiry, without writing any zip. The
+JSON manifest is saved to --manifest (default:
+temp-output-directory/plan-manifest.json).
+
 If no path is provided the script will raise an exception and exit
 (immediate fail-safe to avoid processing all data by accident).
+
+run(paths, out_root, ...) does the same work without sys.argv or printing
+and returns a fop.metrics.RunResult (see fop_maintenance.py).
 """
 
 import os
-import re
 import sys
-from zipfile import ZipFile, ZIP_DEFLATED
+import argparse
+import functools
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable
+from zipfile import ZipFile
 from decimal import Decimal
 
+try:
+    from .fop.filename import RE_FOP_FILENAME_PATTERN, parse_fop_filename
+    from .fop.journal import Journal
+    from .fop.metrics import (
+        ArchiveMetrics, LineBuffer, RunMetrics, RunResult, ZipProcessResult, add_metrics_arguments, profiling)
+    from .fop.plan import plan_zip, print_plan, write_manifest
+    from .fop.pool import submit_bounded
+    from .fop.verify import report, verify_groups
+    from .fop.walk import relative_symbol_path, walk_symbol
+    from .fop.zip_rewrite import (
+        DEFAULT_COMPRESSION, Compression, add_compression_arguments, atomic_zip, compression_from_args,
+        copy_member, place_unchanged)
+except ImportError:  # executed directly: python scripts/<script>.py
+    from fop.filename import RE_FOP_FILENAME_PATTERN, parse_fop_filename
+    from fop.journal import Journal
+    from fop.metrics import (
+        ArchiveMetrics, LineBuffer, RunMetrics, RunResult, ZipProcessResult, add_metrics_arguments, profiling)
+    from fop.plan import plan_zip, print_plan, write_manifest
+    from fop.pool import submit_bounded
+    from fop.verify import report, verify_groups
+    from fop.walk import relative_symbol_path, walk_symbol
+    from fop.zip_rewrite import (
+        DEFAULT_COMPRESSION, Compression, add_compression_arguments, atomic_zip, compression_from_args,
+        copy_member, place_unchanged)
+
 
 class StrikeScalingRule:
     def __init__(self, strike_scaling_factor):
@@ -38,19 +106,8 @@ class StrikeScalingFactors:
         return cls.DATA.get(symbol)
 
 
-# regexes to match "<prefix>_<strike>_<expiry>.csv"
-RE_FOP_FILENAME_PATTERN = re.compile(
-    r"^(?P<date>\d{8})_"              # 20251103
-    r"(?P<fop_ticker>[a-zA-Z0-9]+)_"  # adu
-    r"(?P<resolution>[a-zA-Z]+)_"     # minute
-    r"(?P<tick_type>[a-zA-Z]+)_"      # quote
-    r"(?P<style>[a-zA-Z]+)_"          # american
-    r"(?P<right>[a-zA-Z]+)_"          # call
-    r"(?P<strike>\d+(?:\.\d+)?)_"     # 6250000, 6.25
-    r"(?P<expiry>\d{6,8})"            # 20260306
-    r"(?P<extension>\.csv)$",         # .csv
-    re.IGNORECASE
-)
+# resumable runs record finished zips here, inside the output directory
+JOURNAL_FILE_NAME = "fix_missed_strike_price_precision.journal.jsonl"
 
 DIVISOR = Decimal(10)
 REMAINDER_TWO = Decimal(2)
@@ -58,6 +115,12 @@ REMAINDER_SEVEN = Decimal(7)
 LEAN_OPTION_SCALE = Decimal(10_000)
 TRAILING_FIVE = Decimal(5)
 
+# the remainder is taken from strike / 10**4 (LEAN_OPTION_SCALE) * factor
+_LEAN_OPTION_SCALE_EXPONENT = 4
+
+# marks strikes that the fixed-point path does not reproduce exactly
+_DECIMAL_FALLBACK = object()
+
 
 def scale_strike(scaled_strike_file_name_format: Decimal, scaling: Decimal) -> str:
     next_decimal_position = scaling * Decimal(10)
@@ -68,66 +131,384 @@ def scale_strike(scaled_strike_file_name_format: Decimal, scaling: Decimal) -> s
     return str(scale_strike_price_file_name_format.normalize())
 
 
-def process_zip(zip_path, out_zip_path, strike_scaling_factor_rule: StrikeScalingRule):
-    print(f"--> Processing zip: {zip_path}")
+def _parse_member_name(member_name: str):
+    if not member_name.lower().endswith(".csv"):
+        raise RuntimeError(
+            f"Unexpected file type: {member_name} (expected a .csv file)")
+
+    parsed_filename = parse_fop_filename(member_name)
+
+    if parsed_filename is None:
+        raise ValueError(
+            f"Filename does not match expected FOP pattern: {member_name}")
+
+    return parsed_filename
+
+
+def resolve_member_name(member_name: str, strike_scaling_factor_rule: StrikeScalingRule) -> str:
+    """
+    Return the corrected name of a zip member, or member_name when it needs no fix.
+
+    Raises RuntimeError/ValueError for members that are not FOP CSV files.
+    """
+    parsed_filename = _parse_member_name(member_name)
+
+    try:
+        scaled_strike_file_name_format = Decimal(parsed_filename.strike)
+        # 11570 / 10_000 * 1_000
+        algo_seek_strike_format = scaled_strike_file_name_format / \
+            LEAN_OPTION_SCALE * strike_scaling_factor_rule.factor
+        remainder = algo_seek_strike_format % DIVISOR
+        if remainder == REMAINDER_TWO or remainder == REMAINDER_SEVEN:
+            new_strike = scale_strike(
+                scaled_strike_file_name_format, strike_scaling_factor_rule.factor)
+            return member_name.replace(
+                f"_{scaled_strike_file_name_format}_", f"_{new_strike}_")
+    except Exception as e:
+        print(
+            f"WARNING  Could not scale strike in '{member_name}': {e}")
+
+    return member_name
+
+
+def _power_of_ten_exponent(value: Decimal):
+    """
+    Return k when value == 10**k, otherwise None.
+    """
+    sign, digits, exponent = value.normalize().as_tuple()
+    if sign or digits != (1,):
+        return None
+    return exponent
+
+
+def resolve_member_names(member_names, strike_scaling_factor_rule: StrikeScalingRule):
+    """
+    Batch version of resolve_member_name for all the members of one archive.
+
+    Strikes are handled as exact integer fixed-point numbers (digits, decimal
+    places) instead of Decimal objects, which gives the same names as
+    resolve_member_name at a fraction of the cost. Factors that are not a power
+    of ten and strikes written in a non-canonical way (leading zeros) go
+    through resolve_member_name.
+    """
+    factor_exponent = _power_of_ten_exponent(strike_scaling_factor_rule.factor)
+    if factor_exponent is None:
+        return [resolve_member_name(member_name, strike_scaling_factor_rule)
+                for member_name in member_names]
+
+    # calls and puts (and every tick type) repeat the same strikes, classify each one once
+    new_strikes = {}
+    new_names = []
+    for member_name in member_names:
+        strike = _parse_member_name(member_name).strike
+        if strike not in new_strikes:
+            new_strikes[strike] = _rescaled_strike(strike, factor_exponent)
+
+        new_strike = new_strikes[strike]
+        if new_strike is _DECIMAL_FALLBACK:
+            new_names.append(resolve_member_name(
+                member_name, strike_scaling_factor_rule))
+        elif new_strike is None:
+            new_names.append(member_name)
+        else:
+            new_names.append(member_name.replace(f"_{strike}_", f"_{new_strike}_"))
+
+    return new_names
+
+
+def _rescaled_strike(strike: str, factor_exponent: int):
+    """
+    Fixed-point equivalent of the remainder check and scale_strike for factor 10**factor_exponent.
+
+    Returns the new strike text, None when the strike is kept, or
+    _DECIMAL_FALLBACK when only the Decimal path gives the exact same text.
+    """
+    integer_digits, _, fraction_digits = strike.partition(".")
+    if integer_digits[0] == "0":
+        return _DECIMAL_FALLBACK  # str(Decimal) drops leading zeros
+
+    strike_digits = int(integer_digits + fraction_digits)
+    places = len(fraction_digits)
+
+    shift = factor_exponent - places - _LEAN_OPTION_SCALE_EXPONENT
+    if shift >= 0:
+        algo_seek_strike = strike_digits * 10 ** shift
+    else:
+        algo_seek_strike, fraction = divmod(strike_digits, 10 ** -shift)
+        if fraction:
+            return None  # remainder is not a whole number
+
+    if algo_seek_strike % 10 not in (2, 7):
+        return None
+
+    # scale_strike: strike + 5 / 10**(k+1) * 10_000, kept on `new_places` decimals
+    new_places = max(places, factor_exponent - 3, 0)
+    new_strike_digits = strike_digits * 10 ** (new_places - places) + \
+        5 * 10 ** (3 - factor_exponent + new_places)
+    text = str(new_strike_digits).rjust(new_places + 1, "0")
+    if new_places:
+        new_integer, new_fraction = text[:-new_places], text[-new_places:].rstrip("0")
+    else:
+        new_integer, new_fraction = text, ""
+
+    if not new_fraction and new_integer.endswith("0"):
+        return _DECIMAL_FALLBACK  # Decimal.normalize() switches to exponent notation
+
+    return f"{new_integer}.{new_fraction}" if new_fraction else new_integer
+
+
+def process_zip(zip_path, out_zip_path, strike_scaling_factor_rule: StrikeScalingRule,
+                skip_unchanged: bool = False, compression: Compression = DEFAULT_COMPRESSION,
+                verbose: bool = True) -> ZipProcessResult:
+    # the output of one zip is written at once: one print per renamed member
+    # costs more than the rename itself on archives with thousands of members
+    out = LineBuffer(enabled=verbose)
+    try:
+        return _process_zip(zip_path, out_zip_path, strike_scaling_factor_rule,
+                            skip_unchanged, compression, out)
+    finally:
+        out.flush()
+
+
+def _process_zip(zip_path, out_zip_path, strike_scaling_factor_rule, skip_unchanged, compression,
+                 out: LineBuffer) -> ZipProcessResult:
+    out.add(f"--> Processing zip: {zip_path}")
 
     counter_csv_files = 0
     counter_skip_files = 0
     counter_total_files = 0
     with ZipFile(zip_path, "r") as zip_file:
-        os.makedirs(os.path.dirname(out_zip_path), exist_ok=True)
-        with ZipFile(out_zip_path, "w", compression=ZIP_DEFLATED) as output_zip_file:
-            counter_total_files = len(zip_file.infolist())
-            for file_in_zip in zip_file.infolist():
+        # decide every new name from the central directory before writing anything
+        files_in_zip = zip_file.infolist()
+        new_names_file_csv = resolve_member_names(
+            [file_in_zip.filename for file_in_zip in files_in_zip], strike_scaling_factor_rule)
+        counter_total_files = len(files_in_zip)
+
+        if new_names_file_csv == [file_in_zip.filename for file_in_zip in files_in_zip] and \
+                all(compression.keeps(file_in_zip) for file_in_zip in files_in_zip):
+            placed = place_unchanged(zip_path, out_zip_path, skip_unchanged)
+            out.add(f"Unchanged ({placed}) {counter_total_files} CSV files in: {zip_path}")
+            return ZipProcessResult(0, counter_total_files, counter_total_files)
+
+        # written to a temporary file and renamed into place once complete, so an
+        # interrupted run never leaves a truncated zip in the output tree
+        with atomic_zip(out_zip_path) as output_zip_file:
+            for file_in_zip, new_name_file_csv in zip(files_in_zip, new_names_file_csv):
                 original_name_file_csv = file_in_zip.filename
-                new_name_file_csv = original_name_file_csv
-
-                if not original_name_file_csv.lower().endswith(".csv"):
-                    raise RuntimeError(
-                        f"Unexpected file type: {original_name_file_csv} (expected a .csv file)")
-
-                filename_match = RE_FOP_FILENAME_PATTERN.match(
-                    original_name_file_csv)
-
-                if not filename_match:
-                    raise ValueError(
-                        f"Filename does not match expected FOP pattern: {original_name_file_csv}")
-
-                try:
-                    scaled_strike_file_name_format = Decimal(
-                        str(filename_match.group("strike")))
-                    # 11570 / 10_000 * 1_000
-                    algo_seek_strike_format = scaled_strike_file_name_format / \
-                        LEAN_OPTION_SCALE * strike_scaling_factor_rule.factor
-                    remainder = algo_seek_strike_format % DIVISOR
-                    if remainder == REMAINDER_TWO or remainder == REMAINDER_SEVEN:
-                        new_strike = scale_strike(
-                            scaled_strike_file_name_format, strike_scaling_factor_rule.factor)
-                        new_name_file_csv = original_name_file_csv.replace(
-                            f"_{scaled_strike_file_name_format}_", f"_{new_strike}_")
-                        print(f"rename: {original_name_file_csv} => {new_name_file_csv}")
-                        counter_csv_files += 1
-                    else:
-                        counter_skip_files += 1
-                except Exception as e:
-                    print(
-                        f"WARNING  Could not scale strike in '{original_name_file_csv}': {e}")
-
-                data_file_csv = zip_file.read(original_name_file_csv)
-                output_zip_file.writestr(new_name_file_csv, data_file_csv)
-
-    print(f"Processed {counter_csv_files} CSV files (skipped {counter_skip_files}) out of {counter_total_files} in: {out_zip_path}")
+
+                if new_name_file_csv != original_name_file_csv:
+                    out.add(f"rename: {original_name_file_csv} => {new_name_file_csv}")
+                    counter_csv_files += 1
+                else:
+                    counter_skip_files += 1
+
+                # members already in the requested codec are copied as-is (only the headers
+                # are rewritten), any other member is streamed and recompressed with a fixed buffer
+                copy_member(zip_file, file_in_zip, output_zip_file, new_name_file_csv,
+                            compression.compress_type, compression.compresslevel)
+
+    out.add(f"Processed {counter_csv_files} CSV files (skipped {counter_skip_files}) out of {counter_total_files} in: {out_zip_path}")
+    return ZipProcessResult(counter_csv_files, counter_skip_files, counter_total_files)
+
+
+def _process_zip_task(src_zip_path, dst_zip_path, strike_scaling_factor_rule, skip_unchanged=False,
+                      compression=DEFAULT_COMPRESSION, verbose=True):
+    """
+    Worker entry point: never raises, so one broken zip does not abort the pool.
+
+    Returns (src_zip_path, result, error, ArchiveMetrics or None on error).
+    """
+    started = time.perf_counter()
+    try:
+        result = process_zip(src_zip_path, dst_zip_path,
+                             strike_scaling_factor_rule, skip_unchanged, compression, verbose)
+    except Exception as e:
+        return src_zip_path, None, str(e), None
+    metrics = ArchiveMetrics.measure([src_zip_path], dst_zip_path, time.perf_counter() - started,
+                                     result.total, result.renamed)
+    return src_zip_path, result, None, metrics
+
+
+def run_tasks(tasks, workers: int = 1, journal: Journal = None, metrics: RunMetrics = None,
+              log: Callable[[str], None] = print) -> ZipProcessResult:
+    """
+    Process (src_zip_path, dst_zip_path, rule[, skip_unchanged[, compression[, verbose]]]) tasks and
+    sum their counters.
+
+    tasks may be a lazy iterable (see fop.walk.walk_symbol): it is consumed
+    while zips are processed, so processing overlaps the tree scan, and at
+    most 2 * workers tasks are submitted ahead of the results (the pool queue
+    never holds the whole tree).
+
+    With workers > 1 whole zip files are dispatched to a process pool, so the
+    deflate recompression runs on several cores at once. With a journal, zips
+    finished by an earlier run are skipped and every finished zip is recorded
+    (by this process only, so the journal has a single writer). With metrics,
+    the timing and sizes of every zip are added to it, and every failure is
+    recorded in metrics.errors.
+    """
+    summary = ZipProcessResult()
+    errors = 0
+    counters = {"tasks": 0, "done": 0}
+
+    def pending_tasks():
+        for task in tasks:
+            counters["tasks"] += 1
+            if journal is not None and journal.is_done(task[0]):
+                counters["done"] += 1
+                continue
+            yield task
+
+    def finish(dst_zip_path, src_zip_path, result, error, archive_metrics):
+        if error is None and journal is not None:
+            journal.record(src_zip_path, dst_zip_path)
+        if metrics is not None:
+            if error is None:
+                metrics.add(archive_metrics)
+            else:
+                metrics.add_failure(f"Error processing {src_zip_path}: {error}")
+        return _collect(summary, src_zip_path, result, error, log)
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for task, outcome in submit_bounded(executor, _process_zip_task, pending_tasks(), 2 * workers):
+                errors += finish(task[1], *outcome)
+    else:
+        for task in pending_tasks():
+            errors += finish(task[1], *_process_zip_task(*task))
+
+    if journal is not None:
+        log(f"Journal: {counters['done']} of {counters['tasks']} zip files already done ({journal.path})")
+    log(f"Summary: renamed {summary.renamed} CSV files (skipped {summary.skipped}) out of {summary.total} "
+        f"in {counters['tasks'] - counters['done']} zip files ({errors} failed)")
+    return summary
+
+
+def _collect(summary: ZipProcessResult, src_zip_path, result, error, log=print) -> int:
+    if error is not None:
+        log(f"EXCEPTION: Error processing {src_zip_path}: {error}")
+        return 1
+    summary.renamed += result.renamed
+    summary.skipped += result.skipped
+    summary.total += result.total
+    return 0
+
+
+def iter_work_items(provided_paths, temp_output_directory, scan_workers: int = 1,
+                    log: Callable[[str], None] = print, metrics: RunMetrics = None):
+    """
+    Lazily yield (WorkItem, src_zip_path, dst_zip_path, rule) for every zip of the symbol folders.
+
+    Symbols without a scaling rule are reported (and added to metrics.errors) and skipped.
+    """
+    for provided_path in provided_paths:
+        # <path_to_folder>/data/futureoption/cme/minute/euu
+        provided_path_abs = os.path.abspath(provided_path)
+        log(f"\n===== Processing provided path: {provided_path_abs} =====")
+
+        # euu
+        symbol = os.path.basename(provided_path_abs).lower()
+        strike_scaling_factor_rule = StrikeScalingFactors.get(symbol)
+        if not strike_scaling_factor_rule:
+            log(f"ERROR: No scaling configured for symbol '{symbol}'")
+            if metrics is not None:
+                metrics.add_error(f"No scaling configured for symbol '{symbol}' ({provided_path_abs})")
+            continue
+
+        log(
+            f"====== FOP ticker '{symbol}' | Strike scaling factor: '{strike_scaling_factor_rule}'")
+        # <path_to_folder>/data/futureoption/cme/minute/euu/<expiries>/<zips>
+        for item in walk_symbol(provided_path_abs, scan_workers, symbol):
+            # <path_to_folder>/temp-output-directory/futureoption/cme/minute/euu/202603/20251224_openinterest_american.zip
+            dst_zip_path = os.path.join(temp_output_directory, relative_symbol_path(provided_path_abs),
+                                        item.expiry, os.path.basename(item.zip_path))
+            yield item, item.zip_path, dst_zip_path, strike_scaling_factor_rule
+
+
+def _quiet(line: str):
+    pass
+
+
+def run(paths: Iterable[str], out_root: str, workers: int = 1, scan_workers: int = 4,
+        skip_unchanged: bool = False, compression: Compression = DEFAULT_COMPRESSION, resume: bool = False,
+        verbose: bool = False, metrics: RunMetrics = None) -> RunResult:
+    """
+    Fix the strike precision of every zip of the symbol folders into out_root.
+
+    Library entry point of the script: nothing is printed unless verbose is set,
+    the outcome is returned instead. Paths that are not directories and symbols
+    without a scaling rule are reported in RunResult.errors, like failed zips,
+    and do not stop the other ones.
+
+    Args:
+        paths (Iterable[str]): Symbol folders, e.g. data/futureoption/cme/minute/euu.
+        out_root (str): Output directory; the folders are mirrored from their
+            "futureoption" component on, e.g. <out_root>/futureoption/cme/minute/euu.
+        resume (bool): Skip (and record) finished zips in a journal inside out_root.
+        metrics (RunMetrics): Collector to fill, a new one by default.
+
+    Returns:
+        RunResult: The run summary, the metrics of every zip and the errors.
+    """
+    if workers < 1:
+        raise RuntimeError(f"workers must be at least 1, got {workers}")
+    log = print if verbose else _quiet
+    metrics = metrics if metrics is not None else RunMetrics()
+    os.makedirs(out_root, exist_ok=True)
+
+    symbol_paths = []
+    for path in paths:
+        if os.path.isdir(path):
+            symbol_paths.append(path)
+        else:
+            metrics.add_error(f"Provided path is not a directory: {os.path.abspath(path)}")
+
+    journal = Journal(os.path.join(out_root, JOURNAL_FILE_NAME)) if resume else None
+    tasks = ((src_zip_path, dst_zip_path, rule, skip_unchanged, compression, verbose)
+             for _, src_zip_path, dst_zip_path, rule in iter_work_items(
+                 symbol_paths, out_root, scan_workers, log, metrics))
+    run_tasks(tasks, workers, journal, metrics, log)
+    return metrics.result(out_root)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Fix missed strike price precision in FOP zip files.")
+    parser.add_argument("paths", nargs="*",
+                        help="symbol folders, e.g. data/futureoption/cme/minute/adu")
+    parser.add_argument("--workers", type=int,
+                        help="number of zip files processed in parallel (default: 1, --verify: CPU count)")
+    parser.add_argument("--scan-workers", type=int, default=4,
+                        help="threads listing expiry folders concurrently (default: 4)")
+    parser.add_argument("--skip-unchanged", action="store_true",
+                        help="leave zips without renames out of the output instead of hard-linking them "
+                             "(with --verify: do not expect them in the output)")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip zips recorded as finished in the output journal and record new ones")
+    add_compression_arguments(parser)
+    parser.add_argument("--plan", action="store_true",
+                        help="only report the planned renames, do not write any zip")
+    parser.add_argument("--manifest",
+                        help="JSON manifest path for --plan (default: temp-output-directory/plan-manifest.json)")
+    parser.add_argument("--verify", action="store_true",
+                        help="compare the CRC32 and sizes of an earlier run's output with the sources, do not write")
+    add_metrics_arguments(parser)
+    return parser.parse_args(argv)
 
 
 def main():
+    args = parse_args(sys.argv[1:])
+
     # Enforce that at least one path argument is provided.
-    if len(sys.argv) <= 1:
+    if not args.paths:
         # Throw an exception immediately per your requirement.
         raise RuntimeError(
             "No path argument provided. This script requires one or more symbol paths to run.\n"
             "Example:\n  python3 fix_missed_strike_price_precision.py data/futureoption/cme/minute/adu\n"
             "or multiple:\n  python3 fix_missed_strike_price_precision.py data/futureoption/cme/minute/adu futureoption/cbot/minute/ozs"
         )
+    if args.workers is not None and args.workers < 1:
+        raise RuntimeError(f"--workers must be at least 1, got {args.workers}")
 
     temp_output_directory = os.path.join(os.path.dirname(
         os.path.abspath(__file__)), "temp-output-directory")
@@ -135,46 +516,40 @@ def main():
     # Prepare output
     os.makedirs(temp_output_directory, exist_ok=True)
 
-    provided_paths = sys.argv[1:]
-    for provided_path in provided_paths:
-        # <path_to_folder>/data/futureoption/cme/minute/euu
-        provided_path_abs = os.path.abspath(provided_path)
-        print(f"\n===== Processing provided path: {provided_path_abs} =====")
-
-        if not os.path.isdir(provided_path_abs):
+    for provided_path in args.paths:
+        if not os.path.isdir(provided_path):
             raise RuntimeError(
-                f"Provided path is not a directory: {provided_path_abs}")
-
-        # euu
-        symbol = os.path.basename(provided_path_abs).lower()
-        strike_scaling_factor_rule = StrikeScalingFactors.get(symbol)
-        if not strike_scaling_factor_rule:
-            print(f"ERROR: No scaling configured for symbol '{symbol}'")
-            continue
-
-        print(
-            f"====== FOP ticker '{symbol}' | Strike scaling factor: '{strike_scaling_factor_rule}'")
-        # <path_to_folder>/data/futureoption/cme/minute/euu/<expiries>
-        for expiry in os.listdir(provided_path_abs):
-            # <path_to_folder>/data/futureoption/cme/minute/euu/202603
-            src_dir_expiry = os.path.join(provided_path_abs, expiry)
-            # <path_to_folder>/temp-output-directory/futureoption/cme/minute/euu/202603
-            dst_dir_expiry = os.path.join(
-                temp_output_directory, provided_path.removeprefix("Data/"), expiry)
-            os.makedirs(dst_dir_expiry, exist_ok=True)
-            # <path_to_folder>/data/futureoption/cme/minute/euu/202603/<zips>
-            for zip_file in os.listdir(src_dir_expiry):
-                if not zip_file.lower().endswith(".zip"):
-                    continue  # skip non-zip files
-                # <path_to_folder>/data/futureoption/cme/minute/euu/202603/20251224_openinterest_american.zip
-                src_zip_path = os.path.join(src_dir_expiry, zip_file)
-                # <path_to_folder>/temp-output-directory/futureoption/cme/minute/euu/202603/20251224_openinterest_american.zip
-                dst_zip_path = os.path.join(dst_dir_expiry, zip_file)
-                try:
-                    process_zip(src_zip_path, dst_zip_path,
-                                strike_scaling_factor_rule)
-                except Exception as e:
-                    print(f"EXCEPTION: Error processing {src_zip_path}: {e}")
+                f"Provided path is not a directory: {os.path.abspath(provided_path)}")
+
+    if args.plan:
+        plans = [plan_zip(item.symbol, item.expiry, src_zip_path, functools.partial(
+                     resolve_member_names, strike_scaling_factor_rule=rule))
+                 for item, src_zip_path, _, rule in iter_work_items(
+                     args.paths, temp_output_directory, args.scan_workers)]
+        print_plan(plans)
+        manifest_path = args.manifest or os.path.join(
+            temp_output_directory, "plan-manifest.json")
+        write_manifest(plans, manifest_path)
+        print(f"Plan manifest written to: {manifest_path}")
+    elif args.verify:
+        results = verify_groups(
+            (([src_zip_path], dst_zip_path, functools.partial(
+                resolve_member_names, strike_scaling_factor_rule=rule))
+             for _, src_zip_path, dst_zip_path, rule in iter_work_items(
+                 args.paths, temp_output_directory, args.scan_workers)),
+            args.workers or os.cpu_count() or 1, args.skip_unchanged)
+        failed = report(results)
+        if failed:
+            raise RuntimeError(f"{failed} zip files failed verification")
+    else:
+        metrics = RunMetrics()
+        # the tree is scanned lazily: zips start processing while the scan goes on
+        with profiling(args.profile, args.tracemalloc):
+            run(args.paths, temp_output_directory, args.workers or 1, args.scan_workers, args.skip_unchanged,
+                compression_from_args(args), args.resume, verbose=True, metrics=metrics)
+        if args.metrics:
+            metrics.write_json(args.metrics)
+            print(f"Metrics written to: {args.metrics}")
 
     print("\n========== All provided paths processed successfully ==========")
 
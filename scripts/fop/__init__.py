@@ -0,0 +1,6 @@
+"""
+FOP maintenance package for python-lab.
+
+This package contains the building blocks shared by the future option (FOP)
+maintenance scripts in the scripts directory.
+"""
@@ -0,0 +1,150 @@
+"""
+filename.py
+
+Parser for FOP member file names, shared by the FOP maintenance scripts:
+
+    <date>_<fop_ticker>_<resolution>_<tick_type>_<style>_<right>_<strike>_<expiry>.csv
+    20251103_adu_minute_quote_american_call_6250000_20260306.csv
+
+Names are split on "_" with a fixed-field fast path. The
+<date>_<fop_ticker>_<resolution>_<tick_type>_<style>_<right> head repeats for
+thousands of members, so it is validated once and the parsed prefix tuple is
+memoized and shared by every record. Only irregular names are matched with
+RE_FOP_FILENAME_PATTERN, which remains the reference definition.
+"""
+
+import re
+from operator import itemgetter
+
+# regexes to match "<prefix>_<strike>_<expiry>.csv"
+RE_FOP_FILENAME_PATTERN = re.compile(
+    r"^(?P<date>\d{8})_"              # 20251103
+    r"(?P<fop_ticker>[a-zA-Z0-9]+)_"  # adu
+    r"(?P<resolution>[a-zA-Z]+)_"     # minute
+    r"(?P<tick_type>[a-zA-Z]+)_"      # quote
+    r"(?P<style>[a-zA-Z]+)_"          # american
+    r"(?P<right>[a-zA-Z]+)_"          # call
+    r"(?P<strike>\d+(?:\.\d+)?)_"     # 6250000, 6.25
+    r"(?P<expiry>\d{6,8})"            # 20260306
+    r"(?P<extension>\.csv)$",         # .csv
+    re.IGNORECASE
+)
+
+# head = "<date>_<fop_ticker>_<resolution>_<tick_type>_<style>_<right>"
+_HEAD_FIELD_COUNT = 6
+
+# parsed heads (or False for invalid ones); an archive holds a single date, so a
+# few entries serve thousands of members
+_HEAD_CACHE = {}
+_HEAD_CACHE_MAX_SIZE = 4096
+
+_new_record = tuple.__new__
+
+
+class FopFilename(tuple):
+    """
+    Parsed FOP member file name: (date, prefix, strike, expiry, extension).
+
+    prefix is the memoized (fop_ticker, resolution, tick_type, style, right)
+    tuple shared by every member with the same head. Being a tuple with empty
+    __slots__, a record costs no per-instance __dict__.
+    """
+    __slots__ = ()
+
+    def __new__(cls, date, prefix, strike, expiry, extension):
+        return tuple.__new__(cls, (date, prefix, strike, expiry, extension))
+
+    date = property(itemgetter(0))
+    prefix = property(itemgetter(1))
+    strike = property(itemgetter(2))
+    expiry = property(itemgetter(3))
+    extension = property(itemgetter(4))
+
+    @property
+    def fop_ticker(self):
+        return self[1][0]
+
+    @property
+    def resolution(self):
+        return self[1][1]
+
+    @property
+    def tick_type(self):
+        return self[1][2]
+
+    @property
+    def style(self):
+        return self[1][3]
+
+    @property
+    def right(self):
+        return self[1][4]
+
+    def __repr__(self):
+        return (f"FopFilename(date={self.date}, prefix={self.prefix}, "
+                f"strike={self.strike}, expiry={self.expiry})")
+
+
+def _parse_head(head: str):
+    fields = head.split("_")
+    if len(fields) != _HEAD_FIELD_COUNT:
+        return False
+
+    # str.isdecimal() accepts the same characters as \d
+    date, fop_ticker, resolution, tick_type, style, right = fields
+    if len(date) != 8 or not date.isdecimal():
+        return False
+    if not (fop_ticker.isascii() and fop_ticker.isalnum()):
+        return False
+    for field in (resolution, tick_type, style, right):
+        if not (field.isascii() and field.isalpha()):
+            return False
+    return date, (fop_ticker, resolution, tick_type, style, right)
+
+
+def _parse_fast(name: str):
+    parts = name.rsplit("_", 2)
+    if len(parts) != 3:
+        return None
+    head, strike, tail = parts
+
+    parsed_head = _HEAD_CACHE.get(head)
+    if parsed_head is None:
+        if len(_HEAD_CACHE) >= _HEAD_CACHE_MAX_SIZE:
+            _HEAD_CACHE.clear()
+        parsed_head = _HEAD_CACHE[head] = _parse_head(head)
+    if not parsed_head:
+        return None
+
+    if not strike.isdecimal():
+        integer_digits, dot, fraction_digits = strike.partition(".")
+        if not (dot and integer_digits.isdecimal() and fraction_digits.isdecimal()):
+            return None
+
+    expiry, dot, extension = tail.partition(".")
+    if not (dot and extension.lower() == "csv" and 6 <= len(expiry) <= 8 and expiry.isdecimal()):
+        return None
+
+    # tuple.__new__ skips the Python-level __new__ on this hot path
+    return _new_record(FopFilename, (parsed_head[0], parsed_head[1], strike, expiry, "." + extension))
+
+
+def parse_fop_filename(name: str):
+    """
+    Parse a FOP member file name.
+
+    Returns:
+        FopFilename or None when the name does not match RE_FOP_FILENAME_PATTERN.
+    """
+    parsed = _parse_fast(name)
+    if parsed is not None:
+        return parsed
+
+    filename_match = RE_FOP_FILENAME_PATTERN.match(name)
+    if not filename_match:
+        return None
+    prefix = (filename_match.group("fop_ticker"), filename_match.group("resolution"),
+              filename_match.group("tick_type"), filename_match.group("style"),
+              filename_match.group("right"))
+    return FopFilename(filename_match.group("date"), prefix, filename_match.group("strike"),
+                       filename_match.group("expiry"), filename_match.group("extension"))
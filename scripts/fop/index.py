@@ -0,0 +1,268 @@
+"""
+index.py
+
+Sidecar SQLite index of the members of FOP archives.
+
+Downstream jobs keep opening the same minute zips only to learn which strikes
+and rights exist for a date. The index is built once from the central
+directories of a symbol tree (member data is never read) and answers those
+questions without opening a single zip:
+
+    archives(id, path, symbol, expiry_folder, size, mtime_ns)
+    members(archive_id, date, tick_type, style, option_right, strike, expiry,
+            header_offset, compress_size, file_size)
+
+header_offset and compress_size locate the member inside its archive, so a
+reader can seek straight to it. Dates and expiries are stored as integers
+(YYYYMMDD), the strike as it appears in the member name.
+
+Rebuilding is incremental: archives whose size and mtime still match their
+row are skipped, changed ones are re-read and vanished ones are dropped.
+
+Example:
+
+    with FopIndex("euu-index.sqlite") as index:
+        index.update("data/futureoption/cme/minute/euu", workers=8)
+        index.strikes("20251103", right="call", expiry="202603")
+"""
+
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, List, NamedTuple, Tuple
+from zipfile import ZipFile
+
+from .filename import parse_fop_filename
+from .walk import walk_symbol
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS archives (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    symbol TEXT NOT NULL,
+    expiry_folder TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS members (
+    archive_id INTEGER NOT NULL REFERENCES archives(id) ON DELETE CASCADE,
+    date INTEGER NOT NULL,
+    tick_type TEXT NOT NULL,
+    style TEXT NOT NULL,
+    option_right TEXT NOT NULL,  -- "right" is an SQL keyword (RIGHT JOIN)
+    strike TEXT NOT NULL,
+    expiry INTEGER NOT NULL,
+    header_offset INTEGER NOT NULL,
+    compress_size INTEGER NOT NULL,
+    file_size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS members_by_date ON members(date, option_right, expiry);
+CREATE INDEX IF NOT EXISTS members_by_archive ON members(archive_id);
+"""
+
+
+class MemberRow(NamedTuple):
+    """
+    One indexed member; strike is kept as written in the member name.
+    """
+    date: int
+    tick_type: str
+    style: str
+    right: str
+    strike: str
+    expiry: int
+    header_offset: int
+    compress_size: int
+    file_size: int
+
+
+@dataclass
+class IndexResult:
+    """
+    Counters of an index update.
+
+    indexed: archives (re-)read, unchanged: archives skipped as up to date,
+    removed: rows of archives that no longer exist, skipped_members: members
+    whose name is not a FOP csv name, errors: "<path>: <error>" per unreadable zip
+    """
+    indexed: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    members: int = 0
+    skipped_members: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+def read_members(zip_path: str) -> Tuple[List[MemberRow], int]:
+    """
+    Return the parsed members of a zip and the number of unparsable names.
+
+    Only the central directory is read.
+    """
+    rows = []
+    skipped = 0
+    with ZipFile(zip_path, "r") as zip_file:
+        for info in zip_file.infolist():
+            parsed = parse_fop_filename(info.filename)
+            if parsed is None:
+                skipped += 1
+                continue
+            rows.append(MemberRow(int(parsed.date), parsed.tick_type.lower(), parsed.style.lower(),
+                                  parsed.right.lower(), parsed.strike, int(parsed.expiry.ljust(8, "0")),
+                                  info.header_offset, info.compress_size, info.file_size))
+    return rows, skipped
+
+
+def _expiry_range(expiry: str) -> Tuple[int, int]:
+    """
+    Inclusive YYYYMMDD bounds of a YYYY, YYYYMM or YYYYMMDD expiry prefix.
+    """
+    if not expiry.isdecimal() or len(expiry) not in (4, 6, 8):
+        raise ValueError(f"Expected a YYYY, YYYYMM or YYYYMMDD expiry, got '{expiry}'")
+    return int(expiry.ljust(8, "0")), int(expiry.ljust(8, "9"))
+
+
+class FopIndex:
+    """
+    SQLite index of FOP archive members; a single writer, any number of readers.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def update(self, symbol_path: str, workers: int = 1, symbol: str = None) -> IndexResult:
+        """
+        Index every zip of symbol_path/<expiry>/ that changed since the last update.
+
+        Central directories are read by a pool of workers threads (the reads
+        are I/O bound); rows are written by the calling thread in one
+        transaction, so readers never see a half-updated symbol.
+        """
+        result = IndexResult()
+        items = list(walk_symbol(symbol_path, workers, symbol))
+        known = {}
+        for archive_id, path, size, mtime_ns in self.connection.execute(
+                "SELECT id, path, size, mtime_ns FROM archives WHERE path LIKE ? ESCAPE '\\'",
+                (_like_prefix(os.path.abspath(symbol_path) + os.sep),)):
+            known[path] = (archive_id, size, mtime_ns)
+
+        changed = []
+        for item in items:
+            zip_path = os.path.abspath(item.zip_path)
+            stat = os.stat(zip_path)
+            entry = known.pop(zip_path, None)
+            if entry is not None and entry[1:] == (stat.st_size, stat.st_mtime_ns):
+                result.unchanged += 1
+                continue
+            changed.append((item, zip_path, stat))
+
+        def read(task):
+            try:
+                return task, read_members(task[1]), None
+            except Exception as e:
+                return task, None, str(e)
+
+        with self.connection:
+            for archive_id, _, _ in known.values():
+                self.connection.execute("DELETE FROM archives WHERE id = ?", (archive_id,))
+                result.removed += 1
+
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                for (item, zip_path, stat), members, error in executor.map(read, changed):
+                    if error is not None:
+                        # do not keep answering from the rows of an archive that became unreadable
+                        self.connection.execute("DELETE FROM archives WHERE path = ?", (zip_path,))
+                        result.errors.append(f"{zip_path}: {error}")
+                        continue
+                    rows, skipped = members
+                    self._store(item.symbol, item.expiry, zip_path, stat, rows)
+                    result.indexed += 1
+                    result.members += len(rows)
+                    result.skipped_members += skipped
+        return result
+
+    def _store(self, symbol: str, expiry_folder: str, zip_path: str, stat: os.stat_result,
+               rows: List[MemberRow]):
+        self.connection.execute("DELETE FROM archives WHERE path = ?", (zip_path,))
+        archive_id = self.connection.execute(
+            "INSERT INTO archives (path, symbol, expiry_folder, size, mtime_ns) VALUES (?, ?, ?, ?, ?)",
+            (zip_path, symbol, expiry_folder, stat.st_size, stat.st_mtime_ns)).lastrowid
+        self.connection.executemany(
+            "INSERT INTO members VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            ((archive_id, *row) for row in rows))
+
+    def members(self, date: str, right: str = None, expiry: str = None, symbol: str = None,
+                tick_type: str = None, expiry_folder: str = None) -> List[Tuple[str, MemberRow]]:
+        """
+        Return (archive path, MemberRow) of the members of a YYYYMMDD date.
+
+        expiry is a YYYY, YYYYMM or YYYYMMDD prefix of the option expiry,
+        expiry_folder the YYYYMM folder (future expiry) holding the archive; the
+        other filters are exact and case-insensitive.
+        """
+        where, params = ["m.date = ?"], [int(date)]
+        if right is not None:
+            where.append("m.option_right = ?")
+            params.append(right.lower())
+        if expiry is not None:
+            where.append("m.expiry BETWEEN ? AND ?")
+            params.extend(_expiry_range(expiry))
+        if symbol is not None:
+            where.append("a.symbol = ?")
+            params.append(symbol.lower())
+        if tick_type is not None:
+            where.append("m.tick_type = ?")
+            params.append(tick_type.lower())
+        if expiry_folder is not None:
+            where.append("a.expiry_folder = ?")
+            params.append(expiry_folder)
+        cursor = self.connection.execute(
+            "SELECT a.path, m.date, m.tick_type, m.style, m.option_right, m.strike, m.expiry, m.header_offset, "
+            "m.compress_size, m.file_size FROM members m JOIN archives a ON a.id = m.archive_id "
+            f"WHERE {' AND '.join(where)} ORDER BY a.path, m.header_offset", params)
+        return [(row[0], MemberRow(*row[1:])) for row in cursor]
+
+    def strikes(self, date: str, right: str = None, expiry: str = None, symbol: str = None,
+                tick_type: str = None, expiry_folder: str = None) -> List[str]:
+        """
+        Return the distinct strikes of a date, in numeric order.
+
+        Example: index.strikes("20251103", right="call", expiry="202603")
+        """
+        strikes = {row.strike for _, row in self.members(date, right, expiry, symbol, tick_type, expiry_folder)}
+        return sorted(strikes, key=float)
+
+    def stats(self) -> Tuple[int, int]:
+        """
+        Return (archives, members) counts of the index.
+        """
+        archives = self.connection.execute("SELECT COUNT(*) FROM archives").fetchone()[0]
+        members = self.connection.execute("SELECT COUNT(*) FROM members").fetchone()[0]
+        return archives, members
+
+
+def _like_prefix(prefix: str) -> str:
+    # escape the LIKE wildcards that may appear in a path
+    return prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def build_index(index_path: str, symbol_paths: Iterable[str], workers: int = 1) -> List[IndexResult]:
+    """
+    Update the index at index_path with every symbol folder; one IndexResult per folder.
+    """
+    with FopIndex(index_path) as index:
+        return [index.update(symbol_path, workers) for symbol_path in symbol_paths]
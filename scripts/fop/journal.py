@@ -0,0 +1,136 @@
+"""
+journal.py
+
+Checkpoint journal that makes the FOP maintenance runs resumable.
+
+Every finished source zip is appended as one JSON line to a journal file in
+the output directory:
+
+    {"src_path": "...", "dst_path": "...", "size": 1234, "mtime_ns": 1700000000000000000, "fingerprint": "..."}
+
+On a re-run a zip whose size and mtime still match its journal entry is
+skipped. When only the mtime changed the fingerprint decides, so touched but
+unchanged archives are not processed again. Delete the journal file to force
+a full run.
+
+The fingerprint is the sha256 of the zip's central directory, which holds the
+CRC32 and sizes of every member: recording a zip reads a few bytes per member
+instead of the whole archive a second time. Files that are not plain zips
+(no end of central directory record, or zip64) are hashed whole.
+"""
+
+import hashlib
+import json
+import os
+import struct
+from typing import Dict
+
+# read buffer used for hashing whole files
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# end of central directory record: signature, disk numbers, entry counts, size and offset, comment length
+_EOCD = struct.Struct("<4s4H2LH")
+_EOCD_SIGNATURE = b"PK\x05\x06"
+_EOCD_MAX_COMMENT = 0xFFFF
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _central_directory_sha256(f, file_size: int):
+    # sha256 of the central directory and end record, None when they cannot be located
+    tail_size = min(file_size, _EOCD.size + _EOCD_MAX_COMMENT)
+    f.seek(file_size - tail_size)
+    tail = f.read(tail_size)
+    eocd_pos = tail.rfind(_EOCD_SIGNATURE)
+    if eocd_pos < 0 or len(tail) - eocd_pos < _EOCD.size:
+        return None
+    cd_size = _EOCD.unpack_from(tail, eocd_pos)[5]
+    eocd_offset = file_size - tail_size + eocd_pos
+    if cd_size == 0xFFFFFFFF or cd_size > eocd_offset:
+        return None  # zip64 or not a zip
+    f.seek(eocd_offset - cd_size)
+    digest = hashlib.sha256(f.read(cd_size))
+    digest.update(tail[eocd_pos:])
+    return digest.hexdigest()
+
+
+def zip_fingerprint(path: str) -> str:
+    """
+    Return the content fingerprint of a source zip (see the module docstring).
+    """
+    with open(path, "rb") as f:
+        fingerprint = _central_directory_sha256(f, os.fstat(f.fileno()).st_size)
+    return f"cd:{fingerprint}" if fingerprint is not None else file_sha256(path)
+
+
+class Journal:
+    """
+    Append-only JSONL journal of finished source zips, keyed by absolute source path.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Dict[str, dict] = {}
+
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line of an interrupted run
+                    self._entries[entry["src_path"]] = entry
+
+    def __len__(self):
+        return len(self._entries)
+
+    def is_done(self, src_path: str) -> bool:
+        """
+        Return True when src_path was finished before and has not changed since.
+        """
+        src_path = os.path.abspath(src_path)
+        entry = self._entries.get(src_path)
+        if entry is None:
+            return False
+
+        try:
+            stat = os.stat(src_path)
+        except FileNotFoundError:
+            return False
+
+        if stat.st_size != entry["size"]:
+            return False
+        if stat.st_mtime_ns == entry["mtime_ns"]:
+            return True
+        if "fingerprint" in entry:
+            return zip_fingerprint(src_path) == entry["fingerprint"]
+        # journal written before fingerprints: whole-file hash
+        return file_sha256(src_path) == entry["sha256"]
+
+    def record(self, src_path: str, dst_path: str = None):
+        """
+        Append src_path as finished; the line is flushed and fsynced right away.
+        """
+        src_path = os.path.abspath(src_path)
+        stat = os.stat(src_path)
+        entry = {
+            "src_path": src_path,
+            "dst_path": os.path.abspath(dst_path) if dst_path else None,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "fingerprint": zip_fingerprint(src_path),
+        }
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._entries[src_path] = entry
@@ -0,0 +1,238 @@
+"""
+metrics.py
+
+Run metrics and profiling hooks for the FOP maintenance scripts.
+
+Every archive handled by a run is recorded as an ArchiveMetrics (wall time,
+bytes in/out, member and rename counts). At the end RunMetrics summarizes
+them, with the p50/p99 per-archive latency, and can save the summary as JSON:
+
+    {
+      "archives": 1200, "failed": 0, "members": 1048576, "renamed": 5321,
+      "bytes_in": 734003200, "bytes_out": 733871104, "wall_seconds": 42.1,
+      "latency_seconds": {"mean": 0.031, "p50": 0.024, "p99": 0.18, "max": 0.42}
+    }
+
+The scripts print the output of one archive in a single write (see
+LineBuffer) instead of one print per renamed member, which on archives with
+thousands of members costs more than the renames themselves.
+
+profiling() optionally runs the block under cProfile (stats dumped to a file
+readable by pstats/snakeviz) and/or tracemalloc (peak and top allocation
+sites printed at the end).
+"""
+
+import cProfile
+import json
+import math
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict, field
+from typing import Callable, List
+
+
+@dataclass
+class ZipProcessResult:
+    """
+    Rename counters of a single processed zip file, as returned by process_zip of the strike-fix scripts.
+    """
+    renamed: int = 0
+    skipped: int = 0
+    total: int = 0
+
+
+@dataclass
+class ArchiveMetrics:
+    """
+    Measurements of one destination archive.
+
+    src_paths: source zips read for it, several when sources are merged
+    bytes_in: total size of the source zips
+    bytes_out: size of the destination zip, 0 when it was not written
+    """
+    src_paths: List[str]
+    dst_path: str
+    seconds: float
+    bytes_in: int = 0
+    bytes_out: int = 0
+    members: int = 0
+    renamed: int = 0
+
+    @classmethod
+    def measure(cls, src_paths: List[str], dst_path: str, seconds: float, members: int = 0,
+                renamed: int = 0) -> "ArchiveMetrics":
+        """
+        Build the metrics of an archive, reading the sizes of src_paths and dst_path.
+        """
+        bytes_in = sum(os.path.getsize(path) for path in src_paths if os.path.exists(path))
+        bytes_out = os.path.getsize(dst_path) if os.path.exists(dst_path) else 0
+        return cls(list(src_paths), dst_path, seconds, bytes_in, bytes_out, members, renamed)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile of values (q in 0-100), 0.0 for no values.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+@dataclass
+class RunResult:
+    """
+    Outcome of a library run (see the run() function of each FOP script).
+
+    summary: RunMetrics.summary() of the run
+    errors: one message per failed archive or skipped symbol folder
+    """
+    out_root: str
+    summary: dict
+    archives: List[ArchiveMetrics] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+class RunMetrics:
+    """
+    Collects the ArchiveMetrics of a run and summarizes them.
+    """
+
+    def __init__(self):
+        self.archives: List[ArchiveMetrics] = []
+        self.errors: List[str] = []
+        self.failed = 0
+        self._started = time.perf_counter()
+
+    def add(self, metrics: ArchiveMetrics):
+        self.archives.append(metrics)
+
+    def add_failure(self, message: str = None):
+        """
+        Count a failed archive; message (when given) also ends up in RunResult.errors.
+        """
+        self.failed += 1
+        if message is not None:
+            self.errors.append(message)
+
+    def add_error(self, message: str):
+        """
+        Record a problem that is not an archive failure, e.g. a symbol without rules.
+        """
+        self.errors.append(message)
+
+    def result(self, out_root: str) -> RunResult:
+        return RunResult(out_root, self.summary(), list(self.archives), list(self.errors))
+
+    def summary(self) -> dict:
+        latencies = [archive.seconds for archive in self.archives]
+        return {
+            "archives": len(self.archives),
+            "failed": self.failed,
+            "members": sum(archive.members for archive in self.archives),
+            "renamed": sum(archive.renamed for archive in self.archives),
+            "bytes_in": sum(archive.bytes_in for archive in self.archives),
+            "bytes_out": sum(archive.bytes_out for archive in self.archives),
+            "wall_seconds": round(time.perf_counter() - self._started, 6),
+            "latency_seconds": {
+                "mean": round(sum(latencies) / len(latencies), 6) if latencies else 0.0,
+                "p50": round(percentile(latencies, 50), 6),
+                "p99": round(percentile(latencies, 99), 6),
+                "max": round(max(latencies), 6) if latencies else 0.0,
+            },
+        }
+
+    def write_json(self, path: str, per_archive: bool = False):
+        """
+        Save the summary (and optionally every ArchiveMetrics) as JSON.
+        """
+        data = self.summary()
+        if per_archive:
+            data["per_archive"] = [asdict(archive) for archive in self.archives]
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+
+class LineBuffer:
+    """
+    Collect output lines and write them in one call.
+
+    Example:
+
+        out = LineBuffer()
+        out.add(f"rename: {old} => {new}")
+        out.flush()
+
+    With enabled=False the lines are dropped, for library runs that report
+    through their return value instead of stdout.
+    """
+
+    def __init__(self, stream=None, enabled: bool = True):
+        self.stream = stream
+        self.enabled = enabled
+        self.lines: List[str] = []
+
+    def add(self, line: str):
+        if self.enabled:
+            self.lines.append(line)
+
+    def flush(self):
+        if self.lines:
+            # resolved on every flush so redirected/captured stdout is honoured
+            stream = self.stream or sys.stdout
+            stream.write("\n".join(self.lines) + "\n")
+            self.lines.clear()
+
+
+def add_metrics_arguments(parser):
+    """
+    Add the --metrics, --profile and --tracemalloc options to an argparse parser.
+    """
+    parser.add_argument("--metrics",
+                        help="write a JSON run summary (per-archive latency p50/p99, bytes, counts) to this file")
+    parser.add_argument("--profile",
+                        help="run under cProfile and dump the stats to this file (open with pstats or snakeviz)")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="trace memory allocations and print the peak and the top allocation sites")
+
+
+@contextmanager
+def profiling(profile_path: str = None, trace_memory: bool = False, log: Callable[[str], None] = print,
+              top: int = 10):
+    """
+    Run the block under cProfile and/or tracemalloc; a no-op when neither is requested.
+
+    Only the calling process is profiled, worker processes of a pool are not.
+    """
+    profiler = cProfile.Profile() if profile_path else None
+    if trace_memory:
+        tracemalloc.start()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            os.makedirs(os.path.dirname(os.path.abspath(profile_path)), exist_ok=True)
+            profiler.dump_stats(profile_path)
+            log(f"Profile written to: {profile_path}")
+            stats = pstats.Stats(profiler, stream=sys.stdout)
+            stats.sort_stats("cumulative").print_stats(top)
+        if trace_memory:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            log(f"Memory peak: {peak / 1024 / 1024:.1f} MiB")
+            for stat in snapshot.statistics("lineno")[:top]:
+                log(f"  {stat}")
@@ -0,0 +1,114 @@
+"""
+pipeline.py
+
+Single-pass rewrite engine: fix member names and fold archives into their
+destination in one read of every source zip.
+
+The separate maintenance passes each read and write every archive (strike
+fix into temp-output-directory, then merge of that output into the quarter
+folders). Here every destination zip is built once from all of its sources:
+
+    sources (expiry folders)           chain of member transforms         destination
+    202601/20251224_quote.zip  --+
+    202602/20251224_quote.zip  --+--> strike fix --> ... --> last writer --> 202603/20251224_quote.zip
+    202603/20251224_quote.zip  --+                           wins
+
+A member transform works on the member names of one source archive at a
+time, with the batch signature already used by the strike-fix scripts
+(resolve_member_names): it receives the list of names and returns the list
+of new names, the same name when a member is left alone. Member data is
+raw-copied unless the requested compression needs a recompression.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Callable, List, Sequence
+from zipfile import ZipFile
+
+from .zip_rewrite import DEFAULT_COMPRESSION, Compression, atomic_zip, copy_member, place_unchanged
+
+MemberTransform = Callable[[List[str]], List[str]]
+
+
+class TransformChain:
+    """
+    Apply member transforms one after the other.
+
+    A class rather than a closure so the chain can be sent to worker processes.
+    """
+
+    def __init__(self, transforms: Sequence[MemberTransform] = ()):
+        self.transforms = list(transforms)
+
+    def __call__(self, member_names: List[str]) -> List[str]:
+        for transform in self.transforms:
+            member_names = transform(member_names)
+        return member_names
+
+    def __len__(self):
+        return len(self.transforms)
+
+
+@dataclass
+class GroupResult:
+    """
+    Counters of one destination zip.
+
+    renamed: members whose name was changed by the transforms
+    replaced: members dropped because a later source wrote the same name
+    total: members read from all sources
+    """
+    renamed: int = 0
+    replaced: int = 0
+    total: int = 0
+
+
+def rewrite_group(src_zips: List[str], dst_zip: str, transform: MemberTransform = None,
+                  compression: Compression = DEFAULT_COMPRESSION) -> GroupResult:
+    """
+    Build dst_zip from src_zips, reading every source once and writing dst_zip once.
+
+    The member names of each source go through transform. When two members end
+    up with the same name the one of the later source wins, like merge_zips. An
+    existing dst_zip takes part as the first source, without transform (its
+    names are already final), so resuming a partly journaled group keeps the
+    members written by the earlier run.
+
+    A single source without renames that needs no recompression is hard-linked
+    instead of rewritten.
+    """
+    transform = transform or TransformChain()
+    sources = ([dst_zip] if os.path.exists(dst_zip) else []) + list(src_zips)
+    result = GroupResult()
+
+    src_files = [ZipFile(src, "r") for src in sources]
+    try:
+        # final name -> (source archive, member) of the last writer
+        winners = {}
+        for src_path, src in zip(sources, src_files):
+            infos = src.infolist()
+            names = [info.filename for info in infos]
+            new_names = names if src_path == dst_zip else transform(names)
+            result.total += len(infos)
+            for info, new_name in zip(infos, new_names):
+                if new_name != info.filename:
+                    result.renamed += 1
+                if new_name in winners:
+                    result.replaced += 1
+                winners[new_name] = (src, info)
+
+        if len(sources) == 1 and result.renamed == 0 and result.replaced == 0 and \
+                all(compression.keeps(info) for _, info in winners.values()):
+            src_files[0].close()
+            place_unchanged(sources[0], dst_zip)
+            return result
+
+        with atomic_zip(dst_zip) as dst:
+            for new_name, (src, info) in winners.items():
+                copy_member(src, info, dst, new_name, compression.compress_type,
+                            compression.compresslevel)
+    finally:
+        for src in src_files:
+            src.close()
+
+    return result
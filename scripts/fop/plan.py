@@ -0,0 +1,112 @@
+"""
+plan.py
+
+Dry-run planning for the FOP strike-fix scripts.
+
+A plan reads only the central directory of each zip (ZipFile.infolist) and
+runs the member names through the same batch rename function used by
+process_zip.
+Member data is never read and nothing is written next to the sources, so a
+plan over a whole symbol tree finishes in seconds.
+
+The result is printed as per-expiry and per-zip rename counts and can be
+saved as a JSON manifest:
+
+    {
+      "renamed": 3,
+      "total": 10,
+      "zips": [
+        {"symbol": "euu", "expiry": "202603", "zip_path": ".../20251224_quote_american.zip",
+         "renamed": 3, "total": 10, "renames": {"<old name>": "<new name>"}, "error": null}
+      ]
+    }
+"""
+
+import json
+import os
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Dict, Iterable, List, Optional
+from zipfile import ZipFile
+
+
+@dataclass
+class ZipPlan:
+    """
+    Planned renames of a single zip file.
+
+    renames: original member name -> new member name, only for changed members
+    total: number of members in the zip
+    error: why the zip could not be planned, None on success
+    """
+    symbol: str
+    expiry: str
+    zip_path: str
+    renames: Dict[str, str] = field(default_factory=dict)
+    total: int = 0
+    error: Optional[str] = None
+
+    @property
+    def renamed(self) -> int:
+        return len(self.renames)
+
+
+def plan_zip(symbol: str, expiry: str, zip_path: str,
+             resolve_member_names: Callable[[List[str]], List[str]]) -> ZipPlan:
+    """
+    Plan the renames of one zip from its central directory only.
+
+    Args:
+        resolve_member_names: Returns the corrected member names (the same name
+            when nothing changes) and raises for unexpected member names.
+    """
+    plan = ZipPlan(symbol, expiry, zip_path)
+    try:
+        with ZipFile(zip_path, "r") as zip_file:
+            names = zip_file.namelist()
+        plan.total = len(names)
+        for name, new_name in zip(names, resolve_member_names(names)):
+            if new_name != name:
+                plan.renames[name] = new_name
+    except Exception as e:
+        plan.error = str(e)
+    return plan
+
+
+def print_plan(plans: List[ZipPlan]):
+    """
+    Print per-zip and per-expiry rename counts followed by the grand total.
+    """
+    expiry_totals: Dict[tuple, List[int]] = {}
+    for plan in plans:
+        if plan.error is not None:
+            print(f"plan: {plan.zip_path} ERROR: {plan.error}")
+            continue
+        print(f"plan: {plan.zip_path} renames {plan.renamed} of {plan.total}")
+        totals = expiry_totals.setdefault((plan.symbol, plan.expiry), [0, 0, 0])
+        totals[0] += plan.renamed
+        totals[1] += plan.total
+        totals[2] += 1
+
+    for (symbol, expiry), (renamed, total, zips) in sorted(expiry_totals.items()):
+        print(f"plan: {symbol}/{expiry} renames {renamed} of {total} in {zips} zip files")
+
+    renamed = sum(plan.renamed for plan in plans)
+    total = sum(plan.total for plan in plans)
+    errors = sum(1 for plan in plans if plan.error is not None)
+    print(f"Plan: {renamed} of {total} CSV files would be renamed in {len(plans)} zip files ({errors} failed)")
+
+
+def write_manifest(plans: Iterable[ZipPlan], manifest_path: str):
+    """
+    Save the plans as a JSON manifest.
+    """
+    plans = list(plans)
+    manifest = {
+        "renamed": sum(plan.renamed for plan in plans),
+        "total": sum(plan.total for plan in plans),
+        "zips": [dict(asdict(plan), renamed=plan.renamed) for plan in plans],
+    }
+    manifest_dir = os.path.dirname(os.path.abspath(manifest_path))
+    os.makedirs(manifest_dir, exist_ok=True)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
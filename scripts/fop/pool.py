@@ -0,0 +1,44 @@
+"""
+pool.py
+
+Bounded task submission shared by the FOP maintenance scripts.
+
+Executor.map and a list of submit() calls both queue every task up front:
+on a tree of millions of zips the pool queue then holds every task, and its
+pickled arguments, before the first result comes back. submit_bounded keeps
+at most max_in_flight tasks submitted ahead of the results and pulls the
+next ones from the (possibly lazy) task iterable as results complete, so
+memory stays flat and a lazy walker keeps overlapping with the processing.
+
+Example:
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for task, result in submit_bounded(executor, process, tasks, 2 * workers):
+            collect(task, result)
+"""
+
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from typing import Callable, Iterable, Iterator, Sequence, Tuple
+
+
+def submit_bounded(executor: Executor, fn: Callable, tasks: Iterable[Sequence],
+                   max_in_flight: int) -> Iterator[Tuple[Sequence, object]]:
+    """
+    Run fn(*task) for every task on executor, at most max_in_flight at a time.
+
+    Yields (task, result) pairs in completion order. tasks is consumed lazily:
+    a task is only pulled once a slot of the window is free. An exception
+    raised by fn is raised again when its result is collected.
+    """
+    futures = {}
+    for task in tasks:
+        futures[executor.submit(fn, *task)] = task
+        # bounded window: wait for a result before pulling more tasks
+        while len(futures) >= max_in_flight:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield futures.pop(future), future.result()
+    while futures:
+        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield futures.pop(future), future.result()
@@ -0,0 +1,160 @@
+"""
+verify.py
+
+Check a rewritten archive against its sources from the central directories only.
+
+Every member of the destination must be the member of a source under the
+name the rewrite gave it: the rename mapping is recomputed from the source
+member names with the same batch transform the rewrite used (the strike
+fixes are pure functions of the names), and for duplicate names the last
+source wins, like in merge_zips. A member matches when its CRC32 and
+uncompressed size are equal; the compressed size is not compared since a
+codec or level change legitimately alters it.
+
+Nothing is decompressed, so verifying a symbol tree only costs reading the
+central directory of every archive.
+
+A destination is reported with:
+
+- missing: expected members absent from the destination
+- extra: destination members no source accounts for
+- mismatched: members whose CRC32 or size differ
+
+With skip_unchanged (the output of a --skip-unchanged run) a missing
+destination is expected when none of its members is renamed: it is reported
+as skipped rather than failed (whether a codec change would have rewritten
+it anyway is not known here).
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from zipfile import ZipFile
+
+
+@dataclass
+class VerifyResult:
+    """
+    Outcome of the verification of one destination zip.
+
+    error: why the archives could not be read, None when they were compared
+    skipped: the destination was left out of the output on purpose (no renames)
+    """
+    dst_zip: str
+    checked: int = 0
+    missing: List[str] = field(default_factory=list)
+    extra: List[str] = field(default_factory=list)
+    mismatched: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    skipped: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not (self.missing or self.extra or self.mismatched)
+
+
+def _central_directory(zip_path: str) -> Dict[str, Tuple[int, int]]:
+    with ZipFile(zip_path, "r") as z:
+        return {info.filename: (info.CRC, info.file_size) for info in z.infolist()}
+
+
+def expected_members(src_zips: List[str],
+                     transform: Callable[[List[str]], List[str]] = None) -> Dict[str, Tuple[int, int]]:
+    """
+    Return final member name -> (CRC32, size) of the rewrite of src_zips.
+    """
+    return _expected_members(src_zips, transform)[0]
+
+
+def _expected_members(src_zips, transform):
+    # (expected members, whether transform renames any of them)
+    expected = {}
+    renamed = False
+    for src_zip in src_zips:
+        members = _central_directory(src_zip)
+        names = list(members)
+        new_names = transform(names) if transform is not None else names
+        renamed = renamed or list(new_names) != names
+        for name, new_name in zip(names, new_names):
+            expected[new_name] = members[name]
+    return expected, renamed
+
+
+def verify_group(src_zips: List[str], dst_zip: str,
+                 transform: Callable[[List[str]], List[str]] = None,
+                 skip_unchanged: bool = False) -> VerifyResult:
+    """
+    Compare dst_zip with the members it should hold according to src_zips and transform.
+
+    With skip_unchanged a missing dst_zip whose members keep their names is
+    skipped, not failed. Never raises: unreadable archives are reported
+    through VerifyResult.error.
+    """
+    result = VerifyResult(dst_zip)
+    try:
+        dst_exists = os.path.exists(dst_zip)
+        if not dst_exists and not skip_unchanged:
+            raise FileNotFoundError(f"Destination zip does not exist: {dst_zip}")
+        expected, renamed = _expected_members(src_zips, transform)
+        if not dst_exists:
+            if renamed:
+                raise FileNotFoundError(f"Destination zip does not exist: {dst_zip}")
+            result.skipped = True
+            return result
+        actual = _central_directory(dst_zip)
+    except Exception as e:
+        result.error = str(e)
+        return result
+
+    result.checked = len(actual)
+    result.missing = sorted(expected.keys() - actual.keys())
+    result.extra = sorted(actual.keys() - expected.keys())
+    result.mismatched = sorted(name for name in expected.keys() & actual.keys()
+                               if expected[name] != actual[name])
+    return result
+
+
+def _verify_group_task(args) -> VerifyResult:
+    return verify_group(*args)
+
+
+def verify_groups(tasks: Iterable[Tuple[List[str], str, Callable]], workers: int = 1,
+                  skip_unchanged: bool = False) -> List[VerifyResult]:
+    """
+    Verify every (src_zips, dst_zip, transform) task, sources in write order.
+
+    With workers > 1 the archives are verified by a process pool; see
+    verify_group for skip_unchanged.
+    """
+    tasks = [(*task, skip_unchanged) for task in tasks]
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_verify_group_task, tasks, chunksize=16))
+    return [_verify_group_task(task) for task in tasks]
+
+
+def report(results: List[VerifyResult], log: Callable[[str], None] = print) -> int:
+    """
+    Log every failed verification and a summary line.
+
+    Returns:
+        int: Number of destination zips that failed verification.
+    """
+    failed = [result for result in results if not result.ok]
+    for result in failed:
+        if result.error is not None:
+            log(f"VERIFY ERROR: {result.dst_zip}: {result.error}")
+            continue
+        log(f"VERIFY FAILED: {result.dst_zip}: {len(result.missing)} missing, "
+            f"{len(result.extra)} extra, {len(result.mismatched)} mismatched")
+        for label, names in (("missing", result.missing), ("extra", result.extra),
+                             ("mismatched", result.mismatched)):
+            for name in names:
+                log(f"  {label}: {name}")
+
+    checked = sum(result.checked for result in results)
+    skipped = sum(result.skipped for result in results)
+    log(f"Verified {len(results)} zip files ({checked} members): {len(failed)} failed"
+        + (f", {skipped} skipped without renames" if skipped else ""))
+    return len(failed)
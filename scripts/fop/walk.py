@@ -0,0 +1,106 @@
+"""
+walk.py
+
+Directory walker shared by the FOP maintenance scripts.
+
+A symbol folder holds one folder per expiry, each holding the zip archives:
+
+    data/futureoption/cme/minute/euu/202603/20251224_openinterest_american.zip
+
+The walker is built on os.scandir: the file type of every entry comes with
+the directory listing (d_type), so telling expiry folders from stray files
+costs no extra stat per entry, which matters on network filesystems holding
+millions of files.
+
+walk_symbol is a lazy generator of WorkItem tuples. With workers > 1 the
+expiry folders are listed by a thread pool (listing is I/O bound, the GIL is
+released while waiting on the filesystem) and the items of each expiry are
+yielded as soon as its listing completes, so processing can start before the
+whole tree has been scanned.
+
+Example:
+
+    for item in walk_symbol("data/futureoption/cme/minute/euu", workers=8):
+        process(item.zip_path)
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, List, NamedTuple
+
+
+class WorkItem(NamedTuple):
+    """
+    One zip archive of a symbol folder.
+    """
+    symbol: str
+    expiry: str
+    zip_path: str
+
+
+def relative_symbol_path(symbol_path: str) -> str:
+    """
+    Return the part of symbol_path that is mirrored under an output directory.
+
+    That is the path from its "futureoption" folder on, e.g.
+    futureoption/cme/minute/euu for /mnt/Data/futureoption/cme/minute/euu,
+    and the folder name alone for trees without a "futureoption" folder.
+    """
+    parts = os.path.normpath(os.path.abspath(symbol_path)).split(os.sep)
+    lowered = [part.lower() for part in parts]
+    if "futureoption" in lowered:
+        start = len(lowered) - 1 - lowered[::-1].index("futureoption")
+        return os.path.join(*parts[start:])
+    return parts[-1]
+
+
+def scan_subdirectories(path: str) -> List[os.DirEntry]:
+    """
+    Return the entries of path that are directories, in listing order.
+    """
+    with os.scandir(path) as entries:
+        return [entry for entry in entries if entry.is_dir()]
+
+
+def scan_zip_files(path: str) -> List[os.DirEntry]:
+    """
+    Return the entries of path that are zip files, in listing order.
+    """
+    with os.scandir(path) as entries:
+        return [entry for entry in entries
+                if entry.name.lower().endswith(".zip") and entry.is_file()]
+
+
+def walk_symbol(symbol_path: str, workers: int = 1, symbol: str = None) -> Iterator[WorkItem]:
+    """
+    Lazily yield a WorkItem for every zip file under symbol_path/<expiry>/.
+
+    Args:
+        symbol_path (str): Symbol folder, e.g. data/futureoption/cme/minute/euu.
+        workers (int): Threads listing expiry folders concurrently. With one
+            worker the expiries are listed one after the other.
+        symbol (str): Symbol of the items, defaults to the lower-cased folder name.
+
+    Yields:
+        WorkItem: (symbol, expiry, zip path). The zips of one expiry are yielded
+        together, expiries in listing order (workers=1) or completion order.
+    """
+    symbol = symbol or os.path.basename(os.path.abspath(symbol_path)).lower()
+    expiries = scan_subdirectories(symbol_path)
+
+    if workers <= 1 or len(expiries) <= 1:
+        for expiry in expiries:
+            for entry in scan_zip_files(expiry.path):
+                yield WorkItem(symbol, expiry.name, entry.path)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(scan_zip_files, expiry.path): expiry.name for expiry in expiries}
+        try:
+            for future in as_completed(futures):
+                for entry in future.result():
+                    yield WorkItem(symbol, futures[future], entry.path)
+        finally:
+            # the consumer may stop early, do not keep listing folders nobody reads
+            for future in futures:
+                future.cancel()
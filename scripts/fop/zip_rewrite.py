@@ -0,0 +1,386 @@
+"""
+zip_rewrite.py
+
+Zip rewriting engine shared by the FOP maintenance scripts.
+
+A member that only changes its name does not need to be decompressed and
+compressed again: its already-compressed bytes are copied verbatim into the
+destination archive and only the local file header and the central directory
+entry are regenerated. Rename-only passes are therefore bound by I/O instead
+of deflate.
+
+An archive that would come out identical (no member renamed, no codec
+change) is not rewritten at all: place_unchanged hard-links it into the
+output tree, or skips it.
+
+When a member has to change its codec it is streamed instead: it is read
+through ZipFile.open and written through ZipFile.open(mode="w") with a fixed
+buffer, so peak memory does not depend on the member size.
+
+Every archive is written into a sibling temporary file which is fsynced and
+then renamed over the destination (atomic_zip), so a zip present in the
+output tree is always complete: a crash leaves at most a stray hidden
+".<name>.*.tmp" file behind, never a truncated zip.
+
+compact_zip rewrites an archive in place with a single entry per member
+name (the last one, which is the one zipfile reads), dropping the dead
+duplicates left behind by append-mode merges.
+
+Example:
+
+    with ZipFile(src_path, "r") as src, ZipFile(dst_path, "w") as dst:
+        for info in src.infolist():
+            copy_member_raw(src, info, dst, new_name(info.filename))
+"""
+
+import os
+import shutil
+import struct
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Optional
+from zipfile import ZipFile, ZipInfo, BadZipFile, ZIP_STORED, ZIP_DEFLATED, ZIP_BZIP2, ZIP_LZMA
+
+# 1 MiB buffer, large enough for sequential throughput, small enough to keep memory flat
+CHUNK_SIZE = 1024 * 1024
+
+# --codec choices; "keep" raw-copies every member with its current codec
+CODECS = {
+    "keep": None,
+    "stored": ZIP_STORED,
+    "deflated": ZIP_DEFLATED,
+    "bzip2": ZIP_BZIP2,
+    "lzma": ZIP_LZMA,
+}
+
+
+@dataclass(frozen=True)
+class Compression:
+    """
+    Codec and level used for rewritten members.
+
+    compress_type: zipfile codec, None keeps the codec of every member
+    compresslevel: codec level (deflated 0-9, bzip2 1-9), None for the codec default
+
+    Without a level, members that already use the codec are raw-copied; with a
+    level every member is compressed again.
+    """
+    compress_type: Optional[int] = ZIP_DEFLATED
+    compresslevel: Optional[int] = None
+
+    def keeps(self, info: ZipInfo) -> bool:
+        """
+        Return True when info can be copied without recompression.
+        """
+        return self.compress_type is None or \
+            (self.compress_type == info.compress_type and self.compresslevel is None)
+
+    def __str__(self):
+        codec = next(name for name, value in CODECS.items() if value == self.compress_type)
+        return codec if self.compresslevel is None else f"{codec}:{self.compresslevel}"
+
+
+# deflate at the default level, the codec the FOP archives have always been written with
+DEFAULT_COMPRESSION = Compression()
+
+
+def add_compression_arguments(parser):
+    """
+    Add the --codec and --level options to an argparse parser.
+    """
+    parser.add_argument("--codec", choices=list(CODECS), default="deflated",
+                        help="codec of rewritten members; 'keep' raw-copies every member (default: deflated)")
+    parser.add_argument("--level", type=int,
+                        help="compression level, e.g. 1 for fast temporary output, 9 for archival")
+
+
+def compression_from_args(args) -> Compression:
+    """
+    Build the Compression selected by --codec and --level.
+    """
+    return Compression(CODECS[args.codec], args.level)
+
+
+_LOCAL_FILE_HEADER_SIGNATURE = b"PK\x03\x04"
+_LOCAL_FILE_HEADER_SIZE = 30
+
+_FLAG_ENCRYPTED = 0x01
+_FLAG_DATA_DESCRIPTOR = 0x08
+_FLAG_UTF8 = 0x800
+
+_EXTRA_ZIP64 = 0x0001
+
+
+def _member_data_offset(src: ZipFile, info: ZipInfo) -> int:
+    """
+    Return the offset of the compressed data of info inside src.
+
+    The local header may carry a different extra field length than the central
+    directory, so it has to be read from the local header itself.
+    """
+    src.fp.seek(info.header_offset)
+    header = src.fp.read(_LOCAL_FILE_HEADER_SIZE)
+    if len(header) != _LOCAL_FILE_HEADER_SIZE or header[:4] != _LOCAL_FILE_HEADER_SIGNATURE:
+        raise BadZipFile(f"Bad local file header for member: {info.filename}")
+
+    name_length, extra_length = struct.unpack("<HH", header[26:30])
+    return info.header_offset + _LOCAL_FILE_HEADER_SIZE + name_length + extra_length
+
+
+def _without_zip64_extra(extra: bytes) -> bytes:
+    """
+    Return the extra field records of extra except the ZIP64 one.
+
+    The ZIP64 record holds the sizes and header offset of the member in its
+    source archive; zipfile writes a new one in dst whenever it is needed.
+    """
+    records = []
+    offset = 0
+    while offset + 4 <= len(extra):
+        header_id, size = struct.unpack("<HH", extra[offset:offset + 4])
+        end = offset + 4 + size
+        if header_id != _EXTRA_ZIP64:
+            records.append(extra[offset:end])
+        offset = end
+    return b"".join(records)
+
+
+def _renamed_info(info: ZipInfo, arcname: str) -> ZipInfo:
+    zinfo = ZipInfo(arcname, info.date_time)
+    zinfo.compress_type = info.compress_type
+    zinfo.comment = info.comment
+    # timestamps, unix ids, ... are kept
+    zinfo.extra = _without_zip64_extra(info.extra)
+    zinfo.create_system = info.create_system
+    zinfo.create_version = info.create_version
+    zinfo.extract_version = info.extract_version
+    zinfo.internal_attr = info.internal_attr
+    zinfo.external_attr = info.external_attr
+    # sizes and CRC are known up front, so the copy never needs a data descriptor
+    zinfo.flag_bits = info.flag_bits & ~(_FLAG_DATA_DESCRIPTOR | _FLAG_UTF8)
+    zinfo.CRC = info.CRC
+    zinfo.compress_size = info.compress_size
+    zinfo.file_size = info.file_size
+    return zinfo
+
+
+def copy_member_raw(src: ZipFile, info: ZipInfo, dst: ZipFile, arcname: str = None) -> ZipInfo:
+    """
+    Copy member info of src into dst under arcname without recompressing it.
+
+    Args:
+        src (ZipFile): Source archive opened for reading.
+        info (ZipInfo): Member of src to copy.
+        dst (ZipFile): Destination archive opened for writing ("w", "x" or "a").
+        arcname (str): Name of the member in dst, defaults to info.filename.
+
+    Returns:
+        ZipInfo: The entry written to dst.
+    """
+    if info.flag_bits & _FLAG_ENCRYPTED:
+        raise RuntimeError(f"Encrypted members cannot be copied: {info.filename}")
+    if not dst.fp:
+        raise ValueError("Attempt to write to ZIP archive that was already closed")
+    if dst._writing:
+        raise ValueError("Can't write to ZIP archive while an open writing handle exists")
+
+    zinfo = _renamed_info(info, arcname or info.filename)
+
+    with src._lock, dst._lock:
+        data_offset = _member_data_offset(src, info)
+
+        if dst._seekable:
+            dst.fp.seek(dst.start_dir)
+        zinfo.header_offset = dst.fp.tell()
+        dst._writecheck(zinfo)
+        dst._didModify = True
+        dst.fp.write(zinfo.FileHeader())
+
+        src.fp.seek(data_offset)
+        remaining = info.compress_size
+        while remaining > 0:
+            chunk = src.fp.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                raise BadZipFile(f"Truncated data for member: {info.filename}")
+            dst.fp.write(chunk)
+            remaining -= len(chunk)
+
+        dst.filelist.append(zinfo)
+        dst.NameToInfo[zinfo.filename] = zinfo
+        dst.start_dir = dst.fp.tell()
+
+    return zinfo
+
+
+def copy_member_stream(src: ZipFile, info: ZipInfo, dst: ZipFile, arcname: str = None,
+                       compress_type: int = None, compresslevel: int = None) -> ZipInfo:
+    """
+    Decompress member info of src and compress it again into dst, chunk by chunk.
+
+    Args:
+        src (ZipFile): Source archive opened for reading.
+        info (ZipInfo): Member of src to copy.
+        dst (ZipFile): Destination archive opened for writing ("w", "x" or "a").
+        arcname (str): Name of the member in dst, defaults to info.filename.
+        compress_type (int): Codec of the new member, defaults to dst.compression.
+        compresslevel (int): Level of the codec, defaults to dst.compresslevel.
+
+    Returns:
+        ZipInfo: The entry written to dst.
+    """
+    zinfo = ZipInfo(arcname or info.filename, info.date_time)
+    zinfo.compress_type = dst.compression if compress_type is None else compress_type
+    zinfo._compresslevel = dst.compresslevel if compresslevel is None else compresslevel
+    zinfo.external_attr = info.external_attr
+    zinfo.comment = info.comment
+    # lets zipfile decide up front whether the entry needs zip64 headers
+    zinfo.file_size = info.file_size
+
+    with src.open(info, "r") as reader, dst.open(zinfo, "w") as writer:
+        shutil.copyfileobj(reader, writer, CHUNK_SIZE)
+
+    return zinfo
+
+
+def copy_member(src: ZipFile, info: ZipInfo, dst: ZipFile, arcname: str = None,
+                compress_type: int = None, compresslevel: int = None) -> ZipInfo:
+    """
+    Copy member info of src into dst, recompressing only when it is required.
+
+    The member is raw-copied when Compression(compress_type, compresslevel)
+    keeps it (see Compression.keeps), and streamed through copy_member_stream
+    otherwise.
+    """
+    if Compression(compress_type, compresslevel).keeps(info):
+        return copy_member_raw(src, info, dst, arcname)
+    return copy_member_stream(src, info, dst, arcname, compress_type, compresslevel)
+
+
+def _fsync_directory(path: str):
+    """
+    Persist a rename inside path; a no-op where directories cannot be opened (Windows).
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _sibling_temp_path(path: str) -> str:
+    """
+    Reserve a unique hidden temporary file next to path.
+
+    Being in the same directory keeps the final os.replace a same-filesystem
+    rename; being unique lets parallel workers write side by side.
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory)
+    os.close(fd)
+    return tmp_path
+
+
+def _commit_temp(tmp_path: str, path: str):
+    os.replace(tmp_path, path)
+    _fsync_directory(os.path.dirname(os.path.abspath(path)))
+
+
+@contextmanager
+def atomic_zip(path: str, compression: int = ZIP_DEFLATED, compresslevel: int = None):
+    """
+    Open a ZipFile for writing that only shows up at path once it is complete.
+
+    The archive is written into a sibling temporary file, fsynced and moved
+    over path with os.replace. When the block raises, the temporary file is
+    removed and path is left as it was.
+
+    Example:
+
+        with atomic_zip(out_zip_path) as dst:
+            copy_member(src, info, dst)
+    """
+    tmp_path = _sibling_temp_path(path)
+    try:
+        with open(tmp_path, "wb") as fp:
+            with ZipFile(fp, "w", compression, compresslevel=compresslevel) as zip_file:
+                yield zip_file
+            fp.flush()
+            os.fsync(fp.fileno())
+        _commit_temp(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_copy(src_path: str, dst_path: str):
+    """
+    Copy src_path to dst_path through a fsynced sibling temporary file.
+    """
+    tmp_path = _sibling_temp_path(dst_path)
+    try:
+        shutil.copy2(src_path, tmp_path)
+        with open(tmp_path, "rb+") as fp:
+            os.fsync(fp.fileno())
+        _commit_temp(tmp_path, dst_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def place_unchanged(src_path: str, dst_path: str, skip: bool = False) -> str:
+    """
+    Put an archive that needs no rewrite into the output tree.
+
+    The archive is hard-linked when src_path and dst_path share a filesystem
+    and copied otherwise, which lets the OS use copy_file_range/reflinks.
+
+    Returns:
+        str: "skipped", "linked" or "copied".
+    """
+    if skip:
+        return "skipped"
+
+    os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+    # link under a temporary name first, so dst_path is replaced in one rename
+    tmp_path = _sibling_temp_path(dst_path)
+    os.remove(tmp_path)
+    try:
+        os.link(src_path, tmp_path)
+    except OSError:
+        atomic_copy(src_path, dst_path)
+        return "copied"
+    _commit_temp(tmp_path, dst_path)
+    return "linked"
+
+
+def compact_zip(zip_path: str) -> int:
+    """
+    Drop duplicate member names from zip_path, keeping the last entry of each name.
+
+    The members are raw-copied through atomic_zip, so zip_path is replaced in
+    one rename. Archives without duplicates are left untouched.
+
+    Returns:
+        int: Number of bytes reclaimed.
+    """
+    size_before = os.path.getsize(zip_path)
+    with ZipFile(zip_path, "r") as src:
+        infos = src.infolist()
+        last_entries = {info.filename: info for info in infos}
+        if len(last_entries) == len(infos):
+            return 0
+
+        with atomic_zip(zip_path, ZIP_STORED) as dst:
+            for info in last_entries.values():
+                copy_member_raw(src, info, dst)
+
+    return size_before - os.path.getsize(zip_path)
@@ -0,0 +1,79 @@
+"""
+fop_maintenance.py
+
+Library entry point of the FOP maintenance scripts, for callers running them
+in-process (e.g. a scheduler handling many symbols) instead of starting one
+interpreter per symbol through their sys.argv driven main().
+
+    from scripts import fop_maintenance
+
+    result = fop_maintenance.run(
+        ["data/futureoption/cme/minute/euu", "data/futureoption/cme/minute/cau"],
+        "/mnt/output", workers=8, mode="fix-and-merge")
+    if not result.ok:
+        for message in result.errors:
+            ...
+    result.summary["latency_seconds"]["p99"]
+
+Modes:
+
+- precision: strike precision fix (fix_missed_strike_price_precision.run)
+- cad: CAD strike rescaling (fix_cad_future_strike.run)
+- merge: expiry folders merged into their quarter folders (merge_future_option_expiry.run)
+- fix-and-merge: every fix of the symbol and the merge in one pass (fix_and_merge_future_option.run)
+
+Nothing is printed (the merge modes log through the logging module); the
+outcome is returned as a fop.metrics.RunResult whose errors list every
+invalid path, symbol without rules and failed zip.
+"""
+
+from typing import Iterable
+
+try:
+    from . import (
+        fix_and_merge_future_option, fix_cad_future_strike, fix_missed_strike_price_precision,
+        merge_future_option_expiry)
+    from .fop.metrics import RunResult
+except ImportError:  # executed directly: python scripts/<script>.py
+    import fix_and_merge_future_option
+    import fix_cad_future_strike
+    import fix_missed_strike_price_precision
+    import merge_future_option_expiry
+    from fop.metrics import RunResult
+
+# mode -> run(paths, out_root, **options) of the script implementing it
+MODES = {
+    "precision": fix_missed_strike_price_precision.run,
+    "cad": fix_cad_future_strike.run,
+    "merge": merge_future_option_expiry.run,
+    "fix-and-merge": fix_and_merge_future_option.run,
+}
+
+# modes processing zips in a process pool, the other ones ignore workers
+PARALLEL_MODES = {"precision", "fix-and-merge"}
+
+
+def run(paths: Iterable[str], out_root: str, workers: int = 1, mode: str = "fix-and-merge",
+        **options) -> RunResult:
+    """
+    Run one maintenance mode over the symbol folders into out_root.
+
+    Args:
+        paths (Iterable[str]): Symbol folders, e.g. data/futureoption/cme/minute/euu.
+        out_root (str): Output directory, the folders are mirrored under it.
+        workers (int): Processes of the modes in PARALLEL_MODES.
+        mode (str): One of MODES.
+        **options: Further keyword arguments of the mode's run(), e.g.
+            compression, resume or skip_unchanged.
+
+    Returns:
+        RunResult: The run summary, the metrics of every zip and the errors.
+
+    Raises:
+        ValueError: Unknown mode.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode '{mode}', expected one of: {', '.join(MODES)}")
+    if mode in PARALLEL_MODES:
+        options["workers"] = workers
+    return MODES[mode](list(paths), out_root, **options)
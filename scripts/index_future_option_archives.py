@@ -0,0 +1,116 @@
+"""
+index_future_option_archives.py
+
+Build (or query) a sidecar SQLite index of the members of FOP archives, so
+downstream jobs can find which strikes and rights exist for a date without
+opening any zip (see fop/index.py for the schema).
+
+Usage (required):
+  python scripts/index_future_option_archives.py [--index FILE] [--workers N] <path1> [<path2> ...]
+  python scripts/index_future_option_archives.py [--index FILE] --date YYYYMMDD [--right {call,put}]
+      [--expiry YYYYMM] [--expiry-folder YYYYMM] [--tick-type TYPE] <path1> [<path2> ...]
+
+Each provided path should be a symbol folder:
+  data/futureoption/<exchange>/minute/<symbol>
+
+Without --index the index of a symbol is written next to its expiry folders,
+in <symbol folder>/fop-index.sqlite; with --index every path goes to the
+given file. Only the central directories are read, by --workers threads
+(default: 4). Re-running updates the index incrementally: archives whose size
+and mtime did not change are not opened again.
+
+With --date nothing is indexed; the distinct strikes of the matching members
+are printed instead, e.g. all call strikes for 20251103 expiring in 202603:
+
+  python scripts/index_future_option_archives.py --date 20251103 --right call --expiry 202603 \\
+      data/futureoption/cme/minute/euu
+"""
+
+import os
+import sys
+import argparse
+import logging
+
+try:
+    from .fop.index import FopIndex
+except ImportError:  # executed directly: python scripts/<script>.py
+    from fop.index import FopIndex
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(levelname)s: %(message)s'
+)
+
+INDEX_FILE_NAME = "fop-index.sqlite"
+
+
+def index_path_for(symbol_path: str, index_path: str = None) -> str:
+    """
+    Return the index file of symbol_path: index_path when given, else its sidecar file.
+    """
+    return index_path or os.path.join(symbol_path, INDEX_FILE_NAME)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Index the members of future option archives in a sidecar SQLite file.")
+    parser.add_argument("paths", nargs="*",
+                        help="symbol folders, e.g. data/futureoption/cme/minute/euu")
+    parser.add_argument("--index",
+                        help=f"index file shared by every path (default: <symbol folder>/{INDEX_FILE_NAME})")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="threads reading central directories (default: 4)")
+    parser.add_argument("--date", help="query: print the strikes of this YYYYMMDD date instead of indexing")
+    parser.add_argument("--right", choices=["call", "put"], help="query: only this option right")
+    parser.add_argument("--expiry", help="query: option expiry prefix, YYYY, YYYYMM or YYYYMMDD")
+    parser.add_argument("--expiry-folder", help="query: only archives of this YYYYMM expiry folder")
+    parser.add_argument("--tick-type", help="query: only this tick type, e.g. quote, trade, openinterest")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+
+    if not args.paths:
+        raise RuntimeError(
+            "No path argument provided. This script requires one or more symbol paths to run.\n"
+            "Example:\n  python3 scripts/index_future_option_archives.py data/futureoption/cme/minute/euu"
+        )
+    if args.workers < 1:
+        raise RuntimeError(f"--workers must be at least 1, got {args.workers}")
+
+    error_messages = []
+    for provided_path in args.paths:
+        provided_path_abs = os.path.abspath(provided_path)
+        if not os.path.isdir(provided_path_abs):
+            error_messages.append(f"Provided path is not a directory: {provided_path_abs}")
+            continue
+
+        symbol = os.path.basename(provided_path_abs).lower()
+        with FopIndex(index_path_for(provided_path_abs, args.index)) as index:
+            if args.date:
+                strikes = index.strikes(args.date, args.right, args.expiry, symbol, args.tick_type,
+                                        args.expiry_folder)
+                logging.info(f"{symbol} {args.date}: {len(strikes)} strikes")
+                print("\n".join(strikes))
+                continue
+
+            logging.info(f"Indexing provided path: {provided_path_abs} -> {index.path}")
+            result = index.update(provided_path_abs, args.workers)
+            archives, members = index.stats()
+            logging.info(f"Indexed {result.indexed} zip files ({result.members} members), "
+                         f"{result.unchanged} unchanged, {result.removed} removed, "
+                         f"{result.skipped_members} members not matching the FOP pattern; "
+                         f"index holds {archives} zip files, {members} members")
+            error_messages.extend(result.errors)
+
+    if error_messages:
+        logging.error("Completed with %d error(s):", len(error_messages))
+        for msg in error_messages:
+            logging.error(msg)
+    else:
+        logging.info("Done ✔")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,29 +11,70 @@ Folder structure:
 - Only quarter months (March, June, September, December) are considered "correct" expiries.
 - If a folder is not a quarter month, its contents are merged into the next quarter folder.
 - ZIP files inside each expiry folder are merged (added or overwritten if duplicates) in the target folder.
+  Each target ZIP is written once from all of its sources, keeping only the last entry of a duplicate name.
 
 Example usage:
 
     python scripts/merge_future_option_expiry.py data/futureoption/cme/minute/cau
 
+    # fast level-1 deflate for temporary output (--codec keep raw-copies every member)
+    python scripts/merge_future_option_expiry.py --level 1 data/futureoption/cme/minute/cau
+
+    # only print and export the source -> target mapping
+    python scripts/merge_future_option_expiry.py --plan data/futureoption/cme/minute/cau
+
+    # compare the merged output with its sources (CRC32 and sizes only, nothing is extracted)
+    python scripts/merge_future_option_expiry.py --verify data/futureoption/cme/minute/cau
+
+    # JSON run summary with the p50/p99 latency per destination zip
+    python scripts/merge_future_option_expiry.py --metrics merge-metrics.json data/futureoption/cme/minute/cau
+
+    # continue an interrupted run, skipping the zips that were already merged
+    python scripts/merge_future_option_expiry.py --resume data/futureoption/cme/minute/cau
+
 Output:
 
 - Merged folders are written to "temp-output-directory" in the same relative structure
   as the source folders.
 - Logs show which folders were merged or skipped.
+- run(paths, out_root) merges into any directory and returns a RunResult,
+  for callers importing this module (see fop_maintenance.py).
 """
 
 import os
 import sys
-import shutil
+import argparse
+import json
+from bisect import bisect_right
 import logging
+import time
 from datetime import datetime
-from zipfile import ZipFile, ZIP_DEFLATED
+from zipfile import ZipFile
 from dataclasses import dataclass, field
-from typing import List
+from typing import Dict, Iterable, List
+
+try:
+    from .fop.journal import Journal
+    from .fop.metrics import ArchiveMetrics, RunMetrics, RunResult, add_metrics_arguments, profiling
+    from .fop.verify import report, verify_groups
+    from .fop.walk import scan_zip_files
+    from .fop.zip_rewrite import (
+        DEFAULT_COMPRESSION, Compression, add_compression_arguments, atomic_copy, atomic_zip,
+        compression_from_args, copy_member)
+except ImportError:  # executed directly: python scripts/<script>.py
+    from fop.journal import Journal
+    from fop.metrics import ArchiveMetrics, RunMetrics, RunResult, add_metrics_arguments, profiling
+    from fop.verify import report, verify_groups
+    from fop.walk import scan_zip_files
+    from fop.zip_rewrite import (
+        DEFAULT_COMPRESSION, Compression, add_compression_arguments, atomic_copy, atomic_zip,
+        compression_from_args, copy_member)
 
 QUARTER_MONTHS = {3, 6, 9, 12}  # March, June, September, December
 
+# resumable runs record merged zips here, inside the output directory
+JOURNAL_FILE_NAME = "merge_future_option_expiry.journal.jsonl"
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -78,9 +119,13 @@ def get_sorted_expiry_folders(path: str) -> List[ExpiryFolder]:
     """
     folders: List[ExpiryFolder] = []
 
-    for name in os.listdir(path):
-        full_path = os.path.join(path, name)
-        if not os.path.isdir(full_path):
+    # the DirEntry type comes with the listing, no extra stat per entry
+    with os.scandir(path) as entries:
+        entries = list(entries)
+
+    for entry in entries:
+        name = entry.name
+        if not entry.is_dir():
             logging.warning(f"Skipping non-directory file: {name}")
             continue  # skip files
 
@@ -127,83 +172,311 @@ def next_quarter(expiry: ExpiryFolder, all_folders: List[ExpiryFolder]) -> Expir
     return computed
 
 
-def merge_zip(src_zip: str, dst_zip: str):
+@dataclass(frozen=True)
+class MergeStep:
     """
-    Merge src_zip into dst_zip (append files).
+    Planned merge of one source expiry folder.
+
+    source: expiry folder being merged
+    target: quarter folder receiving its zip files (source itself for quarters)
+    created: True when the target quarter folder does not exist in the source tree
     """
-    if not os.path.exists(dst_zip):
-        shutil.copy(src_zip, dst_zip)
-        return
+    source: ExpiryFolder
+    target: ExpiryFolder
+    created: bool = False
+
 
-    with ZipFile(dst_zip, "a", ZIP_DEFLATED) as dst, ZipFile(src_zip, "r") as src:
-        for name in src.namelist():
-            dst.writestr(name, src.read(name))
+def plan_merge(expiries: List[ExpiryFolder]) -> List[MergeStep]:
+    """
+    Resolve the target quarter of every expiry folder in a single pass.
 
+    The quarter folders are collected once into a sorted array and every
+    non-quarter folder is resolved with a bisect, O(n log n) in total. A folder
+    goes to the first quarter folder after it; when there is none, the next
+    calendar quarter is created, like next_quarter does.
 
-def merge_expiries(src_root: str, out_root: str, data_root: str = "data"):
-    expiries = get_sorted_expiry_folders(src_root)
-    known = {e.name: e for e in expiries}
+    Args:
+        expiries (List[ExpiryFolder]): Expiry folders sorted by expiry date.
+    """
+    quarters = [exp for exp in expiries if exp.is_quarter]
+    quarter_dates = [quarter.expiry_date for quarter in quarters]
 
+    steps: List[MergeStep] = []
     for exp in expiries:
         if exp.is_quarter:
-            target = exp
+            steps.append(MergeStep(exp, exp))
+            continue
+
+        index = bisect_right(quarter_dates, exp.expiry_date)
+        if index < len(quarters):
+            steps.append(MergeStep(exp, quarters[index]))
+            continue
+
+        computed = compute_next_quarter(exp.expiry_date)
+        insert_at = bisect_right(quarter_dates, computed.expiry_date)
+        quarters.insert(insert_at, computed)
+        quarter_dates.insert(insert_at, computed.expiry_date)
+        steps.append(MergeStep(exp, computed, created=True))
+
+    return steps
+
+
+def merge_plan_to_dict(src_root: str, out_root: str, steps: List[MergeStep],
+                       data_root: str = "data") -> dict:
+    """
+    Describe a merge plan as plain data: every source zip and the zip it goes to.
+
+    Only the expiry folders are listed, no zip file is opened.
+    """
+    rel_path = os.path.relpath(src_root, data_root)
+    entries = []
+    for step in steps:
+        src_dir = os.path.join(src_root, step.source.name)
+        dst_dir = os.path.join(out_root, rel_path, step.target.name)
+        zip_files = sorted(entry.name for entry in scan_zip_files(src_dir))
+        entries.append({
+            "source": step.source.name,
+            "target": step.target.name,
+            "created": step.created,
+            "zips": {os.path.join(src_dir, file): os.path.join(dst_dir, file) for file in zip_files},
+        })
+    return {"src_root": src_root, "out_root": out_root, "steps": entries}
+
+
+def merge_zips(src_zips: List[str], dst_zip: str, compression: Compression = DEFAULT_COMPRESSION):
+    """
+    Merge several source zips into dst_zip, writing dst_zip only once.
+
+    An existing dst_zip takes part as the first source. When a member name
+    appears more than once the last one wins (later sources override earlier
+    ones), so the result holds a single entry per name. Members are raw-copied
+    unless compression asks for another codec or level, and the new archive is
+    written through atomic_zip, so dst_zip is replaced in a single rename.
+    """
+    sources = ([dst_zip] if os.path.exists(dst_zip) else []) + list(src_zips)
+    if not sources:
+        return
+
+    src_files = [ZipFile(src, "r") for src in sources]
+    try:
+        # name -> (source archive, member) of the last writer
+        winners = {}
+        for src in src_files:
+            for info in src.infolist():
+                winners[info.filename] = (src, info)
+
+        # a lone source without duplicate names nor codec change would come out identical
+        if len(src_files) == 1 and len(winners) == len(src_files[0].infolist()) and \
+                all(compression.keeps(info) for _, info in winners.values()):
+            atomic_copy(sources[0], dst_zip)
+            return
+
+        with atomic_zip(dst_zip) as dst:
+            for src, info in winners.values():
+                copy_member(src, info, dst, compress_type=compression.compress_type,
+                            compresslevel=compression.compresslevel)
+    finally:
+        for src in src_files:
+            src.close()
+
+
+def merge_zip(src_zip: str, dst_zip: str, compression: Compression = DEFAULT_COMPRESSION):
+    """
+    Merge src_zip into dst_zip (add files, overwrite duplicates).
+    """
+    merge_zips([src_zip], dst_zip, compression)
+
+
+def collect_merge_groups(src_root: str, out_root: str, data_root: str = "data",
+                         steps: List[MergeStep] = None, journal: Journal = None) -> Dict[str, List[str]]:
+    """
+    Map every destination zip under out_root to its source zips, in expiry order.
+
+    Args:
+        steps: merge plan of src_root, defaults to plan_merge of its expiry folders.
+        journal: source zips recorded as done in it are left out.
+    """
+    if steps is None:
+        steps = plan_merge(get_sorted_expiry_folders(src_root))
+    # Preserve folder structure relative to source
+    rel_path = os.path.relpath(src_root, data_root)
+    merge_groups: Dict[str, List[str]] = {}
+
+    for step in steps:
+        exp, target = step.source, step.target
+        if exp.is_quarter:
             logging.info(f"{exp.name} is a quarter expiry")
         else:
-            target = next_quarter(exp, list(known.values()))
+            if step.created:
+                logging.info(f"Creating next quarter: {exp.name} -> {target.name}")
             logging.info(f"Merging {exp.name} -> {target.name}")
 
-            if target.name not in known:
-                known[target.name] = target
-
-        # Preserve folder structure relative to source
-        rel_path = os.path.relpath(src_root, data_root)
         src_dir = os.path.join(src_root, exp.name)
         dst_dir = os.path.join(out_root, rel_path, target.name)
-        os.makedirs(dst_dir, exist_ok=True)
 
-        # Execute merge
-        for file in os.listdir(src_dir):
-            if not file.lower().endswith(".zip"):
+        # Collect every source zip per destination, in expiry order
+        for entry in scan_zip_files(src_dir):
+            src_zip = entry.path
+            dst_zip = os.path.join(dst_dir, entry.name)
+
+            if journal is not None and journal.is_done(src_zip):
+                logging.info(f"Already merged (journal): {src_zip}")
                 continue
 
-            src_zip = os.path.join(src_dir, file)
-            dst_zip = os.path.join(dst_dir, file)
+            merge_groups.setdefault(dst_zip, []).append(src_zip)
 
-            merge_zip(src_zip, dst_zip)
+    return merge_groups
 
 
-def main():
-    if len(sys.argv) <= 1:
+def merge_expiries(src_root: str, out_root: str, data_root: str = "data", journal: Journal = None,
+                   compression: Compression = DEFAULT_COMPRESSION, metrics: RunMetrics = None):
+    """
+    Merge every expiry folder of src_root into its quarter folder under out_root.
+
+    All the source zips aimed at one destination zip are collected first and
+    merged in one write. With a journal, source zips merged by an earlier run
+    are skipped and every merged source zip is recorded, so an interrupted run
+    can be resumed. With metrics, the timing and sizes of every destination
+    zip are added to it.
+    """
+    merge_groups = collect_merge_groups(src_root, out_root, data_root, journal=journal)
+
+    # Execute merge: each destination zip is written once
+    for dst_zip, src_zips in merge_groups.items():
+        started = time.perf_counter()
+        merge_zips(src_zips, dst_zip, compression)
+        if metrics is not None:
+            metrics.add(ArchiveMetrics.measure(src_zips, dst_zip, time.perf_counter() - started))
+
+        if journal is not None:
+            for src_zip in src_zips:
+                journal.record(src_zip, dst_zip)
+
+
+def check_symbol_path(provided_path: str) -> List[str]:
+    """
+    Return the lower-cased components of a data/futureoption/<exchange>/minute/<symbol> path.
+
+    Raises:
+        RuntimeError: The path has another format or is not a directory.
+    """
+    parts = os.path.normpath(provided_path.lower()).split(os.sep)
+    if len(parts) != 5 or parts[0] != "data" or parts[1] != "futureoption" or parts[3] != "minute":
         raise RuntimeError(
-            "No path argument provided. This script requires one or more symbol paths to run.\n"
-            "Example:\n  python3 scripts/merge_future_option_expiry.py data/futureoption/cme/minute/adu\n"
-            "or multiple:\n  python3 scripts/merge_future_option_expiry.py data/futureoption/cme/minute/adu data/futureoption/cbot/minute/ozs"
-        )
+            f"Invalid path format: {provided_path}\nExpected: data/futureoption/<exchange>/minute/<symbol>")
+    if not os.path.isdir(provided_path):
+        raise RuntimeError(f"Provided path is not a directory: {os.path.abspath(provided_path)}")
+    return parts
 
-    error_messages = []
-    for provided_path in sys.argv[1:]:
-        parts = os.path.normpath(provided_path.lower()).split(os.sep)
 
-        if len(parts) != 5 or parts[0] != "data" or parts[1] != "futureoption" or parts[3] != "minute":
-            msg = f"Invalid path format: {provided_path}\nExpected: data/futureoption/<exchange>/minute/<symbol>"
-            error_messages.append(msg)
-            continue
+def run(paths: Iterable[str], out_root: str, compression: Compression = DEFAULT_COMPRESSION,
+        resume: bool = False, metrics: RunMetrics = None) -> RunResult:
+    """
+    Merge the expiry folders of every symbol folder into out_root.
 
-        provided_path_abs = os.path.abspath(provided_path)
-        if not os.path.isdir(provided_path_abs):
-            msg = f"Provided path is not a directory: {provided_path_abs}"
-            error_messages.append(msg)
-            continue
+    Library entry point of the script: progress goes to logging only and the
+    outcome is returned. Invalid paths and failed symbol folders are reported
+    in RunResult.errors and do not stop the other ones.
+
+    Args:
+        paths (Iterable[str]): Symbol folders, data/futureoption/<exchange>/minute/<symbol>.
+        out_root (str): Output directory, receiving futureoption/<exchange>/minute/<symbol>.
+        resume (bool): Skip (and record) merged zips in a journal inside out_root.
+        metrics (RunMetrics): Collector to fill, a new one by default.
+    """
+    metrics = metrics if metrics is not None else RunMetrics()
+    os.makedirs(out_root, exist_ok=True)
+    journal = Journal(os.path.join(out_root, JOURNAL_FILE_NAME)) if resume else None
+
+    for provided_path in paths:
+        try:
+            parts = check_symbol_path(provided_path)
+            logging.info(f"Processing provided path: {os.path.abspath(provided_path)}")
+            merge_expiries(os.path.abspath(provided_path), out_root, parts[0], journal, compression, metrics)
+        except Exception as e:
+            metrics.add_error(str(e))
+    return metrics.result(out_root)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Merge future option expiry folders into their quarter folders.")
+    parser.add_argument("paths", nargs="*",
+                        help="symbol folders, e.g. data/futureoption/cme/minute/adu")
+    parser.add_argument("--plan", action="store_true",
+                        help="only report the source -> target mapping, do not touch any zip")
+    parser.add_argument("--manifest",
+                        help="JSON file for the --plan mapping (default: temp-output-directory/merge-plan.json)")
+    add_compression_arguments(parser)
+    parser.add_argument("--resume", action="store_true",
+                        help="skip zips recorded as merged in the output journal and record new ones")
+    parser.add_argument("--verify", action="store_true",
+                        help="compare the CRC32 and sizes of an earlier run's output with the sources, do not write")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="processes comparing zip files for --verify (default: CPU count)")
+    add_metrics_arguments(parser)
+    return parser.parse_args(argv)
 
-        temp_output_directory = os.path.join(os.path.dirname(
-            os.path.abspath(__file__)), "temp-output-directory")
 
-        # Prepare output
-        os.makedirs(temp_output_directory, exist_ok=True)
+def main():
+    args = parse_args(sys.argv[1:])
 
-        logging.info(f"Processing provided path: {provided_path_abs}")
+    if not args.paths:
+        raise RuntimeError(
+            "No path argument provided. This script requires one or more symbol paths to run.\n"
+            "Example:\n  python3 scripts/merge_future_option_expiry.py data/futureoption/cme/minute/adu\n"
+            "or multiple:\n  python3 scripts/merge_future_option_expiry.py data/futureoption/cme/minute/adu data/futureoption/cbot/minute/ozs"
+        )
 
-        merge_expiries(provided_path_abs, temp_output_directory, parts[0])
+    error_messages = []
+    merge_plans = []
+    metrics = RunMetrics()
+    temp_output_directory = os.path.join(os.path.dirname(
+        os.path.abspath(__file__)), "temp-output-directory")
+    with profiling(args.profile, args.tracemalloc, logging.info):
+        if not args.plan and not args.verify:
+            result = run(args.paths, temp_output_directory, compression_from_args(args), args.resume, metrics)
+            error_messages.extend(result.errors)
+        else:
+            for provided_path in args.paths:
+                try:
+                    parts = check_symbol_path(provided_path)
+                except RuntimeError as e:
+                    error_messages.append(str(e))
+                    continue
+
+                provided_path_abs = os.path.abspath(provided_path)
+
+                # Prepare output
+                os.makedirs(temp_output_directory, exist_ok=True)
+
+                logging.info(f"Processing provided path: {provided_path_abs}")
+
+                if args.plan:
+                    steps = plan_merge(get_sorted_expiry_folders(provided_path_abs))
+                    for step in steps:
+                        created = " (created)" if step.created else ""
+                        logging.info(f"Plan: {step.source.name} -> {step.target.name}{created}")
+                    merge_plans.append(merge_plan_to_dict(
+                        provided_path_abs, temp_output_directory, steps, parts[0]))
+                    continue
+
+                results = verify_groups(
+                    ((src_zips, dst_zip, None) for dst_zip, src_zips in collect_merge_groups(
+                        provided_path_abs, temp_output_directory, parts[0]).items()), args.workers)
+                if report(results, logging.info):
+                    error_messages.append(f"Verification failed for: {provided_path_abs}")
+
+    if args.plan:
+        manifest_path = args.manifest or os.path.join(os.path.dirname(
+            os.path.abspath(__file__)), "temp-output-directory", "merge-plan.json")
+        os.makedirs(os.path.dirname(os.path.abspath(manifest_path)), exist_ok=True)
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(merge_plans, f, indent=2)
+        logging.info(f"Merge plan written to: {manifest_path}")
+    elif args.metrics and not args.verify:
+        metrics.write_json(args.metrics)
+        logging.info(f"Metrics written to: {args.metrics}")
 
     if error_messages:
         logging.error("Completed with %d error(s):", len(error_messages))
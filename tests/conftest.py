@@ -0,0 +1,81 @@
+"""
+conftest.py
+
+Fixtures and helpers shared by the tests.
+"""
+
+import os
+from zipfile import ZipFile, ZIP_STORED
+
+import pytest
+
+EMSX_SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "scripts", "brokerage_eze", "scripts")
+
+EMSX_SAMPLE_CONFIG = """[Auth Config Section]
+password = secret
+server = emsx.example.com
+user = trader
+domain = DOMAIN
+locale = en-us
+port = 9000
+ssl = false
+srp_login = false
+keep_alive_time = 3600000
+keep_alive_timeout = 30000
+max_retry_count = 3
+retry_delay_ms = 1000
+connect_timeout_ms = 3000
+check_internet = false
+"""
+
+
+@pytest.fixture
+def emsx_config_file(tmp_path):
+    """
+    Factory writing the sample EMSX configuration, with options overriding or
+    adding keys, returns its absolute path.
+    """
+    def write(**options):
+        lines = [line for line in EMSX_SAMPLE_CONFIG.splitlines() if line.split(" = ")[0] not in options]
+        lines += [f"{key} = {value}" for key, value in options.items()]
+        cfg_path = tmp_path / "config.cfg"
+        cfg_path.write_text("\n".join(lines) + "\n")
+        return str(cfg_path)
+    return write
+
+
+@pytest.fixture
+def emsx_scripts(monkeypatch):
+    """
+    Puts the EMSX scripts, which import each other as top-level modules, on sys.path.
+    """
+    monkeypatch.syspath_prepend(EMSX_SCRIPTS_DIR)
+
+
+@pytest.fixture
+def emsxapilibrary(emsx_scripts):
+    """
+    The emsxapilibrary module; tests using it are skipped without grpc, srp and protobuf.
+    """
+    pytest.importorskip("grpc")
+    pytest.importorskip("srp")
+    pytest.importorskip("google.protobuf")
+    import emsxapilibrary
+    return emsxapilibrary
+
+
+@pytest.fixture
+def write_zip():
+    """
+    Factory writing a zip (parent folders included): members maps names to
+    data, a list of names stores every name as its own data.
+    """
+    def write(path, members, compression=ZIP_STORED):
+        if not isinstance(members, dict):
+            members = {name: name for name in members}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with ZipFile(path, "w", compression) as z:
+            for name, data in members.items():
+                z.writestr(name, data)
+    return write
@@ -0,0 +1,227 @@
+"""
+test_asyncemsxapilibrary.py
+
+Pytest tests for scripts/brokerage_eze/scripts/asyncemsxapilibrary.py.
+
+These tests verify that:
+
+1. open_channel creates the stubs of each service once every channel is ready.
+2. Channels not ready within connect_timeout_ms are closed and reported.
+3. The heartbeat runs as a task that stops its server stream when cancelled.
+4. Every client has its own channel lock; concurrent create() calls open once.
+5. Closing the channels drops the stubs built on them.
+
+They need grpc, srp and protobuf and are skipped without them; grpc.aio
+channels and stubs are replaced by fakes, no server is contacted.
+
+Example:
+
+    pytest -v tests/test_asyncemsxapilibrary.py
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+
+class FakeAioChannel:
+    def __init__(self, target, ready):
+        self.target = target
+        self.ready = ready
+        self.closed = False
+
+    async def channel_ready(self):
+        if not self.ready:
+            await asyncio.Event().wait()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeHeartbeatCall:
+    def __init__(self, status):
+        self.status = status
+        self.responses = 0
+        self.cancelled = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(0.01)
+        self.responses += 1
+        return SimpleNamespace(Status=self.status, Acknowledgement=SimpleNamespace(ServerResponse="success"))
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class FakeStub:
+    def __init__(self, channel):
+        self.channel = channel
+        self.calls = []
+
+    def SubscribeHeartBeat(self, request):
+        call = FakeHeartbeatCall(self.status)
+        self.calls.append(call)
+        return call
+
+
+@pytest.fixture
+def asyncemsxapilibrary(emsxapilibrary, monkeypatch):
+    import asyncemsxapilibrary
+    FakeStub.status = emsxapilibrary.HeartBeatStatus.LIVE
+    monkeypatch.setattr(asyncemsxapilibrary.utilities_pb2_grpc, "UtilityServicesStub", FakeStub)
+    monkeypatch.setattr(asyncemsxapilibrary.market_data_pb2_grpc, "MarketDataServiceStub", FakeStub)
+    monkeypatch.setattr(asyncemsxapilibrary.order_pb2_grpc, "SubmitOrderServiceStub", FakeStub)
+    monkeypatch.setattr(asyncemsxapilibrary.AsyncEMSXAPILibrary, "instance", None)
+    return asyncemsxapilibrary
+
+
+@pytest.fixture
+def fake_channels(asyncemsxapilibrary, monkeypatch):
+    """
+    Channels created by grpc.aio.insecure_channel; set fake_channels.ready to False for a server that never answers.
+    """
+    created = []
+
+    def insecure_channel(target, options=None):
+        created.append(FakeAioChannel(target, insecure_channel.ready))
+        return created[-1]
+
+    insecure_channel.ready = True
+    insecure_channel.created = created
+    monkeypatch.setattr(asyncemsxapilibrary.grpc.aio, "insecure_channel", insecure_channel)
+    return insecure_channel
+
+
+def test_open_channel_creates_stubs(asyncemsxapilibrary, fake_channels, emsx_config_file):
+    """Test that every service gets the stubs of its channels once the pool is ready."""
+    lib = asyncemsxapilibrary.AsyncEMSXAPILibrary(emsx_config_file(channel_pool_size=2))
+    asyncio.run(lib.open_channel())
+
+    channels = fake_channels.created
+    assert [channel.target for channel in channels] == ["emsx.example.com:9000"] * 2
+    assert lib.get_utility_service_stub().channel is channels[0]
+    assert lib.get_order_service_stub().channel is channels[0]
+    assert lib.get_market_data_service_stub().channel is channels[1]
+
+
+def test_open_channel_deadline(asyncemsxapilibrary, fake_channels, emsx_config_file):
+    """Test that channels not ready within connect_timeout_ms are closed and the server reported down."""
+    from ServerNotAvailableException import ServerNotAvailableException
+    fake_channels.ready = False
+    lib = asyncemsxapilibrary.AsyncEMSXAPILibrary(emsx_config_file(channel_pool_size=2, connect_timeout_ms=50))
+
+    start = time.monotonic()
+    with pytest.raises(ServerNotAvailableException):
+        asyncio.run(lib.open_channel())
+
+    assert time.monotonic() - start < 1
+    assert all(channel.closed for channel in fake_channels.created)
+    assert lib._channels == []
+    assert lib.get_order_service_stub() is None
+
+
+def test_open_channel_network_failure(asyncemsxapilibrary, fake_channels, emsx_config_file, monkeypatch):
+    """Test that a failed internet probe turns the timeout into a network failure."""
+    from NetworkFailedException import NetworkFailedException
+    monkeypatch.setattr(asyncemsxapilibrary.EMSXAPILibrary, "_can_connect", staticmethod(lambda *args: False))
+    fake_channels.ready = False
+    lib = asyncemsxapilibrary.AsyncEMSXAPILibrary(emsx_config_file(connect_timeout_ms=50, check_internet="true"))
+
+    with pytest.raises(NetworkFailedException):
+        asyncio.run(lib.open_channel())
+
+
+def test_open_channel_slow_probe(asyncemsxapilibrary, fake_channels, emsx_config_file, monkeypatch):
+    """Test that a probe still connecting at the deadline neither delays the error nor asyncio.run."""
+    from NetworkFailedException import NetworkFailedException
+    monkeypatch.setattr(asyncemsxapilibrary.EMSXAPILibrary, "_can_connect",
+                        staticmethod(lambda *args: time.sleep(5) or True))
+    fake_channels.ready = False
+    lib = asyncemsxapilibrary.AsyncEMSXAPILibrary(emsx_config_file(connect_timeout_ms=50, check_internet="true"))
+
+    start = time.monotonic()
+    with pytest.raises(NetworkFailedException):
+        asyncio.run(lib.open_channel())
+
+    assert time.monotonic() - start < 1
+
+
+def test_close_channel_drops_stubs(asyncemsxapilibrary, fake_channels, emsx_config_file):
+    """Test that no service hands out a stub of a closed channel."""
+    lib = asyncemsxapilibrary.AsyncEMSXAPILibrary(emsx_config_file(channel_pool_size=2))
+
+    async def scenario():
+        await lib.open_channel()
+        await lib.close_channel()
+
+    asyncio.run(scenario())
+
+    assert all(channel.closed for channel in fake_channels.created)
+    assert lib.get_utility_service_stub() is None
+    assert lib.get_market_data_service_stub() is None
+    assert lib.get_order_service_stub() is None
+
+
+def test_heartbeat_task_start_and_cancel(asyncemsxapilibrary, fake_channels, emsx_config_file):
+    """Test that the heartbeat task consumes the stream until suspended, then cancels the call."""
+    lib = asyncemsxapilibrary.AsyncEMSXAPILibrary(emsx_config_file())
+
+    async def scenario():
+        await lib.open_channel()
+        lib.is_logged_in = True
+        await lib.start_listening_heartbeat(60)
+        await asyncio.sleep(0.05)
+        running = not lib.heartbeat_task.done()
+        task = lib.heartbeat_task
+        await lib.suspend_heartbeat_task()
+        return running, task
+
+    running, task = asyncio.run(scenario())
+
+    assert running
+    assert task.cancelled()
+    assert lib.heartbeat_task is None
+    (call,) = lib.get_utility_service_stub().calls
+    assert call.responses > 0
+    assert call.cancelled
+
+
+def test_heartbeat_requires_login(asyncemsxapilibrary, emsx_config_file):
+    """Test that the heartbeat is not started before login."""
+    lib = asyncemsxapilibrary.AsyncEMSXAPILibrary(emsx_config_file())
+
+    with pytest.raises(Exception, match="login first"):
+        asyncio.run(lib.start_listening_heartbeat(60))
+
+
+def test_channel_lock_per_client(asyncemsxapilibrary, fake_channels, emsx_config_file):
+    """Test that a client opening its channels does not wait for another client's lock."""
+    first = asyncemsxapilibrary.AsyncEMSXAPILibrary(emsx_config_file())
+    second = asyncemsxapilibrary.AsyncEMSXAPILibrary(emsx_config_file())
+
+    async def scenario():
+        async with first.channel_lock:
+            await asyncio.wait_for(second.open_channel(), 1)
+
+    asyncio.run(scenario())
+
+    assert first.channel_lock is not second.channel_lock
+    assert second.get_order_service_stub() is not None
+
+
+def test_create_opens_once(asyncemsxapilibrary, fake_channels, emsx_config_file):
+    """Test that concurrent create() calls share one instance and open its channels once."""
+    cfg_path = emsx_config_file(channel_pool_size=2)
+
+    async def scenario():
+        return await asyncio.gather(*(asyncemsxapilibrary.AsyncEMSXAPILibrary.create(cfg_path) for _ in range(3)))
+
+    libs = asyncio.run(scenario())
+
+    assert libs[0] is libs[1] is libs[2] is asyncemsxapilibrary.AsyncEMSXAPILibrary.get()
+    assert len(fake_channels.created) == 2
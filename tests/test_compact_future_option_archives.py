@@ -0,0 +1,119 @@
+"""
+test_compact_future_option_archives.py
+
+Pytest tests for compact_future_option_archives.py script.
+
+These tests verify that:
+
+1. Duplicate entries are removed and the last entry of each name is kept.
+2. Archives without duplicates are left untouched.
+3. Bytes reclaimed are reported per expiry folder, also with worker processes.
+4. Zips that cannot be compacted are counted and make main() exit with status 1.
+
+Example:
+
+    pytest -v tests/test_compact_future_option_archives.py
+"""
+
+import os
+import sys
+import logging
+import warnings
+
+import pytest
+from zipfile import ZipFile, ZIP_DEFLATED
+
+from scripts.compact_future_option_archives import compact_symbol, main
+from scripts.fop.zip_rewrite import compact_zip
+
+
+def write_zip_with_duplicates(path, copies=3):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # zipfile warns about duplicate names
+        with ZipFile(path, "w", ZIP_DEFLATED) as z:
+            for index in range(copies):
+                z.writestr("dup.csv", f"{index}," * 2000)
+            z.writestr("single.csv", "data")
+
+
+def test_compact_zip_keeps_last_entry(tmp_path):
+    """Test that compact_zip keeps one entry per name, the last one."""
+    zip_path = tmp_path / "a.zip"
+    write_zip_with_duplicates(zip_path)
+    size_before = os.path.getsize(zip_path)
+
+    reclaimed = compact_zip(str(zip_path))
+
+    assert reclaimed == size_before - os.path.getsize(zip_path)
+    assert reclaimed > 0
+    with ZipFile(zip_path, "r") as z:
+        assert [info.filename for info in z.infolist()] == ["dup.csv", "single.csv"]
+        assert z.read("dup.csv") == b"2," * 2000
+
+
+def test_compact_zip_without_duplicates(tmp_path):
+    """Test that archives without duplicates are not rewritten."""
+    zip_path = tmp_path / "a.zip"
+    with ZipFile(zip_path, "w") as z:
+        z.writestr("x.csv", "data")
+    mtime_before = os.stat(zip_path).st_mtime_ns
+
+    assert compact_zip(str(zip_path)) == 0
+    assert os.stat(zip_path).st_mtime_ns == mtime_before
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_compact_symbol_reports_per_expiry(tmp_path, workers):
+    """Test that reclaimed bytes are summed per expiry folder."""
+    symbol = tmp_path / "adu"
+    for expiry in ["202503", "202506"]:
+        (symbol / expiry).mkdir(parents=True)
+        write_zip_with_duplicates(symbol / expiry / "a.zip")
+        write_zip_with_duplicates(symbol / expiry / "b.zip", copies=1)
+
+    reclaimed, errors = compact_symbol(str(symbol), workers)
+
+    assert sorted(reclaimed) == ["202503", "202506"]
+    assert all(reclaimed_bytes > 0 for reclaimed_bytes in reclaimed.values())
+    assert errors == 0
+
+
+def test_main_no_arguments(monkeypatch):
+    """Test that main() raises RuntimeError when no arguments are provided."""
+    monkeypatch.setattr(sys, 'argv', ['compact_future_option_archives.py'])
+
+    with pytest.raises(RuntimeError) as exc_info:
+        main()
+
+    assert "No path argument provided" in str(exc_info.value)
+
+
+def test_main_reports_reclaimed_bytes(tmp_path, monkeypatch, caplog):
+    """Test that main() logs the bytes reclaimed per expiry folder."""
+    symbol = tmp_path / "adu"
+    (symbol / "202503").mkdir(parents=True)
+    write_zip_with_duplicates(symbol / "202503" / "a.zip")
+
+    monkeypatch.setattr(sys, 'argv', ['compact_future_option_archives.py', str(symbol)])
+    with caplog.at_level(logging.INFO):
+        main()
+
+    assert "202503: reclaimed" in caplog.text
+    assert "Done" in caplog.text
+
+
+def test_main_exits_non_zero_on_errors(tmp_path, monkeypatch, caplog):
+    """Test that main() counts the zips it could not compact and exits with status 1."""
+    symbol = tmp_path / "adu"
+    (symbol / "202503").mkdir(parents=True)
+    write_zip_with_duplicates(symbol / "202503" / "a.zip")
+    (symbol / "202503" / "broken.zip").write_bytes(b"not a zip")
+
+    monkeypatch.setattr(sys, 'argv', ['compact_future_option_archives.py', str(symbol)])
+    with caplog.at_level(logging.INFO), pytest.raises(SystemExit) as exc_info:
+        main()
+
+    assert exc_info.value.code == 1
+    assert "Error compacting" in caplog.text
+    assert "Completed with 1 error(s)" in caplog.text
+    assert "Done" not in caplog.text
@@ -0,0 +1,177 @@
+"""
+test_emsxapilibrary.py
+
+Pytest tests for the EMSX API configuration and the channel pool of
+scripts/brokerage_eze/scripts/emsxapilibrary.py.
+
+These tests verify that:
+
+1. The sample configuration is read, with the channels of each service.
+2. Channel indexes outside the pool are rejected.
+3. Channel options are built from the configuration.
+4. Each service round-robins over the stubs of its own channels.
+5. open_channel and the internet probe share the connect_timeout_ms deadline.
+6. Closing the channels drops the stubs built on them.
+
+The library tests need grpc, srp and protobuf and are skipped without them;
+channels and stubs are replaced by fakes, no server is contacted.
+
+Example:
+
+    pytest -v tests/test_emsxapilibrary.py
+"""
+
+import importlib
+import time
+
+import pytest
+
+
+class FakeChannel:
+    def __init__(self, target, options):
+        self.target = target
+        self.options = options
+
+    def close(self):
+        pass
+
+
+class FakeStub:
+    def __init__(self, channel):
+        self.channel = channel
+
+
+@pytest.fixture
+def emsxapiconfig(emsx_scripts):
+    import emsxapiconfig
+    return emsxapiconfig
+
+
+@pytest.fixture
+def pooled_library(emsxapilibrary, emsx_config_file, monkeypatch):
+    """
+    An EMSXAPILibrary with a pool of 3 fake channels, built without the singleton nor a server.
+    """
+    monkeypatch.setattr(emsxapilibrary.grpc, "insecure_channel",
+                        lambda target, options=None: FakeChannel(target, options))
+    monkeypatch.setattr(emsxapilibrary.utilities_pb2_grpc, "UtilityServicesStub", FakeStub)
+    monkeypatch.setattr(emsxapilibrary.market_data_pb2_grpc, "MarketDataServiceStub", FakeStub)
+    monkeypatch.setattr(emsxapilibrary.order_pb2_grpc, "SubmitOrderServiceStub", FakeStub)
+    monkeypatch.setattr(emsxapilibrary.EMSXAPILibrary, "open_channel", lambda self: None)
+
+    library = emsxapilibrary.EMSXAPILibrary.__new__(emsxapilibrary.EMSXAPILibrary)
+    library.__init__(emsx_config_file(channel_pool_size=3))
+    library.create_channel(library.config.server, library.config.port)
+    library.init_stubs()
+    return library
+
+
+def test_config_sample(emsxapiconfig, emsx_config_file):
+    """Test that the sample configuration is read with a single channel by default."""
+    config = emsxapiconfig.EMSXAPIConfig(emsx_config_file())
+
+    assert (config.server, config.port, config.connectTimeoutMS) == ("emsx.example.com", 9000, 3000)
+    assert config.maxMessageSize == 104 * 1024 * 1024
+    assert config.channelPoolSize == 1
+    assert config.utilityChannels == config.orderChannels == config.marketDataChannels == [0]
+
+
+def test_config_channel_pool(emsxapiconfig, emsx_config_file):
+    """Test that market data defaults to the channels after the first one."""
+    config = emsxapiconfig.EMSXAPIConfig(emsx_config_file(channel_pool_size=3, order_channels="0, 1"))
+
+    assert config.utilityChannels == [0]
+    assert config.orderChannels == [0, 1]
+    assert config.marketDataChannels == [1, 2]
+
+
+@pytest.mark.parametrize("options", [
+    {"channel_pool_size": 0},
+    {"channel_pool_size": 2, "order_channels": "2"},
+    {"channel_pool_size": 2, "market_data_channels": ""},
+])
+def test_config_rejects_invalid_channels(emsxapiconfig, emsx_config_file, options):
+    """Test that pool sizes and channel indexes outside the pool are rejected."""
+    with pytest.raises(ValueError):
+        emsxapiconfig.EMSXAPIConfig(emsx_config_file(**options))
+
+
+def test_build_channel_options(emsxapilibrary, emsxapiconfig, emsx_config_file):
+    """Test that the channel options come from the configuration."""
+    config = emsxapiconfig.EMSXAPIConfig(emsx_config_file())
+    options = dict(emsxapilibrary.build_channel_options(config))
+
+    assert options["grpc.keepalive_time_ms"] == 3600000
+    assert options["grpc.max_receive_message_length"] == config.maxMessageSize
+    assert options["grpc.use_local_subchannel_pool"] == 1
+    assert emsxapilibrary.build_channel_credentials(config) is None
+
+
+def test_channel_pool_round_robin(pooled_library):
+    """Test that each service round-robins over its own channels, independently of the others."""
+    channels = pooled_library._channels
+
+    assert len(channels) == 3
+    assert all(channel.target == "emsx.example.com:9000" for channel in channels)
+    assert [pooled_library.get_market_data_service_stub().channel for _ in range(4)] == [
+        channels[1], channels[2], channels[1], channels[2]]
+    # the market data calls above did not move the other services' counters
+    assert [pooled_library.get_order_service_stub().channel for _ in range(2)] == [channels[0]] * 2
+    assert pooled_library.get_utility_service_stub().channel is channels[0]
+
+
+def test_close_channel_drops_stubs(pooled_library):
+    """Test that no service hands out a stub of a closed channel."""
+    pooled_library.close_channel()
+
+    assert pooled_library._channels == []
+    assert pooled_library._channel is None
+    assert pooled_library.get_utility_service_stub() is None
+    assert pooled_library.get_market_data_service_stub() is None
+    assert pooled_library.get_order_service_stub() is None
+
+
+def test_next_stub_without_stubs(emsxapilibrary):
+    """Test that a service without stubs (channel not open) has no stub."""
+    assert emsxapilibrary.EMSXAPILibrary._next_stub([], iter([])) is None
+
+
+class NeverReadyFuture:
+    def result(self, timeout=None):
+        import grpc
+        time.sleep(timeout)
+        raise grpc.FutureTimeoutError()
+
+
+@pytest.mark.parametrize("probe_seconds, expected", [(0, "NetworkFailedException"),
+                                                     (5, "NetworkFailedException"),
+                                                     (None, "ServerNotAvailableException")])
+def test_open_channel_deadline(emsxapilibrary, emsx_config_file, monkeypatch, probe_seconds, expected):
+    """Test that a server not ready in time is reported within the deadline, the probe included."""
+    monkeypatch.setattr(emsxapilibrary.grpc, "insecure_channel",
+                        lambda target, options=None: FakeChannel(target, options))
+    monkeypatch.setattr(emsxapilibrary.grpc, "channel_ready_future", lambda channel: NeverReadyFuture())
+    probe_timeouts = []
+
+    def can_connect(host, port, timeout_ms):
+        # probe_seconds None: the internet is reachable; otherwise it fails after probe_seconds
+        probe_timeouts.append(timeout_ms)
+        time.sleep(probe_seconds or 0)
+        return probe_seconds is None
+
+    monkeypatch.setattr(emsxapilibrary.EMSXAPILibrary, "_can_connect", staticmethod(can_connect))
+    library = emsxapilibrary.EMSXAPILibrary.__new__(emsxapilibrary.EMSXAPILibrary)
+    with monkeypatch.context() as init_patch:
+        init_patch.setattr(emsxapilibrary.EMSXAPILibrary, "open_channel", lambda self: None)
+        library.__init__(emsx_config_file(connect_timeout_ms=100, check_internet="true"))
+
+    # each exception lives in the module of the same name
+    expected = getattr(importlib.import_module(expected), expected)
+    start = time.monotonic()
+    with pytest.raises(expected):
+        library.open_channel()
+
+    assert time.monotonic() - start < 1
+    assert 0 < probe_timeouts[0] <= 100
+    assert library._channels == []
+    assert library.get_order_service_stub() is None
@@ -0,0 +1,107 @@
+"""
+test_fix_and_merge_future_option.py
+
+Pytest tests for fix_and_merge_future_option.py script.
+
+These tests verify that:
+
+1. The member transforms of a symbol are chosen from the configured fixes.
+2. Source zips are grouped by destination quarter folder, in expiry order.
+3. A full run fixes strike names and merges expiries in one pass.
+4. With --resume the finished source zips are journaled and skipped later.
+
+Example:
+
+    pytest -v tests/test_fix_and_merge_future_option.py
+"""
+
+import os
+import shutil
+import sys
+
+import pytest
+from zipfile import ZipFile
+
+import scripts.fix_and_merge_future_option as script_module
+from scripts.fix_and_merge_future_option import build_transform, main, plan_groups
+
+# Constant for output directory name used across tests
+TEMP_OUTPUT_DIR_NAME = "temp-output-directory"
+
+NAME_11570 = "20251224_euu_minute_quote_american_call_11570_20260109.csv"
+NAME_11575 = "20251224_euu_minute_quote_american_call_11575_20260109.csv"
+NAME_11600 = "20251224_euu_minute_quote_american_call_11600_20260109.csv"
+
+
+@pytest.fixture
+def script_temp_output_dir():
+    """
+    Fixture to get and cleanup the temp-output-directory created by the main script.
+    """
+    temp_output_dir = os.path.join(
+        os.path.dirname(script_module.__file__), TEMP_OUTPUT_DIR_NAME)
+
+    yield temp_output_dir
+
+    if os.path.exists(temp_output_dir):
+        shutil.rmtree(temp_output_dir)
+
+
+@pytest.fixture
+def euu_tree(tmp_path):
+    symbol_path = tmp_path / "data" / "futureoption" / "cme" / "minute" / "euu"
+    for expiry, members in {
+        "202601": {NAME_11570: "jan 11570", NAME_11600: "jan 11600"},
+        "202602": {NAME_11600: "feb 11600"},
+        "202603": {NAME_11575: "mar 11575"},
+    }.items():
+        (symbol_path / expiry).mkdir(parents=True)
+        with ZipFile(symbol_path / expiry / "20251224_quote_american.zip", "w") as z:
+            for name, data in members.items():
+                z.writestr(name, data)
+    return symbol_path
+
+
+def test_build_transform():
+    """Test that the default chain holds the fixes configured for the symbol."""
+    assert len(build_transform("euu")) == 1
+    assert len(build_transform("cau")) == 1
+    assert len(build_transform("es")) == 0
+    assert build_transform("euu")([NAME_11570]) == [NAME_11575]
+
+    with pytest.raises(RuntimeError):
+        build_transform("euu", ["cad"])
+
+
+def test_plan_groups(euu_tree, tmp_path):
+    """Test that every source zip is aimed at its quarter folder, in expiry order."""
+    out = tmp_path / "out"
+    groups = plan_groups(str(euu_tree), str(out), str(tmp_path / "data"))
+
+    dst_zip = str(out / "futureoption" / "cme" / "minute" / "euu" / "202603" / "20251224_quote_american.zip")
+    assert list(groups) == [dst_zip]
+    assert [os.path.basename(os.path.dirname(src)) for src in groups[dst_zip]] == ["202601", "202602", "202603"]
+
+    no_merge = plan_groups(str(euu_tree), str(out), str(tmp_path / "data"), merge=False)
+    assert len(no_merge) == 3
+
+
+def test_main_fixes_and_merges(euu_tree, tmp_path, monkeypatch, script_temp_output_dir):
+    """Test that a full run renames strikes and merges the expiries in one pass."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "argv", ["script", "--resume", "data/futureoption/cme/minute/euu"])
+
+    main()
+
+    merged = os.path.join(script_temp_output_dir, "futureoption", "cme", "minute", "euu",
+                          "202603", "20251224_quote_american.zip")
+    with ZipFile(merged, "r") as z:
+        assert sorted(z.namelist()) == [NAME_11575, NAME_11600]
+        # the fixed 11570 of 202601 is overridden by the 11575 of the quarter folder
+        assert z.read(NAME_11575) == b"mar 11575"
+        assert z.read(NAME_11600) == b"feb 11600"
+
+    # every source is journaled, a second run does not write again
+    mtime_ns = os.stat(merged).st_mtime_ns
+    main()
+    assert os.stat(merged).st_mtime_ns == mtime_ns
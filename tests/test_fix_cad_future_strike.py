@@ -0,0 +1,125 @@
+"""
+test_fix_cad_future_strike.py
+
+Pytest tests for fix_cad_future_strike.py script.
+
+These tests verify that:
+
+1. Several date-ranged strike scaling rules can be held per symbol.
+2. The rule of a file date is found through the interval index.
+3. Overlapping rules are rejected.
+4. Only members whose date is covered by a rule are renamed.
+5. The output directory is next to the script and run() reports without printing.
+
+Example:
+
+    pytest -v tests/test_fix_cad_future_strike.py
+"""
+
+import os
+
+import pytest
+from zipfile import ZipFile
+
+import scripts.fix_cad_future_strike as script_module
+from scripts.fix_cad_future_strike import (
+    StrikeScalingRule,
+    StrikeScalingRules,
+    StrikeScalingFactors,
+    resolve_member_name,
+    resolve_member_names,
+    process_zip,
+    run,
+)
+from scripts.fop.metrics import ZipProcessResult
+
+
+def test_rules_find_by_date():
+    """Test that find() returns the rule whose date range covers the date."""
+    rules = StrikeScalingRules(
+        StrikeScalingRule("20230318", "99991231", 10),
+        StrikeScalingRule("19990101", "20200726", 0.1),
+        StrikeScalingRule("20200727", "20230317", 100),
+    )
+
+    assert rules.find("19990101").factor == 0.1
+    assert rules.find("20200726").factor == 0.1
+    assert rules.find("20200727").factor == 100
+    assert rules.find("20230317").factor == 100
+    assert rules.find("20251208").factor == 10
+    assert StrikeScalingRules(StrikeScalingRule("20251208", "20251231", 10)).find("20251207") is None
+
+
+def test_rules_reject_overlap():
+    """Test that overlapping date ranges of one symbol are rejected."""
+    with pytest.raises(ValueError):
+        StrikeScalingRules(
+            StrikeScalingRule("20200101", "20201231", 10),
+            StrikeScalingRule("20201231", "20211231", 100),
+        )
+
+
+def test_rules_invalid_date():
+    """Test that an invalid file date raises instead of matching a rule."""
+    with pytest.raises(ValueError):
+        StrikeScalingFactors.get("cau").find("20251340")
+
+
+def test_resolve_member_names_cau():
+    """Test that only the members dated inside the cau rule are rescaled."""
+    cau_rules = StrikeScalingFactors.get("cau")
+    names = [
+        "20251208_cau_minute_quote_american_call_50500_20260306.csv",
+        "20251205_cau_minute_quote_american_call_50500_20260306.csv",
+    ]
+
+    assert resolve_member_names(names, cau_rules) == [
+        "20251208_cau_minute_quote_american_call_5050_20260306.csv",
+        "20251205_cau_minute_quote_american_call_50500_20260306.csv",
+    ]
+    assert resolve_member_name(names[0], cau_rules) == "20251208_cau_minute_quote_american_call_5050_20260306.csv"
+
+
+def test_process_zip_cau(tmp_path, capsys):
+    """Test that process_zip rewrites the zip with the rescaled strikes and reports it."""
+    src_zip = tmp_path / "20251208_quote_american.zip"
+    with ZipFile(src_zip, "w") as z:
+        z.writestr("20251208_cau_minute_quote_american_call_50500_20260306.csv", "data")
+
+    out_zip = tmp_path / "output" / "20251208_quote_american.zip"
+    result = process_zip(str(src_zip), str(out_zip), StrikeScalingFactors.get("cau"))
+
+    assert result == ZipProcessResult(renamed=1, skipped=0, total=1)
+    with ZipFile(out_zip, "r") as z:
+        assert z.namelist() == ["20251208_cau_minute_quote_american_call_5050_20260306.csv"]
+        assert z.read("20251208_cau_minute_quote_american_call_5050_20260306.csv") == b"data"
+    assert capsys.readouterr().out == (f"--> Processing zip: {src_zip}\n"
+                                       f"Processed 1 CSV files (skipped 0) out of 1 in: {out_zip}\n")
+
+    process_zip(str(src_zip), str(out_zip), StrikeScalingFactors.get("cau"), verbose=False)
+    assert capsys.readouterr().out == ""
+
+
+def test_out_base_next_to_script():
+    """Test that the default output directory is not resolved at the filesystem root."""
+    assert script_module.OUT_BASE == os.path.join(
+        os.path.dirname(os.path.abspath(script_module.__file__)), "temp-output-directory")
+
+
+def test_run_returns_result(tmp_path, capsys):
+    """Test that run() writes under out_root and returns the outcome instead of printing."""
+    symbol_path = tmp_path / "data" / "futureoption" / "cme" / "minute" / "cau" / "202603"
+    symbol_path.mkdir(parents=True)
+    with ZipFile(symbol_path / "20251208_quote_american.zip", "w") as z:
+        z.writestr("20251208_cau_minute_quote_american_call_50500_20260306.csv", "data")
+    (tmp_path / "data" / "futureoption" / "cme" / "minute" / "es").mkdir()
+
+    out = tmp_path / "out"
+    result = run([str(symbol_path.parent), str(symbol_path.parent.parent / "es"), str(tmp_path / "missing")],
+                 str(out))
+
+    assert capsys.readouterr().out == ""
+    assert result.summary["archives"] == 1
+    assert result.summary["renamed"] == 1
+    assert len(result.errors) == 2 and not result.ok
+    assert (out / "futureoption" / "cme" / "minute" / "cau" / "202603" / "20251208_quote_american.zip").exists()
@@ -11,6 +11,7 @@ These tests verify that:
 4. The script properly handles missing symbol configurations
 5. The script requires explicit path arguments to prevent accidental bulk processing
 6. ZIP files are properly processed and rewritten with corrected filenames
+7. run() returns the outcome of a run without printing
 
 Test folder structure:
 
@@ -24,6 +25,7 @@ Example:
 """
 
 import glob
+import json
 import os
 import pathlib
 import shutil
@@ -31,7 +33,7 @@ import sys
 
 import pytest
 from decimal import Decimal
-from zipfile import ZipFile
+from zipfile import ZipFile, ZIP_DEFLATED, ZIP_STORED
 
 import scripts.fix_missed_strike_price_precision as script_module
 from scripts.fix_missed_strike_price_precision import (
@@ -39,9 +41,15 @@ from scripts.fix_missed_strike_price_precision import (
     StrikeScalingFactors,
     scale_strike,
     process_zip,
+    resolve_member_name,
+    resolve_member_names,
+    run,
+    run_tasks,
     main,
     RE_FOP_FILENAME_PATTERN,
 )
+from scripts.fop.metrics import RunMetrics
+from scripts.fop.zip_rewrite import Compression
 
 # Constant for output directory name used across tests
 TEMP_OUTPUT_DIR_NAME = "temp-output-directory"
@@ -735,3 +743,300 @@ def test_multiple_expiry_folders_path_mapping(tmp_path, monkeypatch, script_temp
             
     finally:
         os.chdir(original_cwd)
+
+
+def test_process_zip_returns_counters(tmp_path):
+    """Test that process_zip reports renamed, skipped and total member counts."""
+    src_zip = tmp_path / "20251224_openinterest_american.zip"
+    with ZipFile(src_zip, "w") as z:
+        z.writestr("20251224_euu_minute_openinterest_american_call_11600_20260109.csv", "data1")
+        z.writestr("20251224_euu_minute_openinterest_american_call_11570_20260109.csv", "data2")
+
+    result = process_zip(str(src_zip), str(tmp_path / "output" / "out.zip"),
+                         StrikeScalingFactors.get("euu"))
+
+    assert (result.renamed, result.skipped, result.total) == (1, 1, 2)
+
+
+def test_run_tasks_parallel_isolates_errors(tmp_path, capfd):
+    """Test that the process pool sums counters and a broken zip does not stop the others."""
+    euu_rule = StrikeScalingFactors.get("euu")
+    tasks = []
+    for index in range(3):
+        src_zip = tmp_path / f"2025122{index}_quote_american.zip"
+        with ZipFile(src_zip, "w") as z:
+            z.writestr(f"2025122{index}_euu_minute_quote_american_call_11570_20260109.csv", "data")
+        tasks.append((str(src_zip), str(tmp_path / "output" / src_zip.name), euu_rule))
+
+    broken_zip = tmp_path / "broken.zip"
+    broken_zip.write_text("not a zip")
+    tasks.append((str(broken_zip), str(tmp_path / "output" / "broken.zip"), euu_rule))
+
+    summary = run_tasks(tasks, workers=2)
+
+    assert (summary.renamed, summary.skipped, summary.total) == (3, 0, 3)
+    captured = capfd.readouterr()
+    assert f"EXCEPTION: Error processing {broken_zip}" in captured.out
+    assert "(1 failed)" in captured.out
+    for index in range(3):
+        with ZipFile(tmp_path / "output" / f"2025122{index}_quote_american.zip") as z:
+            assert z.namelist() == [f"2025122{index}_euu_minute_quote_american_call_11575_20260109.csv"]
+
+
+def test_run_tasks_parallel_bounds_submissions(tmp_path):
+    """Test that the process pool pulls lazy tasks at most 2 * workers ahead of the results."""
+    euu_rule = StrikeScalingFactors.get("euu")
+    metrics = RunMetrics()
+    ahead = []
+
+    def tasks():
+        for index in range(12):
+            src_zip = tmp_path / f"202512{index:02d}_quote_american.zip"
+            with ZipFile(src_zip, "w") as z:
+                z.writestr(f"202512{index:02d}_euu_minute_quote_american_call_11570_20260109.csv", "data")
+            ahead.append(index - len(metrics.archives))
+            yield str(src_zip), str(tmp_path / "output" / src_zip.name), euu_rule
+
+    summary = run_tasks(tasks(), workers=2, metrics=metrics, log=lambda line: None)
+
+    assert (summary.renamed, summary.total) == (12, 12)
+    assert len(metrics.archives) == 12
+    # a task is pulled only once fewer than 2 * workers are in flight
+    assert max(ahead) < 4
+
+
+def test_main_with_workers(tmp_path, monkeypatch, capfd, script_temp_output_dir):
+    """Test that main() accepts --workers and rewrites every zip of the tree."""
+    source_dir = tmp_path / "Data" / "futureoption" / "cme" / "minute" / "euu" / "202603"
+    source_dir.mkdir(parents=True)
+    for day in ("20251222", "20251223"):
+        with ZipFile(source_dir / f"{day}_quote_american.zip", "w") as z:
+            z.writestr(f"{day}_euu_minute_quote_american_call_11620_20260309.csv", "data")
+
+    original_cwd = os.getcwd()
+    os.chdir(tmp_path)
+
+    try:
+        monkeypatch.setattr(
+            sys, 'argv',
+            ['fix_missed_strike_price_precision.py', '--workers', '2', 'Data/futureoption/cme/minute/euu']
+        )
+        main()
+
+        captured = capfd.readouterr()
+        assert "Summary: renamed 2 CSV files (skipped 0) out of 2 in 2 zip files (0 failed)" in captured.out
+
+        output_zips = list(pathlib.Path(script_temp_output_dir).glob("**/202603/*.zip"))
+        assert len(output_zips) == 2
+    finally:
+        os.chdir(original_cwd)
+
+
+def test_resolve_member_name():
+    """Test that resolve_member_name returns the fixed name or the unchanged one."""
+    euu_rule = StrikeScalingFactors.get("euu")
+
+    assert resolve_member_name(
+        "20251224_euu_minute_quote_american_call_11570_20260109.csv", euu_rule
+    ) == "20251224_euu_minute_quote_american_call_11575_20260109.csv"
+    assert resolve_member_name(
+        "20251224_euu_minute_quote_american_call_11600_20260109.csv", euu_rule
+    ) == "20251224_euu_minute_quote_american_call_11600_20260109.csv"
+
+    with pytest.raises(ValueError):
+        resolve_member_name("invalid_pattern_file.csv", euu_rule)
+
+
+def test_main_plan_mode(tmp_path, monkeypatch, capfd, script_temp_output_dir):
+    """Test that --plan reports renames and writes a manifest without writing any zip."""
+    source_dir = tmp_path / "Data" / "futureoption" / "cme" / "minute" / "euu" / "202603"
+    source_dir.mkdir(parents=True)
+    with ZipFile(source_dir / "20251224_quote_american.zip", "w") as z:
+        z.writestr("20251224_euu_minute_quote_american_call_11570_20260109.csv", "data1")
+        z.writestr("20251224_euu_minute_quote_american_call_11600_20260109.csv", "data2")
+
+    manifest_path = tmp_path / "manifest.json"
+    original_cwd = os.getcwd()
+    os.chdir(tmp_path)
+
+    try:
+        monkeypatch.setattr(
+            sys, 'argv',
+            ['fix_missed_strike_price_precision.py', '--plan', '--manifest', str(manifest_path),
+             'Data/futureoption/cme/minute/euu']
+        )
+        main()
+
+        captured = capfd.readouterr()
+        assert "renames 1 of 2" in captured.out
+        assert "plan: euu/202603 renames 1 of 2 in 1 zip files" in captured.out
+
+        # nothing is rewritten in plan mode
+        assert list(pathlib.Path(script_temp_output_dir).glob("**/*.zip")) == []
+
+        manifest = json.loads(manifest_path.read_text())
+        assert manifest["renamed"] == 1
+        assert manifest["total"] == 2
+        assert manifest["zips"][0]["expiry"] == "202603"
+        assert manifest["zips"][0]["renames"] == {
+            "20251224_euu_minute_quote_american_call_11570_20260109.csv":
+                "20251224_euu_minute_quote_american_call_11575_20260109.csv"
+        }
+    finally:
+        os.chdir(original_cwd)
+
+
+def test_process_zip_unchanged_is_hard_linked(tmp_path, capfd):
+    """Test that a deflated zip without renames is linked into the output, not rewritten."""
+    src_zip = tmp_path / "20250120_trade_american.zip"
+    with ZipFile(src_zip, "w", compression=ZIP_DEFLATED) as z:
+        z.writestr("20250120_jpu_minute_trade_american_call_100020_20260615.csv", "jpu_data1")
+
+    out_zip = tmp_path / "output" / "20250120_trade_american.zip"
+    result = process_zip(str(src_zip), str(out_zip), StrikeScalingFactors.get("jpu"))
+
+    assert (result.renamed, result.skipped, result.total) == (0, 1, 1)
+    assert os.path.samefile(src_zip, out_zip)
+    assert "Unchanged (linked)" in capfd.readouterr().out
+
+
+def test_process_zip_skip_unchanged(tmp_path):
+    """Test that skip_unchanged leaves zips without renames out of the output."""
+    src_zip = tmp_path / "20250120_trade_american.zip"
+    with ZipFile(src_zip, "w", compression=ZIP_DEFLATED) as z:
+        z.writestr("20250120_jpu_minute_trade_american_call_100020_20260615.csv", "jpu_data1")
+
+    out_zip = tmp_path / "output" / "20250120_trade_american.zip"
+    process_zip(str(src_zip), str(out_zip), StrikeScalingFactors.get("jpu"), skip_unchanged=True)
+
+    assert not out_zip.exists()
+
+
+@pytest.mark.parametrize("factor", [1_000, 100_000, 10, 1, Decimal("0.1"), 250])
+def test_resolve_member_names_matches_decimal_path(factor):
+    """Test that the batch fixed-point classifier gives the same names as the Decimal path."""
+    rule = StrikeScalingRule(factor)
+    strikes = [str(strike) for strike in range(9_900, 12_100, 5)]
+    strikes += ["6.25", "6.252", "11.57", "10020.05", "1162.7", "0.0002", "0050", "11995", "0.5"]
+    names = [f"20251224_euu_minute_quote_american_call_{strike}_20260109.csv" for strike in strikes]
+
+    assert resolve_member_names(names, rule) == [resolve_member_name(name, rule) for name in names]
+
+
+def test_resolve_member_names_validates_names():
+    """Test that the batch classifier rejects non FOP members like resolve_member_name."""
+    euu_rule = StrikeScalingFactors.get("euu")
+
+    with pytest.raises(RuntimeError):
+        resolve_member_names(["invalid_file.txt"], euu_rule)
+    with pytest.raises(ValueError):
+        resolve_member_names(["invalid_pattern_file.csv"], euu_rule)
+
+
+def test_process_zip_with_requested_codec(tmp_path):
+    """Test that a stored codec rewrites every member stored, even zips without renames."""
+    src_zip = tmp_path / "20250120_trade_american.zip"
+    with ZipFile(src_zip, "w", compression=ZIP_DEFLATED) as z:
+        z.writestr("20250120_jpu_minute_trade_american_call_100020_20260615.csv", "jpu_data1" * 100)
+
+    out_zip = tmp_path / "output" / "20250120_trade_american.zip"
+    process_zip(str(src_zip), str(out_zip), StrikeScalingFactors.get("jpu"),
+                compression=Compression(ZIP_STORED))
+
+    assert not os.path.samefile(src_zip, out_zip)
+    with ZipFile(out_zip, "r") as z:
+        info = z.infolist()[0]
+        assert info.compress_type == ZIP_STORED
+        assert z.read(info) == b"jpu_data1" * 100
+
+
+def test_main_verify(tmp_path, monkeypatch, capfd, script_temp_output_dir):
+    """Test that --verify accepts the output of a run and flags a tampered zip."""
+    source_dir = tmp_path / "Data" / "futureoption" / "cme" / "minute" / "euu" / "202603"
+    source_dir.mkdir(parents=True)
+    with ZipFile(source_dir / "20251222_quote_american.zip", "w") as z:
+        z.writestr("20251222_euu_minute_quote_american_call_11620_20260309.csv", "data")
+        z.writestr("20251222_euu_minute_quote_american_call_11600_20260309.csv", "data")
+    monkeypatch.chdir(tmp_path)
+
+    argv = ['fix_missed_strike_price_precision.py', 'Data/futureoption/cme/minute/euu']
+    monkeypatch.setattr(sys, 'argv', argv)
+    main()
+    monkeypatch.setattr(sys, 'argv', argv[:1] + ['--verify'] + argv[1:])
+    main()
+    assert "Verified 1 zip files (2 members): 0 failed" in capfd.readouterr().out
+
+    output_zip = next(pathlib.Path(script_temp_output_dir).glob("**/202603/*.zip"))
+    with ZipFile(output_zip, "a") as z:
+        z.writestr("20251222_euu_minute_quote_american_put_11600_20260309.csv", "extra")
+    with pytest.raises(RuntimeError, match="1 zip files failed verification"):
+        main()
+    assert "  extra: 20251222_euu_minute_quote_american_put_11600_20260309.csv" in capfd.readouterr().out
+
+
+def test_main_verify_skip_unchanged(tmp_path, monkeypatch, capfd, script_temp_output_dir):
+    """Test that --verify --skip-unchanged accepts the zips a --skip-unchanged run left out."""
+    source_dir = tmp_path / "Data" / "futureoption" / "cme" / "minute" / "euu" / "202603"
+    source_dir.mkdir(parents=True)
+    with ZipFile(source_dir / "20251222_quote_american.zip", "w", ZIP_DEFLATED) as z:
+        z.writestr("20251222_euu_minute_quote_american_call_11570_20260309.csv", "data")
+    with ZipFile(source_dir / "20251223_quote_american.zip", "w", ZIP_DEFLATED) as z:
+        z.writestr("20251223_euu_minute_quote_american_call_11600_20260309.csv", "data")
+    monkeypatch.chdir(tmp_path)
+
+    argv = ['fix_missed_strike_price_precision.py', '--skip-unchanged', 'Data/futureoption/cme/minute/euu']
+    monkeypatch.setattr(sys, 'argv', argv)
+    main()
+    monkeypatch.setattr(sys, 'argv', argv[:2] + ['--verify'] + argv[2:])
+    main()
+    assert "Verified 2 zip files (1 members): 0 failed, 1 skipped without renames" in capfd.readouterr().out
+
+    monkeypatch.setattr(sys, 'argv', argv[:1] + ['--verify'] + argv[2:])
+    with pytest.raises(RuntimeError, match="1 zip files failed verification"):
+        main()
+
+
+def test_main_metrics(tmp_path, monkeypatch, script_temp_output_dir):
+    """Test that --metrics writes a JSON summary with the per-zip latency percentiles."""
+    source_dir = tmp_path / "Data" / "futureoption" / "cme" / "minute" / "euu" / "202603"
+    source_dir.mkdir(parents=True)
+    for day in ("20251222", "20251223"):
+        with ZipFile(source_dir / f"{day}_quote_american.zip", "w") as z:
+            z.writestr(f"{day}_euu_minute_quote_american_call_11620_20260309.csv", "data")
+    monkeypatch.chdir(tmp_path)
+    metrics_path = tmp_path / "metrics.json"
+
+    monkeypatch.setattr(
+        sys, 'argv',
+        ['fix_missed_strike_price_precision.py', '--metrics', str(metrics_path), 'Data/futureoption/cme/minute/euu']
+    )
+    main()
+
+    summary = json.loads(metrics_path.read_text())
+    assert (summary["archives"], summary["failed"], summary["members"], summary["renamed"]) == (2, 0, 2, 2)
+    assert summary["bytes_in"] > 0 and summary["bytes_out"] > 0
+    assert 0 < summary["latency_seconds"]["p50"] <= summary["latency_seconds"]["p99"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_returns_result_quietly(tmp_path, capfd, workers):
+    """Test that run() writes under out_root, prints nothing and reports errors in the result."""
+    symbol_path = tmp_path / "Data" / "futureoption" / "cme" / "minute" / "euu"
+    for expiry in ("202603", "202606"):
+        (symbol_path / expiry).mkdir(parents=True)
+        with ZipFile(symbol_path / expiry / "20251224_quote_american.zip", "w", ZIP_DEFLATED) as z:
+            z.writestr("20251224_euu_minute_quote_american_call_11570_20260109.csv", "data")
+    unknown_path = tmp_path / "Data" / "futureoption" / "cme" / "minute" / "zzz"
+    unknown_path.mkdir()
+
+    out = tmp_path / "out"
+    result = run([str(symbol_path), str(unknown_path)], str(out), workers=workers)
+
+    assert capfd.readouterr().out == ""
+    assert result.out_root == str(out)
+    assert result.summary["archives"] == 2
+    assert result.summary["renamed"] == 2
+    assert result.errors == [f"No scaling configured for symbol 'zzz' ({unknown_path})"]
+    assert sorted(os.path.relpath(archive.dst_path, out) for archive in result.archives) == [
+        os.path.join("futureoption", "cme", "minute", "euu", expiry, "20251224_quote_american.zip")
+        for expiry in ("202603", "202606")]
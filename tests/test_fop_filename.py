@@ -0,0 +1,65 @@
+"""
+test_fop_filename.py
+
+Pytest tests for the scripts/fop/filename.py FOP file name parser.
+
+These tests verify that:
+
+1. The fast path gives the same fields as RE_FOP_FILENAME_PATTERN.
+2. Irregular names fall back to the regex and invalid names are rejected.
+3. The parsed prefix tuple is shared between records.
+
+Example:
+
+    pytest -v tests/test_fop_filename.py
+"""
+
+import pytest
+
+from scripts.fop.filename import FopFilename, RE_FOP_FILENAME_PATTERN, parse_fop_filename
+
+FIELDS = ["date", "fop_ticker", "resolution", "tick_type", "style", "right", "strike", "expiry", "extension"]
+
+
+@pytest.mark.parametrize("name", [
+    "20251224_euu_minute_openinterest_american_call_11600_20260109.csv",
+    "20251224_adu_minute_quote_american_put_6.25_20260306.CSV",
+    "20251224_ES_Minute_Trade_American_Call_5000_202603.csv",
+    "20251224_euu_minute_quote_american_call_11600_20260109.csv\n",
+])
+def test_parse_matches_regex(name):
+    """Test that every parsed field equals the regex group of the same name."""
+    parsed = parse_fop_filename(name)
+    filename_match = RE_FOP_FILENAME_PATTERN.match(name)
+
+    assert isinstance(parsed, FopFilename)
+    for field in FIELDS:
+        assert getattr(parsed, field) == filename_match.group(field)
+
+
+@pytest.mark.parametrize("name", [
+    "invalid_filename.csv",
+    "20251224_euu_minute.csv",
+    "euu_call_11600.csv",
+    "not_a_fop_file.txt",
+    "2025122_euu_minute_quote_american_call_11600_20260109.csv",
+    "20251224_euu_minute_quote_american_call_11.6.0_20260109.csv",
+    "20251224_euu_minute_quote_american_call_11600_2026.csv",
+    "20251224_e-u_minute_quote_american_call_11600_20260109.csv",
+    "20251224_euu_minute_quote_american_call_11600_20260109.zip",
+])
+def test_parse_rejects_invalid_names(name):
+    """Test that names rejected by the regex are rejected by the parser."""
+    assert RE_FOP_FILENAME_PATTERN.match(name) is None
+    assert parse_fop_filename(name) is None
+
+
+def test_prefix_is_shared():
+    """Test that members with the same prefix share one parsed prefix tuple."""
+    call_a = parse_fop_filename("20251224_euu_minute_quote_american_call_11600_20260109.csv")
+    call_b = parse_fop_filename("20251224_euu_minute_quote_american_call_11650_20260109.csv")
+
+    assert call_a.prefix is call_b.prefix
+    assert call_a.prefix == ("euu", "minute", "quote", "american", "call")
+    assert not hasattr(call_a, "__dict__")
+    assert call_a.strike == "11600" and call_a.right == "call"
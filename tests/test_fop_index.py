@@ -0,0 +1,111 @@
+"""
+test_fop_index.py
+
+Pytest tests for the scripts/fop/index.py member index.
+
+These tests verify that:
+
+1. Every FOP member of every archive is indexed with its parsed fields and location.
+2. Strikes of a date are found by right, option expiry prefix and expiry folder.
+3. Updates are incremental: unchanged archives are skipped, changed and removed ones refreshed.
+4. Unreadable archives are reported without stopping the update.
+
+Example:
+
+    pytest -v tests/test_fop_index.py
+"""
+
+import os
+import sys
+
+import pytest
+from zipfile import ZipFile
+
+from scripts.fop.index import FopIndex, read_members
+from scripts.index_future_option_archives import INDEX_FILE_NAME, main
+
+
+@pytest.fixture
+def euu_tree(write_zip, tmp_path):
+    symbol_path = tmp_path / "data" / "futureoption" / "cme" / "minute" / "euu"
+    write_zip(symbol_path / "202603" / "20251103_quote_american.zip", [
+        "20251103_euu_minute_quote_american_call_11600_20260306.csv",
+        "20251103_euu_minute_quote_american_call_1157.5_20260306.csv",
+        "20251103_euu_minute_quote_american_put_11600_20260306.csv",
+        "20251103_euu_minute_quote_american_call_11700_20260605.csv",
+        "readme.txt",
+    ])
+    write_zip(symbol_path / "202606" / "20251104_trade_american.zip", [
+        "20251104_euu_minute_trade_american_call_11800_20260605.csv",
+    ])
+    return symbol_path
+
+
+def test_read_members(euu_tree):
+    """Test that members are parsed from the central directory, with their offsets."""
+    zip_path = euu_tree / "202603" / "20251103_quote_american.zip"
+    rows, skipped = read_members(str(zip_path))
+
+    assert skipped == 1
+    assert [(row.right, row.strike, row.expiry) for row in rows[:2]] == [
+        ("call", "11600", 20260306), ("call", "1157.5", 20260306)]
+    with ZipFile(zip_path) as z:
+        info = z.getinfo("20251103_euu_minute_quote_american_put_11600_20260306.csv")
+    assert (rows[2].header_offset, rows[2].compress_size) == (info.header_offset, info.compress_size)
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_update_and_query(euu_tree, tmp_path, workers):
+    """Test that strikes are answered from the index by date, right and expiry."""
+    with FopIndex(str(tmp_path / "index.sqlite")) as index:
+        result = index.update(str(euu_tree), workers)
+
+        assert (result.indexed, result.members, result.skipped_members) == (2, 5, 1)
+        assert index.stats() == (2, 5)
+        assert index.strikes("20251103", right="call", expiry="202603") == ["1157.5", "11600"]
+        assert index.strikes("20251103", right="CALL") == ["1157.5", "11600", "11700"]
+        assert index.strikes("20251103", expiry_folder="202606") == []
+        assert index.strikes("20251104", tick_type="trade", symbol="euu") == ["11800"]
+
+        path, row = index.members("20251103", right="put")[0]
+        assert path == str(euu_tree / "202603" / "20251103_quote_american.zip")
+        assert (row.style, row.strike, row.expiry) == ("american", "11600", 20260306)
+
+        with pytest.raises(ValueError):
+            index.strikes("20251103", expiry="2026-03")
+
+
+def test_update_is_incremental(write_zip, euu_tree, tmp_path):
+    """Test that only changed archives are read again and removed ones are dropped."""
+    index_path = str(tmp_path / "index.sqlite")
+    with FopIndex(index_path) as index:
+        index.update(str(euu_tree))
+
+    changed = euu_tree / "202603" / "20251103_quote_american.zip"
+    write_zip(changed, ["20251103_euu_minute_quote_american_call_12000_20260306.csv"])
+    os.utime(changed, ns=(1, 1))
+    os.remove(euu_tree / "202606" / "20251104_trade_american.zip")
+    (euu_tree / "202606" / "broken.zip").write_bytes(b"not a zip")
+
+    with FopIndex(index_path) as index:
+        result = index.update(str(euu_tree))
+
+        assert (result.indexed, result.unchanged, result.removed) == (1, 0, 1)
+        assert len(result.errors) == 1 and "broken.zip" in result.errors[0]
+        assert index.strikes("20251103") == ["12000"]
+        assert index.strikes("20251104") == []
+
+        assert index.update(str(euu_tree)).unchanged == 1
+
+
+def test_main_builds_sidecar_and_queries(euu_tree, tmp_path, monkeypatch, capsys):
+    """Test that the script writes the sidecar index and answers --date queries from it."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "argv", ["script", "data/futureoption/cme/minute/euu"])
+    main()
+    assert (euu_tree / INDEX_FILE_NAME).exists()
+
+    monkeypatch.setattr(sys, "argv", ["script", "--date", "20251103", "--right", "put",
+                                      "data/futureoption/cme/minute/euu"])
+    main()
+    assert capsys.readouterr().out.split() == ["11600"]
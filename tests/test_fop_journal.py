@@ -0,0 +1,111 @@
+"""
+test_fop_journal.py
+
+Pytest tests for the scripts/fop/journal.py checkpoint journal.
+
+These tests verify that:
+
+1. Recorded source zips are reported as done, also after reloading the journal.
+2. Changed sources are processed again, touched but identical ones are not.
+3. A torn last line of an interrupted run is ignored.
+4. Zips are fingerprinted from their central directory, not hashed whole.
+5. Journals written with whole-file hashes are still honoured.
+
+Example:
+
+    pytest -v tests/test_fop_journal.py
+"""
+
+import json
+import os
+from zipfile import ZipFile
+
+import scripts.fop.journal as journal_module
+from scripts.fop.journal import Journal, file_sha256, zip_fingerprint
+
+
+def test_journal_records_and_reloads(tmp_path):
+    """Test that a recorded zip is done, also for a journal reloaded from disk."""
+    src = tmp_path / "a.zip"
+    src.write_bytes(b"zip data")
+    journal_path = tmp_path / "out" / "journal.jsonl"
+
+    journal = Journal(str(journal_path))
+    assert not journal.is_done(str(src))
+
+    journal.record(str(src), str(tmp_path / "out" / "a.zip"))
+    assert journal.is_done(str(src))
+
+    reloaded = Journal(str(journal_path))
+    assert len(reloaded) == 1
+    assert reloaded.is_done(str(src))
+
+
+def test_journal_detects_changes(tmp_path):
+    """Test that content changes invalidate an entry and mtime-only changes do not."""
+    src = tmp_path / "a.zip"
+    src.write_bytes(b"zip data")
+    journal = Journal(str(tmp_path / "journal.jsonl"))
+    journal.record(str(src))
+
+    stat = os.stat(src)
+    os.utime(src, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000_000))
+    assert journal.is_done(str(src))
+
+    src.write_bytes(b"zip DATA")
+    assert not journal.is_done(str(src))
+
+
+def test_journal_ignores_torn_line(tmp_path):
+    """Test that an incomplete last line does not break loading."""
+    src = tmp_path / "a.zip"
+    src.write_bytes(b"zip data")
+    journal_path = tmp_path / "journal.jsonl"
+    Journal(str(journal_path)).record(str(src))
+
+    with open(journal_path, "a") as f:
+        f.write('{"src_path": "/trunc')
+
+    assert Journal(str(journal_path)).is_done(str(src))
+
+
+def test_journal_fingerprints_zip_central_directory(tmp_path, monkeypatch):
+    """Test that recording a zip does not hash it whole and member changes are detected."""
+    src = tmp_path / "a.zip"
+    with ZipFile(src, "w") as z:
+        z.writestr("x.csv", "first")
+        z.writestr("y.csv", "data")
+    journal = Journal(str(tmp_path / "journal.jsonl"))
+
+    def whole_file_hash(path):
+        raise AssertionError("the whole zip was hashed")
+
+    monkeypatch.setattr(journal_module, "file_sha256", whole_file_hash)
+    journal.record(str(src))
+    assert zip_fingerprint(str(src)).startswith("cd:")
+
+    stat = os.stat(src)
+    os.utime(src, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000_000))
+    assert journal.is_done(str(src))
+
+    with ZipFile(src, "w") as z:
+        z.writestr("x.csv", "FIRST")
+        z.writestr("y.csv", "data")
+    os.utime(src, ns=(stat.st_atime_ns, stat.st_mtime_ns + 20_000_000_000))
+    assert os.stat(src).st_size == stat.st_size
+    assert not journal.is_done(str(src))
+
+
+def test_journal_reads_whole_file_hashes(tmp_path):
+    """Test that entries of journals written with a whole-file sha256 are still checked."""
+    src = tmp_path / "a.zip"
+    src.write_bytes(b"zip data")
+    stat = os.stat(src)
+    journal_path = tmp_path / "journal.jsonl"
+    journal_path.write_text(json.dumps({
+        "src_path": str(src), "dst_path": None, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns - 1,
+        "sha256": file_sha256(str(src))}) + "\n")
+
+    assert Journal(str(journal_path)).is_done(str(src))
+    src.write_bytes(b"zip DATA")
+    assert not Journal(str(journal_path)).is_done(str(src))
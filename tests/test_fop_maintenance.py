@@ -0,0 +1,85 @@
+"""
+test_fop_maintenance.py
+
+Pytest tests for the fop_maintenance.py library entry point.
+
+These tests verify that:
+
+1. Every mode runs in-process into the requested output directory.
+2. The outcome is returned as a RunResult, with the problems in its errors.
+3. Unknown modes are rejected.
+
+Example:
+
+    pytest -v tests/test_fop_maintenance.py
+"""
+
+import os
+
+import pytest
+from zipfile import ZipFile, ZIP_DEFLATED
+
+from scripts import fop_maintenance
+
+NAME_11570 = "20251224_euu_minute_quote_american_call_11570_20260109.csv"
+NAME_11575 = "20251224_euu_minute_quote_american_call_11575_20260109.csv"
+
+
+@pytest.fixture
+def euu_tree(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for expiry in ("202602", "202603"):
+        expiry_path = tmp_path / "data" / "futureoption" / "cme" / "minute" / "euu" / expiry
+        expiry_path.mkdir(parents=True)
+        with ZipFile(expiry_path / "20251224_quote_american.zip", "w", ZIP_DEFLATED) as z:
+            z.writestr(NAME_11570, expiry)
+    return "data/futureoption/cme/minute/euu"
+
+
+def _members(out_root, expiry):
+    path = os.path.join(out_root, "futureoption", "cme", "minute", "euu", expiry, "20251224_quote_american.zip")
+    with ZipFile(path) as z:
+        return z.namelist()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_fix_and_merge(euu_tree, tmp_path, workers):
+    """Test that the default mode fixes and merges into out_root and reports the run."""
+    out = str(tmp_path / "out")
+    result = fop_maintenance.run([euu_tree], out, workers=workers)
+
+    assert result.ok
+    assert result.summary["archives"] == 1
+    assert result.summary["renamed"] == 2
+    assert _members(out, "202603") == [NAME_11575]
+
+
+@pytest.mark.parametrize("mode, expiries, names", [
+    ("precision", ["202602", "202603"], [NAME_11575]),
+    ("merge", ["202603"], [NAME_11570]),
+])
+def test_run_modes(euu_tree, tmp_path, mode, expiries, names):
+    """Test that the single-step modes write their own output layout."""
+    out = str(tmp_path / "out")
+    result = fop_maintenance.run([euu_tree], out, mode=mode)
+
+    assert result.ok
+    for expiry in expiries:
+        assert _members(out, expiry) == names
+
+
+def test_run_reports_errors(euu_tree, tmp_path):
+    """Test that invalid paths and symbols without rules end up in the errors."""
+    result = fop_maintenance.run([euu_tree, "data/futureoption/cme/minute/missing"], str(tmp_path / "out"),
+                                 mode="cad")
+
+    assert not result.ok
+    assert len(result.errors) == 2
+    assert result.summary["archives"] == 0
+
+
+def test_run_unknown_mode(tmp_path):
+    """Test that an unknown mode is rejected before anything is written."""
+    with pytest.raises(ValueError):
+        fop_maintenance.run([], str(tmp_path / "out"), mode="compact")
+    assert not (tmp_path / "out").exists()
@@ -0,0 +1,89 @@
+"""
+test_fop_metrics.py
+
+Pytest tests for the scripts/fop/metrics.py run metrics and profiling hooks.
+
+These tests verify that:
+
+1. Nearest-rank percentiles are computed like the p50/p99 of the summary.
+2. The run summary totals archives, members, renames and bytes.
+3. Output lines are buffered and written in a single call.
+4. profiling dumps cProfile stats and reports the tracemalloc peak.
+
+Example:
+
+    pytest -v tests/test_fop_metrics.py
+"""
+
+import json
+import pstats
+
+import pytest
+
+from scripts.fop.metrics import ArchiveMetrics, LineBuffer, RunMetrics, percentile, profiling
+
+
+@pytest.mark.parametrize("q, expected", [(50, 50), (99, 99), (100, 100), (0, 1)])
+def test_percentile(q, expected):
+    """Test the nearest-rank percentile of 1..100."""
+    assert percentile(list(range(100, 0, -1)), q) == expected
+
+
+def test_percentile_empty():
+    assert percentile([], 99) == 0.0
+
+
+def test_run_metrics_summary(tmp_path):
+    """Test that the summary adds up the archives and measures their sizes."""
+    src_zip = tmp_path / "src.zip"
+    src_zip.write_bytes(b"x" * 100)
+    dst_zip = tmp_path / "dst.zip"
+    dst_zip.write_bytes(b"x" * 60)
+
+    metrics = RunMetrics()
+    metrics.add(ArchiveMetrics.measure([str(src_zip)], str(dst_zip), 0.5, members=10, renamed=2))
+    metrics.add(ArchiveMetrics.measure([str(src_zip), str(src_zip)], str(tmp_path / "missing.zip"), 1.5, 4))
+    metrics.add_failure()
+
+    summary = metrics.summary()
+    assert (summary["archives"], summary["failed"], summary["members"], summary["renamed"]) == (2, 1, 14, 2)
+    assert (summary["bytes_in"], summary["bytes_out"]) == (300, 60)
+    assert summary["latency_seconds"] == {"mean": 1.0, "p50": 0.5, "p99": 1.5, "max": 1.5}
+
+    metrics_path = tmp_path / "out" / "metrics.json"
+    metrics.write_json(str(metrics_path), per_archive=True)
+    data = json.loads(metrics_path.read_text())
+    assert data["archives"] == 2
+    assert data["per_archive"][0]["src_paths"] == [str(src_zip)]
+
+
+def test_line_buffer_single_write():
+    """Test that buffered lines reach the stream in one write."""
+    class Stream:
+        def __init__(self):
+            self.writes = []
+
+        def write(self, text):
+            self.writes.append(text)
+
+    stream = Stream()
+    out = LineBuffer(stream)
+    out.add("a")
+    out.add("b")
+    assert stream.writes == []
+
+    out.flush()
+    out.flush()
+    assert stream.writes == ["a\nb\n"]
+
+
+def test_profiling(tmp_path):
+    """Test that profiling dumps readable stats and logs the memory peak."""
+    profile_path = tmp_path / "run.prof"
+    logged = []
+
+    with profiling(str(profile_path), trace_memory=True, log=logged.append):
+        sorted(str(i) for i in range(10_000))
+
+    assert pstats.Stats(str(profile_path)).total_calls > 0
+    assert any(line.startswith("Memory peak:") for line in logged)
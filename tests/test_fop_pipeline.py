@@ -0,0 +1,81 @@
+"""
+test_fop_pipeline.py
+
+Pytest tests for the scripts/fop/pipeline.py single-pass rewrite engine.
+
+These tests verify that:
+
+1. Transforms of a chain are applied in order to the member names.
+2. Several sources are written into one destination, the last writer winning.
+3. An existing destination takes part as the first source, without transform.
+4. A single source that needs no change is hard-linked instead of rewritten.
+
+Example:
+
+    pytest -v tests/test_fop_pipeline.py
+"""
+
+import os
+import pickle
+
+from zipfile import ZipFile, ZIP_DEFLATED
+
+from scripts.fop.pipeline import TransformChain, rewrite_group
+
+
+def _upper(names):
+    return [name.upper() for name in names]
+
+
+def _suffix(names):
+    return [name + ".bak" for name in names]
+
+
+def test_transform_chain_order_and_pickle():
+    """Test that a chain applies its transforms in order and can be sent to workers."""
+    chain = TransformChain([_upper, _suffix])
+
+    assert chain(["a.csv"]) == ["A.CSV.bak"]
+    assert TransformChain()(["a.csv"]) == ["a.csv"]
+    assert pickle.loads(pickle.dumps(chain))(["b"]) == ["B.bak"]
+
+
+def test_rewrite_group_last_writer_wins(write_zip, tmp_path):
+    """Test that transformed names of later sources override earlier ones."""
+    first = tmp_path / "202601" / "a.zip"
+    second = tmp_path / "202602" / "a.zip"
+    write_zip(first, {"x.csv": "first x", "y.csv": "first y"}, ZIP_DEFLATED)
+    write_zip(second, {"X.CSV": "second x"}, ZIP_DEFLATED)
+    dst_zip = tmp_path / "out" / "202603" / "a.zip"
+
+    result = rewrite_group([str(first), str(second)], str(dst_zip), TransformChain([_upper]))
+
+    assert (result.renamed, result.replaced, result.total) == (2, 1, 3)
+    with ZipFile(dst_zip, "r") as z:
+        assert sorted(z.namelist()) == ["X.CSV", "Y.CSV"]
+        assert z.read("X.CSV") == b"second x"
+
+
+def test_rewrite_group_keeps_existing_destination(write_zip, tmp_path):
+    """Test that the members of an existing destination are kept with their names."""
+    src_zip = tmp_path / "202602" / "a.zip"
+    write_zip(src_zip, {"y.csv": "new y"}, ZIP_DEFLATED)
+    dst_zip = tmp_path / "out" / "a.zip"
+    write_zip(dst_zip, {"x.csv": "old x"}, ZIP_DEFLATED)
+
+    rewrite_group([str(src_zip)], str(dst_zip), TransformChain([_upper]))
+
+    with ZipFile(dst_zip, "r") as z:
+        assert sorted(z.namelist()) == ["Y.CSV", "x.csv"]
+
+
+def test_rewrite_group_links_unchanged_source(write_zip, tmp_path):
+    """Test that a lone source without renames is linked into place."""
+    src_zip = tmp_path / "202603" / "a.zip"
+    write_zip(src_zip, {"x.csv": "x"}, ZIP_DEFLATED)
+    dst_zip = tmp_path / "out" / "a.zip"
+
+    result = rewrite_group([str(src_zip)], str(dst_zip))
+
+    assert (result.renamed, result.replaced, result.total) == (0, 0, 1)
+    assert os.path.samefile(src_zip, dst_zip)
@@ -0,0 +1,71 @@
+"""
+test_fop_pool.py
+
+Pytest tests for the scripts/fop/pool.py bounded task submission.
+
+These tests verify that:
+
+1. Every task is run once and yielded with its result.
+2. No more than max_in_flight tasks are submitted ahead of the results.
+3. An exception of a task is raised when its result is collected.
+
+Example:
+
+    pytest -v tests/test_fop_pool.py
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from scripts.fop.pool import submit_bounded
+
+
+def _square(value):
+    return value * value
+
+
+def test_every_task_yielded_with_its_result():
+    """Test that every task is run once and paired with its own result."""
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        tasks = ((i,) for i in range(10))
+        results = {task[0]: result for task, result in submit_bounded(executor, _square, tasks, 4)}
+
+    assert results == {i: i * i for i in range(10)}
+
+
+def test_window_is_bounded():
+    """Test that tasks are pulled lazily and at most max_in_flight run ahead of the results."""
+    lock = threading.Lock()
+    state = {"pulled": 0, "finished": 0, "ahead": 0}
+
+    def tasks():
+        for i in range(20):
+            with lock:
+                state["pulled"] += 1
+                state["ahead"] = max(state["ahead"], state["pulled"] - state["finished"])
+            yield (i,)
+
+    def work(value):
+        time.sleep(0.005)
+        with lock:
+            state["finished"] += 1
+        return value
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        collected = [result for _, result in submit_bounded(executor, work, tasks(), 3)]
+
+    assert sorted(collected) == list(range(20))
+    assert state["ahead"] <= 3
+
+
+def test_task_exception_is_raised():
+    """Test that the exception of a task surfaces in the consumer."""
+    def fail(value):
+        raise ValueError(value)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        with pytest.raises(ValueError):
+            list(submit_bounded(executor, fail, [(1,)], 2))
@@ -0,0 +1,103 @@
+"""
+test_fop_verify.py
+
+Pytest tests for the scripts/fop/verify.py central directory verification.
+
+These tests verify that:
+
+1. A rewrite with renames and last-writer-wins duplicates verifies cleanly.
+2. Missing, extra and mismatched members are flagged.
+3. Unreadable or absent archives are reported instead of raising.
+4. Archives left out by --skip-unchanged are skipped, not failed.
+5. The process pool gives the same results as the sequential run.
+
+Example:
+
+    pytest -v tests/test_fop_verify.py
+"""
+
+from zipfile import ZIP_DEFLATED
+
+from scripts.fop.pipeline import TransformChain, rewrite_group
+from scripts.fop.verify import report, verify_group, verify_groups
+
+
+def _upper(names):
+    return [name.upper() for name in names]
+
+
+def test_verify_rewritten_group(write_zip, tmp_path):
+    """Test that a recompressed, renamed and merged archive matches its sources."""
+    first = tmp_path / "202601" / "a.zip"
+    second = tmp_path / "202602" / "a.zip"
+    write_zip(first, {"x.csv": "first x" * 100, "y.csv": "first y"})
+    write_zip(second, {"x.csv": "second x"})
+    dst_zip = tmp_path / "out" / "a.zip"
+    rewrite_group([str(first), str(second)], str(dst_zip), TransformChain([_upper]))
+
+    result = verify_group([str(first), str(second)], str(dst_zip), _upper)
+
+    assert result.ok
+    assert result.checked == 2
+
+
+def test_verify_flags_differences(write_zip, tmp_path, capsys):
+    """Test that missing, extra and mismatched members are reported."""
+    src_zip = tmp_path / "src.zip"
+    dst_zip = tmp_path / "dst.zip"
+    write_zip(src_zip, {"a.csv": "a", "b.csv": "b", "c.csv": "c"})
+    write_zip(dst_zip, {"a.csv": "a", "b.csv": "B", "d.csv": "d"}, ZIP_DEFLATED)
+
+    result = verify_group([str(src_zip)], str(dst_zip))
+
+    assert not result.ok
+    assert (result.missing, result.extra, result.mismatched) == (["c.csv"], ["d.csv"], ["b.csv"])
+    assert report([result]) == 1
+    out = capsys.readouterr().out
+    assert "1 missing, 1 extra, 1 mismatched" in out
+    assert "Verified 1 zip files (3 members): 1 failed" in out
+
+
+def test_verify_reports_unreadable_archives(write_zip, tmp_path):
+    """Test that absent and corrupt archives end up in the result error."""
+    src_zip = tmp_path / "src.zip"
+    write_zip(src_zip, {"a.csv": "a"})
+    corrupt_zip = tmp_path / "corrupt.zip"
+    corrupt_zip.write_bytes(b"not a zip")
+
+    assert "does not exist" in verify_group([str(src_zip)], str(tmp_path / "missing.zip")).error
+    assert verify_group([str(corrupt_zip)], str(src_zip)).error is not None
+
+
+def test_verify_skip_unchanged(write_zip, tmp_path, capsys):
+    """Test that with skip_unchanged only destinations with renames have to exist."""
+    unchanged_zip = tmp_path / "unchanged.zip"
+    renamed_zip = tmp_path / "renamed.zip"
+    write_zip(unchanged_zip, {"A.CSV": "a"})
+    write_zip(renamed_zip, {"b.csv": "b"})
+    tasks = [([str(unchanged_zip)], str(tmp_path / "out" / "unchanged.zip"), _upper),
+             ([str(renamed_zip)], str(tmp_path / "out" / "renamed.zip"), _upper)]
+
+    unchanged, renamed = verify_groups(tasks, skip_unchanged=True)
+
+    assert unchanged.ok and unchanged.skipped
+    assert not renamed.ok and "does not exist" in renamed.error
+    assert report([unchanged, renamed]) == 1
+    assert "Verified 2 zip files (0 members): 1 failed, 1 skipped without renames" in capsys.readouterr().out
+    assert not verify_groups(tasks)[0].ok
+
+
+def test_verify_groups_parallel(write_zip, tmp_path):
+    """Test that verifying with a process pool matches the sequential results."""
+    tasks = []
+    for i in range(4):
+        src_zip = tmp_path / f"src{i}.zip"
+        dst_zip = tmp_path / f"dst{i}.zip"
+        write_zip(src_zip, {"a.csv": f"a{i}"})
+        write_zip(dst_zip, {"A.CSV": f"a{i}" if i % 2 else "changed"})
+        tasks.append(([str(src_zip)], str(dst_zip), _upper))
+
+    sequential = verify_groups(tasks)
+    parallel = verify_groups(tasks, workers=2)
+
+    assert [result.ok for result in parallel] == [result.ok for result in sequential] == [False, True, False, True]
@@ -0,0 +1,74 @@
+"""
+test_fop_walk.py
+
+Pytest tests for the scripts/fop/walk.py directory walker.
+
+These tests verify that:
+
+1. Every zip of every expiry folder is yielded once, with its symbol and expiry.
+2. Stray files next to the expiry folders and non-zip files are ignored.
+3. The thread pool walker yields the same items as the sequential one.
+4. The walker is lazy and can be stopped early.
+5. Output paths mirror a symbol folder from its "futureoption" folder on.
+
+Example:
+
+    pytest -v tests/test_fop_walk.py
+"""
+
+import os
+import types
+
+import pytest
+
+from scripts.fop.walk import WorkItem, relative_symbol_path, walk_symbol
+
+
+@pytest.fixture
+def symbol_tree(tmp_path):
+    symbol_path = tmp_path / "data" / "futureoption" / "cme" / "minute" / "EUU"
+    for expiry in ("202603", "202606", "202609"):
+        expiry_path = symbol_path / expiry
+        expiry_path.mkdir(parents=True)
+        for day in ("20251223", "20251224"):
+            (expiry_path / f"{day}_quote_american.zip").write_bytes(b"")
+        (expiry_path / "notes.txt").write_text("not a zip")
+    (expiry_path / "nested.zip").mkdir()
+    (symbol_path / "readme.md").write_text("stray file")
+    return symbol_path
+
+
+def test_walk_symbol_yields_every_zip(symbol_tree):
+    """Test that every zip is yielded once with the lower-cased symbol and its expiry."""
+    items = sorted(walk_symbol(str(symbol_tree)))
+
+    assert len(items) == 6
+    assert {item.symbol for item in items} == {"euu"}
+    assert {item.expiry for item in items} == {"202603", "202606", "202609"}
+    assert items[0] == WorkItem("euu", "202603", str(symbol_tree / "202603" / "20251223_quote_american.zip"))
+
+
+def test_walk_symbol_threaded_matches_sequential(symbol_tree):
+    """Test that listing expiries with a thread pool yields the same items."""
+    assert sorted(walk_symbol(str(symbol_tree), workers=4, symbol="custom")) == \
+        sorted(item._replace(symbol="custom") for item in walk_symbol(str(symbol_tree)))
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_walk_symbol_is_lazy(symbol_tree, workers):
+    """Test that the walker is a generator that can be abandoned after the first item."""
+    items = walk_symbol(str(symbol_tree), workers=workers)
+
+    assert isinstance(items, types.GeneratorType)
+    assert next(items).expiry in {"202603", "202606", "202609"}
+    items.close()
+
+
+def test_relative_symbol_path(symbol_tree, tmp_path, monkeypatch):
+    """Test that the mirrored path starts at the futureoption folder, whatever the prefix."""
+    expected = os.path.join("futureoption", "cme", "minute", "EUU")
+    assert relative_symbol_path(str(symbol_tree)) == expected
+
+    monkeypatch.chdir(tmp_path)
+    assert relative_symbol_path("data/futureoption/cme/minute/EUU") == expected
+    assert relative_symbol_path(str(tmp_path / "elsewhere" / "euu")) == "euu"
@@ -0,0 +1,269 @@
+"""
+test_fop_zip_rewrite.py
+
+Pytest tests for the scripts/fop/zip_rewrite.py zip rewriting engine.
+
+These tests verify that:
+
+1. Raw-copied members keep their compressed bytes, CRC and sizes.
+2. Members can be renamed while they are copied, keeping their extra fields.
+3. ZIP64 members get new ZIP64 records in the destination, not the source ones.
+4. Streamed members are recompressed with the requested codec.
+5. copy_member raw-copies matching codecs and streams the other ones.
+6. The rewritten archive is a valid zip readable by zipfile.
+7. Compression settings decide which members are kept and how the rest are written.
+8. atomic_zip only exposes complete archives and cleans up after a failure.
+
+Example:
+
+    pytest -v tests/test_fop_zip_rewrite.py
+"""
+
+import argparse
+import os
+import struct
+import zipfile
+
+import pytest
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED, ZIP_STORED, ZIP_LZMA
+
+from scripts.fop.zip_rewrite import (
+    Compression,
+    add_compression_arguments,
+    atomic_zip,
+    compression_from_args,
+    copy_member,
+    copy_member_raw,
+    copy_member_stream,
+)
+
+
+@pytest.mark.parametrize("compression", [ZIP_DEFLATED, ZIP_STORED])
+def test_copy_member_raw_renames_and_preserves_data(tmp_path, compression):
+    """Test that raw copy keeps the compressed payload and only changes the name."""
+    src_zip = tmp_path / "src.zip"
+    payload = "time,bid,ask\n" * 1000
+
+    with ZipFile(src_zip, "w", compression=compression) as z:
+        z.writestr("a_11570_20260109.csv", payload)
+        z.writestr("b_11600_20260109.csv", "other")
+
+    dst_zip = tmp_path / "dst.zip"
+    with ZipFile(src_zip, "r") as src, ZipFile(dst_zip, "w") as dst:
+        for info in src.infolist():
+            copy_member_raw(src, info, dst, info.filename.replace("_11570_", "_11575_"))
+
+    with ZipFile(src_zip, "r") as src, ZipFile(dst_zip, "r") as dst:
+        assert dst.testzip() is None
+        assert dst.namelist() == ["a_11575_20260109.csv", "b_11600_20260109.csv"]
+        assert dst.read("a_11575_20260109.csv").decode() == payload
+
+        for src_info, dst_info in zip(src.infolist(), dst.infolist()):
+            assert dst_info.CRC == src_info.CRC
+            assert dst_info.compress_type == src_info.compress_type
+            assert dst_info.compress_size == src_info.compress_size
+            assert dst_info.file_size == src_info.file_size
+
+
+def test_copy_member_raw_keeps_name_by_default(tmp_path):
+    """Test that the member name is kept when no arcname is provided."""
+    src_zip = tmp_path / "src.zip"
+    with ZipFile(src_zip, "w", compression=ZIP_DEFLATED) as z:
+        z.writestr("x.csv", "data")
+
+    dst_zip = tmp_path / "dst.zip"
+    with ZipFile(src_zip, "r") as src, ZipFile(dst_zip, "w") as dst:
+        copy_member_raw(src, src.getinfo("x.csv"), dst)
+
+    with ZipFile(dst_zip, "r") as dst:
+        assert dst.read("x.csv") == b"data"
+
+
+def _extra_ids(extra):
+    ids = []
+    offset = 0
+    while offset + 4 <= len(extra):
+        header_id, size = struct.unpack("<HH", extra[offset:offset + 4])
+        ids.append(header_id)
+        offset += 4 + size
+    return ids
+
+
+def _local_extra(zip_path, info):
+    with open(zip_path, "rb") as f:
+        f.seek(info.header_offset)
+        header = f.read(30)
+        name_length, extra_length = struct.unpack("<HH", header[26:30])
+        f.seek(name_length, os.SEEK_CUR)
+        return f.read(extra_length)
+
+
+def test_copy_member_raw_keeps_extra_field(tmp_path):
+    """Test that the extra field of a member (here an extended timestamp) is copied."""
+    src_zip = tmp_path / "src.zip"
+    info = ZipInfo("x.csv", (2025, 12, 24, 10, 30, 0))
+    info.compress_type = ZIP_DEFLATED
+    timestamp = struct.pack("<HHBl", 0x5455, 5, 1, 1766572200)
+    info.extra = timestamp
+    with ZipFile(src_zip, "w") as z:
+        z.writestr(info, "data" * 100)
+
+    dst_zip = tmp_path / "dst.zip"
+    with ZipFile(src_zip, "r") as src, ZipFile(dst_zip, "w") as dst:
+        copy_member_raw(src, src.getinfo("x.csv"), dst, "y.csv")
+
+    with ZipFile(dst_zip, "r") as dst:
+        assert dst.testzip() is None
+        assert dst.getinfo("y.csv").extra == timestamp
+        assert _local_extra(dst_zip, dst.getinfo("y.csv")) == timestamp
+        assert dst.read("y.csv") == b"data" * 100
+
+
+def test_copy_member_raw_zip64(tmp_path, monkeypatch):
+    """Test that ZIP64 members are copied with fresh ZIP64 records and the other extra records kept."""
+    # a low limit makes zipfile write ZIP64 headers without gigabytes of test data
+    monkeypatch.setattr(zipfile, "ZIP64_LIMIT", 64)
+    src_zip = tmp_path / "src.zip"
+    timestamp = struct.pack("<HHBl", 0x5455, 5, 1, 1766572200)
+    with ZipFile(src_zip, "w", ZIP_DEFLATED) as z:
+        for name in ("a.csv", "b.csv"):
+            info = ZipInfo(name, (2025, 12, 24, 10, 30, 0))
+            info.compress_type = ZIP_DEFLATED
+            info.extra = timestamp
+            z.writestr(info, os.urandom(200))
+
+    dst_zip = tmp_path / "dst.zip"
+    with ZipFile(src_zip, "r") as src, ZipFile(dst_zip, "w") as dst:
+        assert all(0x0001 in _extra_ids(info.extra) for info in src.infolist())
+        # b.csv goes first, so the ZIP64 offsets of the source would be wrong in dst
+        for info in reversed(src.infolist()):
+            copy_member_raw(src, info, dst)
+
+    with ZipFile(src_zip, "r") as src, ZipFile(dst_zip, "r") as dst:
+        assert dst.testzip() is None
+        assert dst.namelist() == ["b.csv", "a.csv"]
+        for info in dst.infolist():
+            # a single ZIP64 record, in the central directory and in the local header
+            assert sorted(_extra_ids(info.extra)) == [0x0001, 0x5455]
+            assert sorted(_extra_ids(_local_extra(dst_zip, info))) == [0x0001, 0x5455]
+            assert info.file_size == src.getinfo(info.filename).file_size
+            assert dst.read(info) == src.read(info.filename)
+
+
+def test_copy_member_stream_recompresses(tmp_path):
+    """Test that a stored member is streamed into a deflated one with identical content."""
+    src_zip = tmp_path / "src.zip"
+    payload = b"1,2,3\n" * 50_000
+
+    with ZipFile(src_zip, "w", compression=ZIP_STORED) as z:
+        z.writestr("x.csv", payload)
+
+    dst_zip = tmp_path / "dst.zip"
+    with ZipFile(src_zip, "r") as src, ZipFile(dst_zip, "w") as dst:
+        copy_member_stream(src, src.getinfo("x.csv"), dst, "y.csv", ZIP_DEFLATED)
+
+    with ZipFile(dst_zip, "r") as dst:
+        info = dst.getinfo("y.csv")
+        assert info.compress_type == ZIP_DEFLATED
+        assert info.compress_size < len(payload)
+        assert dst.read("y.csv") == payload
+
+
+def test_copy_member_dispatch(tmp_path):
+    """Test that copy_member only recompresses members whose codec differs."""
+    src_zip = tmp_path / "src.zip"
+    with ZipFile(src_zip, "w") as z:
+        z.writestr("deflated.csv", "a" * 1000, compress_type=ZIP_DEFLATED)
+        z.writestr("stored.csv", "b" * 1000, compress_type=ZIP_STORED)
+
+    dst_zip = tmp_path / "dst.zip"
+    with ZipFile(src_zip, "r") as src, ZipFile(dst_zip, "w") as dst:
+        for info in src.infolist():
+            copy_member(src, info, dst, compress_type=ZIP_DEFLATED)
+
+    with ZipFile(src_zip, "r") as src, ZipFile(dst_zip, "r") as dst:
+        assert dst.getinfo("deflated.csv").compress_size == src.getinfo("deflated.csv").compress_size
+        assert dst.getinfo("stored.csv").compress_type == ZIP_DEFLATED
+        assert dst.read("stored.csv") == b"b" * 1000
+
+
+def test_compression_keeps():
+    """Test which members a Compression copies without recompression."""
+    deflated = ZipInfo("x.csv")
+    deflated.compress_type = ZIP_DEFLATED
+
+    assert Compression().keeps(deflated)
+    assert Compression(None, 9).keeps(deflated)
+    assert not Compression(ZIP_DEFLATED, 9).keeps(deflated)
+    assert not Compression(ZIP_LZMA).keeps(deflated)
+
+
+@pytest.mark.parametrize("argv, expected, label", [
+    ([], Compression(), "deflated"),
+    (["--level", "1"], Compression(ZIP_DEFLATED, 1), "deflated:1"),
+    (["--codec", "keep"], Compression(None), "keep"),
+    (["--codec", "lzma"], Compression(ZIP_LZMA), "lzma"),
+])
+def test_compression_from_args(argv, expected, label):
+    """Test that --codec and --level map to the expected Compression."""
+    parser = argparse.ArgumentParser()
+    add_compression_arguments(parser)
+
+    compression = compression_from_args(parser.parse_args(argv))
+
+    assert compression == expected
+    assert str(compression) == label
+
+
+def test_copy_member_with_level(tmp_path):
+    """Test that a level recompresses members that already use the requested codec."""
+    src_zip = tmp_path / "src.zip"
+    payload = b"".join(b"%d,%d\n" % (i, i * 7 % 1013) for i in range(50_000))
+    with ZipFile(src_zip, "w", compression=ZIP_DEFLATED, compresslevel=1) as z:
+        z.writestr("x.csv", payload)
+
+    dst_zip = tmp_path / "dst.zip"
+    with ZipFile(src_zip, "r") as src, ZipFile(dst_zip, "w") as dst:
+        copy_member(src, src.getinfo("x.csv"), dst, compress_type=ZIP_DEFLATED, compresslevel=9)
+
+    with ZipFile(src_zip, "r") as src, ZipFile(dst_zip, "r") as dst:
+        assert dst.getinfo("x.csv").compress_size < src.getinfo("x.csv").compress_size
+        assert dst.read("x.csv") == payload
+
+
+def test_atomic_zip_replaces_destination(tmp_path):
+    """Test that atomic_zip writes the new archive over the old one without leftovers."""
+    dst_zip = tmp_path / "out" / "dst.zip"
+    dst_zip.parent.mkdir()
+    with ZipFile(dst_zip, "w") as z:
+        z.writestr("old.csv", "old")
+
+    with atomic_zip(str(dst_zip)) as dst:
+        dst.writestr("new.csv", "new")
+
+    with ZipFile(dst_zip, "r") as z:
+        assert z.namelist() == ["new.csv"]
+        assert z.getinfo("new.csv").compress_type == ZIP_DEFLATED
+    assert os.listdir(dst_zip.parent) == ["dst.zip"]
+
+
+def test_atomic_zip_failure_keeps_destination(tmp_path):
+    """Test that a failing writer leaves neither a truncated zip nor a temporary file."""
+    dst_zip = tmp_path / "dst.zip"
+    with ZipFile(dst_zip, "w") as z:
+        z.writestr("old.csv", "old")
+
+    with pytest.raises(RuntimeError):
+        with atomic_zip(str(dst_zip)) as dst:
+            dst.writestr("new.csv", "new")
+            raise RuntimeError("crash while writing")
+
+    with ZipFile(dst_zip, "r") as z:
+        assert z.namelist() == ["old.csv"]
+    assert os.listdir(tmp_path) == ["dst.zip"]
+
+    missing_zip = tmp_path / "missing.zip"
+    with pytest.raises(RuntimeError):
+        with atomic_zip(str(missing_zip)):
+            raise RuntimeError("crash while writing")
+    assert not missing_zip.exists()
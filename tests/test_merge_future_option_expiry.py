@@ -21,13 +21,17 @@ Example:
     pytest -v tests/test_merge_future_option_expiry.py
 """
 
+import json
 import os
+import random
 import sys
 import shutil
 import logging
+import warnings
 import pytest
 from datetime import datetime
-from zipfile import ZipFile
+from pathlib import Path
+from zipfile import ZipFile, ZIP_DEFLATED, ZIP_STORED
 import scripts.merge_future_option_expiry as script_module
 from scripts.merge_future_option_expiry import (
     ExpiryFolder,
@@ -36,7 +40,12 @@ from scripts.merge_future_option_expiry import (
     merge_expiries,
     compute_next_quarter,
     get_sorted_expiry_folders,
+    merge_plan_to_dict,
+    merge_zips,
+    plan_merge,
 )
+from scripts.fop.journal import Journal
+from scripts.fop.zip_rewrite import Compression
 
 # Constant for output directory name used across tests
 TEMP_OUTPUT_DIR_NAME = "temp-output-directory"
@@ -329,3 +338,180 @@ def test_main_non_existent_directory(tmp_path, monkeypatch, caplog):
         assert "Completed with" in caplog.text and "error" in caplog.text
     finally:
         os.chdir(original_cwd)
+
+
+def test_merge_resume_with_journal(tmp_path):
+    """Test that a journal makes a re-run skip source zips that were already merged."""
+    src = tmp_path / "data" / "adu"
+    src.mkdir(parents=True)
+    for f in ["202501", "202502", "202503"]:
+        (src / f).mkdir()
+
+    with ZipFile(src / "202501" / "a.zip", "w") as z:
+        z.writestr("x.txt", "501")
+    with ZipFile(src / "202502" / "a.zip", "w") as z:
+        z.writestr("y.txt", "502")
+
+    out = tmp_path / TEMP_OUTPUT_DIR_NAME
+    journal_path = out / "journal.jsonl"
+
+    merge_expiries(str(src), str(out), str(tmp_path / "data"), Journal(str(journal_path)))
+    merge_expiries(str(src), str(out), str(tmp_path / "data"), Journal(str(journal_path)))
+
+    # without the journal the second run would append x.txt and y.txt once more
+    with ZipFile(out / "adu" / "202503" / "a.zip", "r") as z:
+        assert sorted(z.namelist()) == ["x.txt", "y.txt"]
+
+
+def test_plan_merge_matches_next_quarter():
+    """Test that the single-pass planner picks the same targets as next_quarter."""
+    rng = random.Random(7)
+    names = sorted({f"{rng.randint(2015, 2026)}{rng.randint(1, 12):02d}" for _ in range(80)})
+    expiries = [ExpiryFolder(name) for name in names]
+
+    known = {e.name: e for e in expiries}
+    expected = []
+    for exp in expiries:
+        target = exp if exp.is_quarter else next_quarter(exp, list(known.values()))
+        known.setdefault(target.name, target)
+        expected.append((exp.name, target.name))
+
+    assert [(step.source.name, step.target.name) for step in plan_merge(expiries)] == expected
+
+
+def test_plan_merge_created_quarters():
+    """Test that missing quarters are created once and reused by later months."""
+    steps = plan_merge([ExpiryFolder("202501"), ExpiryFolder("202502"), ExpiryFolder("202504")])
+
+    assert [(s.source.name, s.target.name, s.created) for s in steps] == [
+        ("202501", "202503", True),
+        ("202502", "202503", False),
+        ("202504", "202506", True),
+    ]
+
+
+def test_merge_plan_to_dict(tmp_path):
+    """Test that the exported plan maps every source zip to its destination zip."""
+    src = tmp_path / "data" / "adu"
+    (src / "202502").mkdir(parents=True)
+    with ZipFile(src / "202502" / "a.zip", "w") as z:
+        z.writestr("x.txt", "502")
+
+    out = tmp_path / TEMP_OUTPUT_DIR_NAME
+    steps = plan_merge(get_sorted_expiry_folders(str(src)))
+    plan = merge_plan_to_dict(str(src), str(out), steps, str(tmp_path / "data"))
+
+    assert plan["steps"] == [{
+        "source": "202502",
+        "target": "202503",
+        "created": True,
+        "zips": {str(src / "202502" / "a.zip"): str(out / "adu" / "202503" / "a.zip")},
+    }]
+    # planning does not write anything
+    assert not out.exists()
+
+
+def test_main_plan_mode(tmp_path, monkeypatch, caplog, script_temp_output_dir):
+    """Test that main() --plan exports the mapping without merging anything."""
+    test_dir = tmp_path / "data" / "futureoption" / "cme" / "minute" / "adu"
+    (test_dir / "202501").mkdir(parents=True)
+    with ZipFile(test_dir / "202501" / "test.zip", "w") as z:
+        z.writestr("data.txt", "test data")
+
+    manifest = tmp_path / "merge-plan.json"
+    original_cwd = os.getcwd()
+    os.chdir(tmp_path)
+
+    try:
+        monkeypatch.setattr(sys, 'argv', [
+            'merge_future_option_expiry.py', '--plan', '--manifest', str(manifest),
+            'data/futureoption/cme/minute/adu'])
+        with caplog.at_level(logging.INFO):
+            main()
+
+        assert "Plan: 202501 -> 202503 (created)" in caplog.text
+        plans = json.loads(manifest.read_text())
+        assert plans[0]["steps"][0]["target"] == "202503"
+        assert not list(Path(script_temp_output_dir).glob("**/*.zip"))
+    finally:
+        os.chdir(original_cwd)
+
+
+def test_merge_zips_last_writer_wins(tmp_path):
+    """Test that duplicate names keep only the entry of the last source."""
+    sources = []
+    for index, content in enumerate(["first", "second", "third"]):
+        src_zip = tmp_path / f"src{index}.zip"
+        with ZipFile(src_zip, "w", ZIP_DEFLATED) as z:
+            z.writestr("dup.csv", content)
+            z.writestr(f"only{index}.csv", content * 100)
+        sources.append(str(src_zip))
+
+    dst_zip = tmp_path / "dst.zip"
+    merge_zips(sources, str(dst_zip))
+
+    with ZipFile(dst_zip, "r") as z:
+        assert [info.filename for info in z.infolist()].count("dup.csv") == 1
+        assert sorted(z.namelist()) == ["dup.csv", "only0.csv", "only1.csv", "only2.csv"]
+        assert z.read("dup.csv") == b"third"
+        assert z.read("only1.csv") == b"second" * 100
+
+    with ZipFile(sources[1], "r") as src, ZipFile(dst_zip, "r") as dst:
+        # raw copy keeps the compressed payload
+        assert dst.getinfo("only1.csv").compress_size == src.getinfo("only1.csv").compress_size
+
+
+def test_merge_zips_single_source(tmp_path):
+    """Test that a lone source is copied as is unless it has duplicates or needs another codec."""
+    src_zip = tmp_path / "src.zip"
+    with ZipFile(src_zip, "w", ZIP_DEFLATED) as z:
+        z.writestr("a.csv", "a" * 100)
+
+    copied = tmp_path / "copied.zip"
+    merge_zips([str(src_zip)], str(copied))
+    assert copied.read_bytes() == src_zip.read_bytes()
+
+    stored = tmp_path / "stored.zip"
+    merge_zips([str(src_zip)], str(stored), Compression(ZIP_STORED))
+    with ZipFile(stored, "r") as z:
+        assert z.getinfo("a.csv").compress_type == ZIP_STORED
+        assert z.read("a.csv") == b"a" * 100
+
+    dup_zip = tmp_path / "dup.zip"
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # zipfile warns about duplicate names
+        with ZipFile(dup_zip, "w", ZIP_DEFLATED) as z:
+            z.writestr("a.csv", "old")
+            z.writestr("a.csv", "new")
+    deduplicated = tmp_path / "deduplicated.zip"
+    merge_zips([str(dup_zip)], str(deduplicated))
+    with ZipFile(deduplicated, "r") as z:
+        assert z.namelist() == ["a.csv"]
+        assert z.read("a.csv") == b"new"
+
+
+def test_merge_writes_each_destination_once(tmp_path, monkeypatch):
+    """Test that five monthly folders folding into one quarter produce one write."""
+    src = tmp_path / "data" / "adu"
+    for name in ["202501", "202502", "202503"]:
+        (src / name).mkdir(parents=True)
+        with ZipFile(src / name / "a.zip", "w") as z:
+            z.writestr("same.csv", name)
+
+    calls = []
+    original_merge_zips = script_module.merge_zips
+
+    def counting_merge_zips(src_zips, dst_zip, *args):
+        calls.append((list(src_zips), dst_zip))
+        original_merge_zips(src_zips, dst_zip, *args)
+
+    monkeypatch.setattr(script_module, "merge_zips", counting_merge_zips)
+
+    out = tmp_path / TEMP_OUTPUT_DIR_NAME
+    merge_expiries(str(src), str(out), str(tmp_path / "data"))
+
+    assert len(calls) == 1
+    assert len(calls[0][0]) == 3
+    with ZipFile(out / "adu" / "202503" / "a.zip", "r") as z:
+        assert z.namelist() == ["same.csv"]
+        assert z.read("same.csv") == b"202503"
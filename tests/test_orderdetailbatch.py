@@ -0,0 +1,270 @@
+"""
+test_orderdetailbatch.py
+
+Pytest tests for the batched order-detail lookups of
+scripts/brokerage_eze/scripts/orderdetailbatch.py.
+
+These tests verify that:
+
+1. Results are yielded in the order of the keys, whatever order calls finish in.
+2. Transient statuses are retried with backoff, other ones returned at once.
+3. No more than max_in_flight calls run at a time and keys are consumed lazily.
+4. An expired session logs in again once; a failed login is the error of its keys.
+5. The asyncio variant keeps the same order and re-login behaviour.
+6. The getorderdetailbyorderid example prints the per-key failures of a batch.
+
+They need grpc and protobuf (the example srp too) and are skipped without them; the library and
+its order service stub are fakes, no server is contacted.
+
+Example:
+
+    pytest -v tests/test_orderdetailbatch.py
+"""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def orderdetailbatch(emsx_scripts):
+    pytest.importorskip("grpc")
+    pytest.importorskip("google.protobuf")
+    import orderdetailbatch
+    return orderdetailbatch
+
+
+@pytest.fixture
+def getorderdetailbyorderid(orderdetailbatch):
+    pytest.importorskip("srp")
+    import getorderdetailbyorderid
+    return getorderdetailbyorderid
+
+
+def rpc_error(code):
+    import grpc
+
+    class FakeRpcError(grpc.RpcError):
+        def code(self):
+            return code
+
+        def details(self):
+            return code.name
+
+    return FakeRpcError()
+
+
+class FakeOrderStub:
+    """
+    GetOrderDetailByOrderId answering "detail <order id>"; failures[order_id] lists
+    the status codes of its first attempts, valid_token the only token accepted.
+    """
+    def __init__(self, failures=None, delays=None, valid_token="token"):
+        self.failures = {key: list(codes) for key, codes in (failures or {}).items()}
+        self.delays = delays or {}
+        self.valid_token = valid_token
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def _answer(self, request):
+        import grpc
+        if self.failures.get(request.OrderId):
+            raise rpc_error(self.failures[request.OrderId].pop(0))
+        if request.UserToken != self.valid_token:
+            raise rpc_error(grpc.StatusCode.UNAUTHENTICATED)
+        return f"detail {request.OrderId}"
+
+    def GetOrderDetailByOrderId(self, request, timeout=None):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delays.get(request.OrderId, 0))
+            return self._answer(request)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+class FakeLibrary:
+    """
+    Library whose logins after the first successful_logins raise login_error, when given.
+    """
+    def __init__(self, stub, token="token", new_token="token", login_error=None, successful_logins=0):
+        self.stub = stub
+        self.userToken = token
+        self.new_token = new_token
+        self.login_error = login_error
+        self.successful_logins = successful_logins
+        self.logins = 0
+        self.delays = []
+        self.config = SimpleNamespace(maxRetryCount=3)
+
+    def get_order_service_stub(self):
+        return self.stub
+
+    def login(self):
+        self.logins += 1
+        time.sleep(0.01)
+        if self.login_error is not None and self.logins > self.successful_logins:
+            raise self.login_error
+        self.userToken = self.new_token
+
+    def logout(self):
+        pass
+
+    def calculate_delay_millis(self, retry_count):
+        self.delays.append(retry_count)
+        return 0
+
+
+class FakeAsyncOrderStub(FakeOrderStub):
+    async def GetOrderDetailByOrderId(self, request, timeout=None):
+        await asyncio.sleep(self.delays.get(request.OrderId, 0))
+        return self._answer(request)
+
+
+class FakeAsyncLibrary(FakeLibrary):
+    async def login(self):
+        self.logins += 1
+        await asyncio.sleep(0.01)
+        if self.login_error is not None:
+            raise self.login_error
+        self.userToken = self.new_token
+
+
+def test_results_in_key_order(orderdetailbatch):
+    """Test that results follow the order of the keys even when later calls finish first."""
+    stub = FakeOrderStub(delays={"A": 0.05, "B": 0.02})
+    lib = FakeLibrary(stub)
+
+    results = list(orderdetailbatch.get_order_details_by_order_ids(lib, ["A", "B", "C", "D"], max_in_flight=4))
+
+    assert [result.key for result in results] == ["A", "B", "C", "D"]
+    assert [result.response for result in results] == ["detail A", "detail B", "detail C", "detail D"]
+    assert all(result.error is None and result.attempts == 1 for result in results)
+
+
+def test_retry_with_backoff(orderdetailbatch):
+    """Test that UNAVAILABLE and DEADLINE_EXCEEDED are retried with growing backoff."""
+    import grpc
+    stub = FakeOrderStub(failures={"A": [grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED]})
+    lib = FakeLibrary(stub)
+
+    (result,) = orderdetailbatch.get_order_details_by_order_ids(lib, ["A"])
+
+    assert (result.response, result.error, result.attempts) == ("detail A", None, 3)
+    assert lib.delays == [1, 2]
+
+
+def test_retries_exhausted_and_permanent_errors(orderdetailbatch):
+    """Test that exhausted retries and non-transient statuses are returned as errors."""
+    import grpc
+    stub = FakeOrderStub(failures={"A": [grpc.StatusCode.UNAVAILABLE] * 5, "B": [grpc.StatusCode.NOT_FOUND]})
+    lib = FakeLibrary(stub)
+
+    first, second, third = orderdetailbatch.get_order_details_by_order_ids(lib, ["A", "B", "C"], max_retries=2)
+
+    assert (first.error.code(), first.attempts) == (grpc.StatusCode.UNAVAILABLE, 3)
+    assert (second.error.code(), second.attempts) == (grpc.StatusCode.NOT_FOUND, 1)
+    assert third.response == "detail C"
+
+
+def test_in_flight_window_is_bounded(orderdetailbatch):
+    """Test that at most max_in_flight calls run at once and keys are pulled lazily."""
+    stub = FakeOrderStub(delays={str(i): 0.005 for i in range(20)})
+    lib = FakeLibrary(stub)
+    consumed = []
+
+    def keys():
+        for i in range(20):
+            consumed.append(i)
+            yield str(i)
+
+    results = orderdetailbatch.get_order_details_by_order_ids(lib, keys(), max_in_flight=3)
+    first = next(results)
+    assert len(consumed) <= 3
+    rest = list(results)
+
+    assert [result.key for result in [first] + rest] == [str(i) for i in range(20)]
+    assert stub.max_in_flight <= 3
+
+
+def test_expired_session_logs_in_once(orderdetailbatch):
+    """Test that concurrent UNAUTHENTICATED calls share one login and retry with its token."""
+    stub = FakeOrderStub(valid_token="fresh")
+    lib = FakeLibrary(stub, token="expired", new_token="fresh")
+
+    results = list(orderdetailbatch.get_order_details_by_order_ids(lib, ["A", "B", "C", "D"], max_in_flight=4))
+
+    assert lib.logins == 1
+    assert [result.response for result in results] == ["detail A", "detail B", "detail C", "detail D"]
+
+
+def test_failed_login_is_reported_per_key(orderdetailbatch):
+    """Test that a failed re-login is the error of its keys instead of ending the batch."""
+    from LoginFailedException import LoginFailedException
+    stub = FakeOrderStub(valid_token="fresh")
+    lib = FakeLibrary(stub, token="expired", login_error=LoginFailedException("Failed to login"))
+
+    results = list(orderdetailbatch.get_order_details_by_order_ids(lib, ["A", "B", "C"], max_in_flight=2))
+
+    assert [result.key for result in results] == ["A", "B", "C"]
+    assert all(isinstance(result.error, LoginFailedException) for result in results)
+    assert lib.logins == 1
+
+
+def test_example_prints_failed_login(getorderdetailbyorderid, capsys):
+    """Test that the example prints the keys of a failed re-login and the results of the other ones."""
+    from LoginFailedException import LoginFailedException
+    import grpc
+    # the session expires right after the example logs in, then logging in again fails
+    stub = FakeOrderStub(failures={"B": [grpc.StatusCode.NOT_FOUND]}, valid_token="fresh")
+    lib = FakeLibrary(stub, token="expired", new_token="expired",
+                      login_error=LoginFailedException("Failed to login"), successful_logins=1)
+    example = getorderdetailbyorderid.GetOrderDetailByOrderId.__new__(getorderdetailbyorderid.GetOrderDetailByOrderId)
+    example.xapiLib = lib
+    example.order_ids = ["A", "B"]
+
+    example.get_order_details_by_order_ids()
+
+    assert capsys.readouterr().out.splitlines() == [
+        "A: failed after 1 attempts: Failed to login",
+        "B: failed after 1 attempts: NOT_FOUND",
+    ]
+    assert lib.logins == 2
+
+
+def test_async_order_and_login(orderdetailbatch):
+    """Test that the asyncio variant keeps the key order and logs in once."""
+    stub = FakeAsyncOrderStub(delays={"A": 0.03}, valid_token="fresh")
+    lib = FakeAsyncLibrary(stub, token="expired", new_token="fresh")
+
+    async def collect():
+        return [result async for result in
+                orderdetailbatch.get_order_details_by_order_ids_async(lib, ["A", "B", "C"], max_in_flight=2)]
+
+    results = asyncio.run(collect())
+
+    assert [result.response for result in results] == ["detail A", "detail B", "detail C"]
+    assert lib.logins == 1
+
+
+def test_async_failed_login_is_reported_per_key(orderdetailbatch):
+    """Test that a failed re-login does not end the async batch either."""
+    from LoginFailedException import LoginFailedException
+    stub = FakeAsyncOrderStub(valid_token="fresh")
+    lib = FakeAsyncLibrary(stub, token="expired", login_error=LoginFailedException("Failed to login"))
+
+    async def collect():
+        return [result async for result in orderdetailbatch.get_order_details_by_order_ids_async(lib, ["A", "B"])]
+
+    results = asyncio.run(collect())
+
+    assert [result.key for result in results] == ["A", "B"]
+    assert all(isinstance(result.error, LoginFailedException) for result in results)
+    assert lib.logins == 1